@@ -0,0 +1,205 @@
+"""
+Benchmarks for the comfort and psychrometric kernels.
+
+Runs without Home Assistant:
+
+    python benchmarks/bench_comfort.py                       # run and print
+    python benchmarks/bench_comfort.py --save baseline.json  # keep a baseline
+    python benchmarks/bench_comfort.py --compare baseline.json
+
+With --compare the exit status is 1 if any benchmark's mean latency grew by
+more than --threshold (default 10 %) against the baseline.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from custom_components.comfort_tool import comfort, psychrometrics, solver  # noqa: E402
+
+# Representative input grids: (ta, tr, va, rh, met, clo)
+GRIDS = {
+    "still_air": list(itertools.product(
+        [18, 20, 22, 24, 26, 28, 30], [None], [0.05], [30, 50, 70], [1.0, 1.2], [0.5, 1.0]
+    )),
+    "elevated_air_speed": list(itertools.product(
+        [24, 26, 28, 30, 32, 34], [None], [0.3, 0.8, 1.5], [40, 60], [1.1], [0.5, 0.7]
+    )),
+    "high_met": list(itertools.product(
+        [18, 20, 22, 24, 26, 28], [None], [0.2], [40, 60], [2.0, 3.0, 4.0], [0.5]
+    )),
+    "cold": list(itertools.product(
+        [5, 8, 11, 14, 16], [None], [0.1, 0.5], [30, 60], [1.0], [1.0, 1.5]
+    )),
+}
+# Mean radiant temperature equal to air temperature
+GRIDS = {
+    name: [(ta, ta, va, rh, met, clo) for ta, _, va, rh, met, clo in grid]
+    for name, grid in GRIDS.items()
+}
+
+PSY_GRID = list(itertools.product([-10, 0, 10, 20, 30, 40], [10, 30, 50, 70, 90]))
+
+
+def comfort_cases():
+    """(benchmark name, callable, argument tuples) for the comfort kernels."""
+    for grid_name, grid in GRIDS.items():
+        yield f"pmv/{grid_name}", lambda ta, tr, va, rh, met, clo: comfort.pmv(
+            ta, tr, comfort.relative_air_speed(va, met), rh, met, clo), grid
+        yield f"pierce_set/{grid_name}", lambda ta, tr, va, rh, met, clo: comfort.pierce_set(
+            ta, tr, va, rh, met, clo), grid
+        yield f"cooling_effect/{grid_name}", lambda ta, tr, va, rh, met, clo: comfort.cooling_effect(
+            ta, tr, comfort.relative_air_speed(va, met), rh, met, comfort.dynamic_clothing(clo, met)), grid
+        yield f"pmv_elevated_airspeed/{grid_name}", lambda ta, tr, va, rh, met, clo: comfort.pmv_elevated_airspeed(
+            ta, tr, va, rh, met, clo), grid
+        yield f"calculate_thermal_comfort/{grid_name}", lambda ta, tr, va, rh, met, clo: comfort.calculate_thermal_comfort(
+            ta, tr, va, rh, clo, met), grid
+
+
+def psychrometric_cases():
+    yield "psy.tdb_rh", psychrometrics.tdb_rh, PSY_GRID
+    dewpoint_grid = [(tdb, psychrometrics.tdb_rh(tdb, rh)["dewpoint"]) for tdb, rh in PSY_GRID]
+    yield "psy.tdb_dewpoint", psychrometrics.tdb_dewpoint, dewpoint_grid
+    w_grid = [(tdb, psychrometrics.tdb_rh(tdb, rh)["w"]) for tdb, rh in PSY_GRID]
+    yield "psy.wetbulb", psychrometrics.wetbulb, w_grid
+
+
+class SolverCounter:
+    """
+    Counts root-finder objective evaluations by wrapping the solver entry
+    points used by the models. An objective handed on from one solver to
+    another (brentq_near continuing with brentq) counts as one solve; solves
+    nested inside an objective (tdb_dewpoint -> dewpoint) count separately.
+    """
+
+    def __init__(self):
+        self.evaluations = 0
+        self.solves = 0
+        self._patched = []
+
+    def _wrap(self, solve):
+        def wrapper(objective, *args, **kwargs):
+            if getattr(objective, "counted", False):
+                return solve(objective, *args, **kwargs)
+            self.solves += 1
+
+            def counted(x):
+                self.evaluations += 1
+                return objective(x)
+            counted.counted = True
+            return solve(counted, *args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        for module in (solver, psychrometrics):
+            for name in ("brentq", "brentq_near"):
+                if hasattr(module, name):
+                    original = getattr(module, name)
+                    self._patched.append((module, name, original))
+                    setattr(module, name, self._wrap(original))
+        return self
+
+    def __exit__(self, *exc):
+        for module, name, original in reversed(self._patched):
+            setattr(module, name, original)
+
+
+def run_case(fn, grid, repeat):
+    latencies = []
+    with SolverCounter() as counter:
+        for _ in range(repeat):
+            for args in grid:
+                start = time.perf_counter_ns()
+                fn(*args)
+                latencies.append(time.perf_counter_ns() - start)
+    calls = len(latencies)
+    total = sum(latencies) / 1e9
+    latencies.sort()
+    return {
+        "calls": calls,
+        "mean_us": statistics.fmean(latencies) / 1e3,
+        "median_us": latencies[calls // 2] / 1e3,
+        "p95_us": latencies[int(calls * 0.95) - 1] / 1e3,
+        "throughput_per_s": calls / total if total else float("inf"),
+        "solver_evaluations_per_call": counter.evaluations / calls,
+        "solves_per_call": counter.solves / calls,
+    }
+
+
+def run(repeat, pattern=None):
+    results = {}
+    for name, fn, grid in itertools.chain(comfort_cases(), psychrometric_cases()):
+        if pattern and pattern not in name:
+            continue
+        results[name] = run_case(fn, grid, repeat)
+    return results
+
+
+def print_results(results, baseline=None):
+    header = f"{'benchmark':<44}{'mean µs':>10}{'p95 µs':>10}{'calls/s':>11}{'evals/call':>12}"
+    if baseline:
+        header += f"{'vs base':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        line = (f"{name:<44}{r['mean_us']:>10.1f}{r['p95_us']:>10.1f}"
+                f"{r['throughput_per_s']:>11.0f}{r['solver_evaluations_per_call']:>12.2f}")
+        if baseline and name in baseline:
+            line += f"{r['mean_us'] / baseline[name]['mean_us'] - 1:>+9.1%}"
+        print(line)
+
+
+def regressions(results, baseline, threshold):
+    return [
+        name for name, r in results.items()
+        if name in baseline and r["mean_us"] > baseline[name]["mean_us"] * (1 + threshold)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="passes over each input grid")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--save", metavar="FILE", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown reported as a regression (default 0.10)")
+    args = parser.parse_args(argv)
+
+    # Solver warnings on extreme grid points are expected and would clutter the report
+    logging.disable(logging.WARNING)
+
+    results = run(args.repeat, args.filter)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "repeat": args.repeat,
+                "results": results,
+            }, f, indent=2)
+
+    if baseline:
+        slower = regressions(results, baseline, args.threshold)
+        if slower:
+            print(f"\nRegressions (> {args.threshold:.0%} slower): {', '.join(slower)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+How much of pierce_set's 60-minute exposure an early steady-state exit
+could skip. Negative result: too little to be worth an option.
+
+pierce_set simulates a 60-minute exposure one minute at a time, each minute
+solving the clothing temperature iteratively (the TCL iterations, most of
+its cost). A steady_state option once ended the exposure after skin and core
+temperature had changed by less than 3e-4 °C per minute for 5 minutes in a
+row. It kept SET and CE within 0.02 °C of the full run, but timed at 0.70x
+to 1.03x the speed of the full run, so it was removed.
+
+This script shows why. It traces the exposure loop of unmodified
+pierce_set runs and, for each input, finds the minute at which that
+criterion would first be met. The TCL iterations after that minute are the
+most an early exit could save. Over the grid below about four in five runs
+are still adjusting at minute 60, and at most about 2 % of the iterations
+could be skipped (about 7 % with --tolerance 1e-3 --steps 3), which the
+per-minute check costs back. Runs without Home Assistant:
+
+    python benchmarks/check_steady_state.py
+    python benchmarks/check_steady_state.py --tolerance 1e-3 --steps 3
+"""
+import argparse
+import inspect
+import itertools
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from custom_components.comfort_tool import comfort  # noqa: E402
+
+# ta (= tr), va, rh, met, clo
+GRID = list(itertools.product(
+    [10, 16, 20, 24, 28, 32, 36],
+    [0.0, 0.1, 0.3, 0.8, 1.5, 2.0],
+    [10, 40, 70, 100],
+    [1.0, 1.2, 1.6, 2.0, 3.0],
+    [0.0, 0.5, 1.0, 1.5],
+))
+
+# The two kinds of pierce_set runs: SET itself, and the still-air runs the
+# cooling effect solve repeats for every root-finding step
+RUNS = {
+    "SET": {},
+    "CE still air": dict(calculate_ce=True, body_position="standing"),
+}
+
+LOOP = "for _ in range(int(LTime)):"
+
+
+def _loop_line():
+    lines, first = inspect.getsourcelines(comfort.pierce_set)
+    for offset, line in enumerate(lines):
+        if line.strip() == LOOP:
+            return first + offset
+    raise RuntimeError(f"exposure loop {LOOP!r} not found in pierce_set")
+
+
+def trace_minutes(run):
+    """
+    Calls run() and returns, for each simulated minute of the pierce_set
+    call in it, (DTSK, DTCR, TCL iterations so far at its end).
+    """
+    code = comfort.pierce_set.__code__
+    line = _loop_line()
+    minutes = []
+
+    def local(frame, event, arg):
+        # The loop header runs before each minute and once more at the end
+        if event == "line" and frame.f_lineno == line and "DTSK" in frame.f_locals:
+            f_locals = frame.f_locals
+            minutes.append((f_locals["DTSK"], f_locals["DTCR"], f_locals["tcl_iterations"]))
+        return local
+
+    def calls(frame, event, arg):
+        return local if frame.f_code is code else None
+
+    sys.settrace(calls)
+    try:
+        run()
+    finally:
+        sys.settrace(None)
+    return minutes
+
+
+def settled_minute(minutes, tolerance, steps):
+    """First minute after which an early exit would stop, or None."""
+    quiet = 0
+    for minute, (dtsk, dtcr, _) in enumerate(minutes, 1):
+        if abs(dtsk) < tolerance and abs(dtcr) < tolerance:
+            quiet += 1
+            if quiet >= steps:
+                return minute
+        else:
+            quiet = 0
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tolerance", type=float, default=3e-4,
+                        help="skin and core temperature change per minute (°C) counted as steady (default 3e-4)")
+    parser.add_argument("--steps", type=int, default=5,
+                        help="steady minutes in a row before stopping (default 5)")
+    args = parser.parse_args(argv)
+
+    for name, options in RUNS.items():
+        total = skippable = settled = 0
+        for ta, va, rh, met, clo in GRID:
+            vel = 0.1 if options else va
+            minutes = trace_minutes(lambda: comfort.pierce_set(ta, ta, vel, rh, met, clo, **options))
+            iterations = minutes[-1][2]
+            total += iterations
+            minute = settled_minute(minutes, args.tolerance, args.steps)
+            if minute is not None:
+                settled += 1
+                skippable += iterations - minutes[minute - 1][2]
+        print(
+            f"{name:<13} {settled}/{len(GRID)} runs settle within 60 minutes; "
+            f"an early exit could skip at most {100 * skippable / total:.1f} % of the TCL iterations"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,107 @@
+from __future__ import annotations
+
 import logging
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.typing import ConfigType
+from typing import TYPE_CHECKING
+
+from .cache import ComfortCache
+from .const import (
+    CONF_CACHE_SIZE,
+    CONF_CACHE_TTL,
+    CONF_EXECUTOR,
+    CONF_MAX_BATCH_SIZE,
+    CONF_MAX_WORKERS,
+    CONF_RESOLUTION,
+    DATA_CACHE,
+    DATA_EXECUTOR,
+    DATA_TABLES,
+    CONF_ENTRY_TYPE,
+    DOMAIN,
+    ENTRY_TYPE_MULTI_ZONE,
+    STARTUP_STAGGER,
+    TABLE_DIRECTORY,
+    UPDATE_MODE_EVENT,
+)
+from .executor import ComfortExecutor
 
-from .const import DOMAIN
+# The package itself must stay importable without Home Assistant: process-pool
+# workers import the model modules through it.
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
 
 _LOGGER = logging.getLogger(__name__)
 
+
+def __getattr__(name):
+    # Home Assistant validates the YAML section with CONFIG_SCHEMA; it is
+    # only built when asked for, so the package imports without voluptuous
+    if name == "CONFIG_SCHEMA":
+        from .config_schema import CONFIG_SCHEMA
+        return CONFIG_SCHEMA
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     _LOGGER.debug("Setting up Comfort Tool domain")
+    from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+    from homeassistant.helpers.storage import STORAGE_DIR
+
+    from .config_schema import CONFIG_SCHEMA
+    from .services import async_setup_services
+    from .table import TableStore
+
+    # Validated by Home Assistant when the section exists; the defaults otherwise
+    conf = config.get(DOMAIN) or CONFIG_SCHEMA({})[DOMAIN]
+    executor = ComfortExecutor(conf[CONF_EXECUTOR], conf[CONF_MAX_WORKERS])
+    hass.data.setdefault(DOMAIN, {})[DATA_EXECUTOR] = executor
+    hass.data[DOMAIN][DATA_CACHE] = ComfortCache(
+        conf[CONF_CACHE_SIZE],
+        conf.get(CONF_CACHE_TTL),
+        conf[CONF_RESOLUTION],
+    )
+    hass.data[DOMAIN][DATA_TABLES] = TableStore(
+        hass.config.path(STORAGE_DIR, TABLE_DIRECTORY), executor
+    )
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, lambda event: executor.shutdown())
+    await async_setup_services(hass, conf[CONF_MAX_BATCH_SIZE])
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     _LOGGER.debug("Setting up entry: %s", entry.entry_id)
+    from .coordinator import BaseComfortCoordinator, ComfortCoordinator, MultiZoneCoordinator
+
+    # One coordinator per entry runs the model once per cycle and feeds all of
+    # its sensors; a multi-zone entry evaluates all of its zones in one batch
+    if {**entry.data, **entry.options}.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_MULTI_ZONE:
+        coordinator = MultiZoneCoordinator(hass, entry)
+    else:
+        coordinator = ComfortCoordinator(hass, entry)
+
+    # The first refresh does not block setup: it waits until the source
+    # entities have states and is staggered behind the entries still waiting;
+    # the polls of the entry keep that offset
+    waiting = sum(
+        1 for c in hass.data[DOMAIN].values()
+        if isinstance(c, BaseComfortCoordinator) and c.first_refresh_pending
+    )
+    entry.async_on_unload(coordinator.async_schedule_first_refresh(waiting * STARTUP_STAGGER))
+    if coordinator.update_mode == UPDATE_MODE_EVENT:
+        entry.async_on_unload(coordinator.async_track_sources())
+    hass.data[DOMAIN][entry.entry_id] = coordinator
+    # Changed options take effect by setting the entry up again
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     # Forward the config entry setup to the 'sensor' platform
     await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
     return True
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     _LOGGER.debug("Unloading entry: %s", entry.entry_id)
-    return await hass.config_entries.async_forward_entry_unload(entry, "sensor")
-
+    unloaded = await hass.config_entries.async_forward_entry_unload(entry, "sensor")
+    if unloaded:
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+    return unloaded
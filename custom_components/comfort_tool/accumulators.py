@@ -0,0 +1,297 @@
+"""
+Streaming accumulators fed one sensor reading at a time.
+
+Each accumulator updates in O(1) per reading and keeps only a few numbers of
+state, so nothing has to be queried from the recorder. as_dict() / from_dict()
+convert the state to JSON-compatible dicts that entities persist across
+restarts as extra restore data.
+"""
+from datetime import datetime, time, timedelta
+
+from .const import (
+    DEFAULT_SET_THRESHOLD,
+    DEFAULT_STATS_PERIOD,
+    PERIOD_DAILY,
+    PERIOD_MONTHLY,
+    PERIOD_WEEKLY,
+    PERIOD_YEARLY,
+)
+
+# Weight of yesterday's running mean in the ASHRAE 55 prevailing mean outdoor
+# temperature; the standard allows 0.6 (fast) to 0.9 (slow)
+DEFAULT_ALPHA = 0.7
+
+# After a longer gap without readings the running mean starts over
+MAX_GAP_DAYS = 7
+
+
+class RunningMeanTemperature:
+    """
+    Exponentially weighted running mean of daily mean outdoor temperatures
+    (ASHRAE 55 prevailing mean outdoor temperature):
+
+        t_rm(d) = (1 - alpha) * t_day(d - 1) + alpha * t_rm(d - 1)
+
+    Readings are integrated over time within each local day, so irregular
+    reporting intervals do not bias the daily mean. Each reading holds until
+    the next one, including across midnight.
+    """
+
+    def __init__(self, alpha=DEFAULT_ALPHA):
+        self.alpha = alpha
+        self.mean = None  # running mean up to the end of the last complete day
+        self.days = 0  # complete days in the running mean
+        self._day_sum = 0.0  # integral of the readings over the current day (°C·s)
+        self._day_seconds = 0.0
+        self._last_value = None
+        self._last_time = None
+
+    @property
+    def value(self):
+        """
+        The prevailing mean outdoor temperature. Until the first day is
+        complete the mean of the current day so far is used as an estimate.
+        """
+        if self.mean is not None:
+            return self.mean
+        if self._day_seconds > 0:
+            return self._day_sum / self._day_seconds
+        return self._last_value
+
+    def add(self, value, timestamp):
+        """Adds a reading taken at timestamp (timezone-aware, local time)."""
+        last = self._last_time
+        if last is not None and timestamp < last:
+            # Out-of-order reading
+            return
+
+        if last is not None:
+            if (timestamp.date() - last.date()).days > MAX_GAP_DAYS:
+                self.reset()
+            else:
+                while last.date() < timestamp.date():
+                    midnight = datetime.combine(last.date() + timedelta(days=1), time(), last.tzinfo)
+                    self._integrate(midnight - last)
+                    self._close_day()
+                    last = midnight
+                self._integrate(timestamp - last)
+
+        self._last_value = value
+        self._last_time = timestamp
+
+    def reset(self):
+        self.__init__(self.alpha)
+
+    def _integrate(self, interval):
+        seconds = interval.total_seconds()
+        self._day_sum += self._last_value * seconds
+        self._day_seconds += seconds
+
+    def _close_day(self):
+        day_mean = self._day_sum / self._day_seconds if self._day_seconds > 0 else self._last_value
+        if self.mean is None:
+            self.mean = day_mean
+        else:
+            self.mean = (1 - self.alpha) * day_mean + self.alpha * self.mean
+        self.days += 1
+        self._day_sum = 0.0
+        self._day_seconds = 0.0
+
+    def as_dict(self):
+        return {
+            "alpha": self.alpha,
+            "mean": self.mean,
+            "days": self.days,
+            "day_sum": self._day_sum,
+            "day_seconds": self._day_seconds,
+            "last_value": self._last_value,
+            "last_time": self._last_time.isoformat() if self._last_time else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data, alpha=None):
+        """
+        Restores the state saved by as_dict(). A different alpha discards the
+        saved running mean, which was computed with the old weight.
+        """
+        accumulator = cls(alpha if alpha is not None else data["alpha"])
+        if accumulator.alpha != data["alpha"]:
+            return accumulator
+        accumulator.mean = data["mean"]
+        accumulator.days = data["days"]
+        accumulator._day_sum = data["day_sum"]
+        accumulator._day_seconds = data["day_seconds"]
+        accumulator._last_value = data["last_value"]
+        if data["last_time"]:
+            accumulator._last_time = datetime.fromisoformat(data["last_time"])
+        return accumulator
+
+
+# |PMV| limit of "in comfort" and PPD limit of the exceedance hours (ISO 7730 class B)
+PMV_LIMIT = 0.5
+PPD_LIMIT = 10.0
+
+
+def period_start(timestamp, period):
+    """Start of the reset period containing timestamp (local time), or None."""
+    day = datetime.combine(timestamp.date(), time(), timestamp.tzinfo)
+    if period == PERIOD_DAILY:
+        return day
+    if period == PERIOD_WEEKLY:
+        return day - timedelta(days=day.weekday())
+    if period == PERIOD_MONTHLY:
+        return day.replace(day=1)
+    if period == PERIOD_YEARLY:
+        return day.replace(month=1, day=1)
+    return None
+
+
+def period_end(start, period):
+    """End of the reset period beginning at start."""
+    if period == PERIOD_DAILY:
+        return start + timedelta(days=1)
+    if period == PERIOD_WEEKLY:
+        return start + timedelta(days=7)
+    if period == PERIOD_MONTHLY:
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    return start.replace(year=start.year + 1)
+
+
+class ComfortStatistics:
+    """
+    Time-weighted comfort statistics of one zone over a reset period:
+
+    - time in comfort: share of the occupied time with |PMV| <= PMV_LIMIT (%)
+    - PPD exceedance hours: occupied hours with PPD > PPD_LIMIT
+    - SET degree-hours: integral of max(0, SET - set_threshold) over the
+      occupied time (°C·h)
+
+    Each result of calculate_thermal_comfort holds until the next one, so the
+    statistics do not depend on how often the model runs. When a reading falls
+    into a new period the totals of the finished one move to last_period.
+    """
+
+    def __init__(self, period=DEFAULT_STATS_PERIOD, set_threshold=DEFAULT_SET_THRESHOLD):
+        self.period = period
+        self.set_threshold = set_threshold
+        self.period_start = None
+        self.last_period = None
+        self._clear()
+        self._sample = None  # (pmv, ppd, set, occupied) held since _last_time
+        self._last_time = None
+
+    def _clear(self):
+        self.occupied_seconds = 0.0
+        self.comfort_seconds = 0.0
+        self.ppd_exceedance_seconds = 0.0
+        self.set_degree_seconds = 0.0
+
+    @property
+    def time_in_comfort(self):
+        if not self.occupied_seconds:
+            return None
+        return 100 * self.comfort_seconds / self.occupied_seconds
+
+    @property
+    def ppd_exceedance_hours(self):
+        return self.ppd_exceedance_seconds / 3600
+
+    @property
+    def set_degree_hours(self):
+        return self.set_degree_seconds / 3600
+
+    def add(self, result, timestamp, occupied=True):
+        """
+        Adds a calculate_thermal_comfort result valid from timestamp
+        (timezone-aware, local time). Empty results stop the integration
+        until the next valid one.
+        """
+        if self._last_time is not None and timestamp < self._last_time:
+            return
+
+        start = period_start(timestamp, self.period)
+        if self.period_start is None:
+            self.period_start = start
+        elif start is not None and start > self.period_start:
+            # Finish the old period at its end, then start the new one. The
+            # held result carries over into the new period.
+            self._integrate(period_end(self.period_start, self.period))
+            self.last_period = self.totals()
+            self.period_start = start
+            self._clear()
+            if self._last_time is not None:
+                self._last_time = max(self._last_time, start)
+
+        self._integrate(timestamp)
+        sample = tuple(result.get(k) for k in ("pmv", "ppd", "set")) if result else (None,) * 3
+        self._sample = sample + (occupied,) if any(v is not None for v in sample) else None
+        self._last_time = timestamp
+
+    def pause(self):
+        """Drops the held result, e.g. for the time Home Assistant was down."""
+        self._sample = None
+
+    def _integrate(self, until):
+        if self._sample is None or self._last_time is None or until <= self._last_time:
+            return
+        pmv, ppd, set_val, occupied = self._sample
+        if not occupied:
+            return
+        seconds = (until - self._last_time).total_seconds()
+        self.occupied_seconds += seconds
+        if pmv is not None and abs(pmv) <= PMV_LIMIT:
+            self.comfort_seconds += seconds
+        if ppd is not None and ppd > PPD_LIMIT:
+            self.ppd_exceedance_seconds += seconds
+        if set_val is not None and set_val > self.set_threshold:
+            self.set_degree_seconds += (set_val - self.set_threshold) * seconds
+
+    def totals(self):
+        return {
+            "period_start": self.period_start.isoformat() if self.period_start else None,
+            "occupied_hours": round(self.occupied_seconds / 3600, 3),
+            "time_in_comfort": round(self.time_in_comfort, 2) if self.time_in_comfort is not None else None,
+            "ppd_exceedance_hours": round(self.ppd_exceedance_hours, 3),
+            "set_degree_hours": round(self.set_degree_hours, 3),
+        }
+
+    def as_dict(self):
+        return {
+            "period": self.period,
+            "set_threshold": self.set_threshold,
+            "period_start": self.period_start.isoformat() if self.period_start else None,
+            "last_period": self.last_period,
+            "occupied_seconds": self.occupied_seconds,
+            "comfort_seconds": self.comfort_seconds,
+            "ppd_exceedance_seconds": self.ppd_exceedance_seconds,
+            "set_degree_seconds": self.set_degree_seconds,
+            "sample": list(self._sample) if self._sample else None,
+            "last_time": self._last_time.isoformat() if self._last_time else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data, period=None, set_threshold=None):
+        """
+        Restores the state saved by as_dict(). A different reset period or SET
+        threshold starts the statistics over.
+        """
+        accumulator = cls(
+            period if period is not None else data["period"],
+            set_threshold if set_threshold is not None else data["set_threshold"],
+        )
+        if (accumulator.period, accumulator.set_threshold) != (data["period"], data["set_threshold"]):
+            return accumulator
+        if data["period_start"]:
+            accumulator.period_start = datetime.fromisoformat(data["period_start"])
+        accumulator.last_period = data["last_period"]
+        accumulator.occupied_seconds = data["occupied_seconds"]
+        accumulator.comfort_seconds = data["comfort_seconds"]
+        accumulator.ppd_exceedance_seconds = data["ppd_exceedance_seconds"]
+        accumulator.set_degree_seconds = data["set_degree_seconds"]
+        if data["sample"]:
+            accumulator._sample = tuple(data["sample"])
+        if data["last_time"]:
+            accumulator._last_time = datetime.fromisoformat(data["last_time"])
+        return accumulator
@@ -0,0 +1,713 @@
+"""
+Vectorized (NumPy) counterparts of the scalar comfort models and
+psychrometric conversions.
+
+Every function accepts scalars or array-likes, broadcasts them against each
+other and returns a dict with the same keys as its scalar counterpart in
+comfort.py, holding arrays of the broadcast shape. Elements that fail to
+converge are returned as NaN instead of raising, so one bad input does not
+invalidate a whole batch.
+"""
+import logging
+
+import numpy as np
+
+from . import psychrometrics as psy
+from . import solver
+from .comfort import STILL_AIR_THRESHOLD, get_sensation_by_class, pierce_set
+from .const import METRICS, PHYSIOLOGY
+
+# A pierce_set_batch call has a fixed overhead of several dozen scalar
+# pierce_set runs. Once only a few elements remain in an iterative solve they
+# are finished one by one with the scalar model instead.
+SCALAR_TAIL = 8
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _broadcast(*args):
+    """Returns float copies of args broadcast to a common shape, flattened."""
+    arrays = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in args))
+    shape = arrays[0].shape
+    return shape, [a.ravel().copy() for a in arrays]
+
+
+def pmv_batch(ta, tr, vel, rh, met, clo, wme=0):
+    """
+    PMV and PPD for many conditions at once. Mirrors comfort.pmv.
+
+    The clothing surface temperature iteration runs for all elements together;
+    elements that have converged are masked out of further iterations.
+
+    Returns:
+        dict with keys: pmv, ppd, hl1 to hl6 (arrays)
+    """
+    shape, (ta, tr, vel, rh, met, clo, wme) = _broadcast(ta, tr, vel, rh, met, clo, wme)
+
+    pa = rh * 10 * np.exp(16.6536 - 4030.183 / (ta + 235))
+    icl = 0.155 * clo
+    m = met * 58.15
+    w = wme * 58.15
+    mw = m - w
+
+    fcl = np.where(icl <= 0.078, 1 + 1.29 * icl, 1.05 + 0.645 * icl)
+
+    hcf = 12.1 * np.sqrt(vel)
+    taa = ta + 273
+    tra = tr + 273
+    t_cla = taa + (35.5 - ta) / (3.5 * icl + 0.1)
+
+    p1 = icl * fcl
+    p2 = p1 * 3.96
+    p3 = p1 * 100
+    p4 = p1 * taa
+    p5 = 308.7 - 0.028 * mw + p2 * ((tra / 100) ** 4)
+
+    xn = t_cla / 100
+    xf = t_cla / 50
+    hc = hcf.copy()
+    eps = 0.00015
+    n = 0
+
+    active = np.nonzero(np.abs(xn - xf) > eps)[0]
+    while active.size:
+        xf[active] = (xf[active] + xn[active]) / 2
+        hcn = 2.38 * np.abs(100.0 * xf[active] - taa[active]) ** 0.25
+        hc[active] = np.maximum(hcf[active], hcn)
+        xn[active] = (
+            p5[active] + p4[active] * hc[active] - p2[active] * (xf[active] ** 4)
+        ) / (100 + p3[active] * hc[active])
+        active = active[np.abs(xn[active] - xf[active]) > eps]
+        n += 1
+        if n > 150:
+            _LOGGER.warning("PMV did not converge for %d of %d inputs", active.size, xn.size)
+            xn[active] = np.nan
+            break
+
+    tcl = 100 * xn - 273
+
+    hl1 = 3.05 * 0.001 * (5733 - 6.99 * mw - pa)
+    hl2 = np.where(mw > 58.15, 0.42 * (mw - 58.15), 0.0)
+    hl3 = 1.7e-5 * m * (5867 - pa)
+    hl4 = 0.0014 * m * (34 - ta)
+    hl5 = 3.96 * fcl * ((xn ** 4) - (tra / 100) ** 4)
+    hl6 = fcl * hc * (tcl - ta)
+
+    ts = 0.303 * np.exp(-0.036 * m) + 0.028
+    pmv = ts * (mw - hl1 - hl2 - hl3 - hl4 - hl5 - hl6)
+    ppd = 100.0 - 95.0 * np.exp(-0.03353 * pmv ** 4 - 0.2179 * pmv ** 2)
+
+    result = {
+        "pmv": pmv,
+        "ppd": ppd,
+        "hl1": hl1,
+        "hl2": hl2,
+        "hl3": hl3,
+        "hl4": hl4,
+        "hl5": hl5,
+        "hl6": hl6
+    }
+    return {k: v.reshape(shape) for k, v in result.items()}
+
+
+def _saturated_vapor_pressure_torr(t):
+    """Array version of util.FindSaturatedVaporPressureTorr."""
+    return np.exp(18.6686 - 4030.183 / (t + 235.0))
+
+
+def pierce_set_batch(
+    ta,
+    tr,
+    vel,
+    rh,
+    met,
+    clo,
+    wme=0,
+    round_output=False,
+    calculate_ce=False,
+    max_skin_blood_flow=90,
+    body_position="sitting"
+):
+    """
+    Two-node SET model for many conditions at once. Mirrors comfort.pierce_set.
+
+    All elements advance through the 60 one-minute steps together. The branches
+    of the scalar model (blood flow and sweating limits, critical wettedness,
+    negative EMAX) are applied as masks, and the inner clothing temperature
+    iteration and the final SET Newton solve run per element until each one
+    converges. Results agree with the scalar model to within 1e-6 °C.
+
+    Returns:
+        dict with the same keys as comfort.pierce_set (arrays)
+    """
+    shape, (ta, tr, vel, rh, met, clo, wme) = _broadcast(ta, tr, vel, rh, met, clo, wme)
+
+    SBC = 5.6697e-8  # Stefan-Boltzmann constant
+    DELTA = 0.0001
+    MetFactor = 58.2
+    BodyWeight = 69.9
+    BodySurfaceArea = 1.8258
+    KClo = 0.25
+    CSW = 170
+    CDil = 120
+    CStr = 0.5
+    TempSkinNeutral = 33.7
+    TempCoreNeutral = 36.8
+    TempBodyNeutral = 0.1 * TempSkinNeutral + 0.9 * TempCoreNeutral
+    SkinBloodFlowNeutral = 6.3
+    VaporPressure = rh * _saturated_vapor_pressure_torr(ta) / 100
+    AirSpeed = np.maximum(vel, 0.1)
+    p = psy.PROP["Patm"] / 1000
+    PressureInAtmospheres = p * 0.009869
+    LTime = 60
+    RCl = 0.155 * clo
+    FACL = 1.0 + 0.15 * clo
+    LR = 2.2 / PressureInAtmospheres
+    RM = met * MetFactor
+    M = RM.copy()
+
+    no_clo = clo <= 0
+    WCRIT = np.where(no_clo, 0.38 * AirSpeed**-0.29, 0.59 * AirSpeed**-0.08)
+    ICL = np.where(no_clo, 1.0, 0.45)
+
+    heatTransferConvMet = np.where(
+        met < 0.85, 3.0, 5.66 * np.maximum(met - 0.85, 0.0) ** 0.39
+    )
+    CHC = np.maximum(3.0 * PressureInAtmospheres**0.53, 8.600001 * (AirSpeed * PressureInAtmospheres)**0.53)
+    if not calculate_ce:
+        CHC = np.maximum(CHC, heatTransferConvMet)
+
+    # Radiative coefficient factor depends only on posture
+    rad = 0.7 if body_position == "sitting" else 0.73
+
+    CHR = np.full_like(ta, 4.7)
+    CTC = CHR + CHC
+    RA = 1.0 / (FACL * CTC)
+    TOP = (CHR * tr + CHC * ta) / CTC
+    TempSkin = np.full_like(ta, TempSkinNeutral)
+    TempCore = np.full_like(ta, TempCoreNeutral)
+    SkinBloodFlow = np.full_like(ta, SkinBloodFlowNeutral)
+    ALFA = np.full_like(ta, 0.1)
+    ESK = 0.1 * met
+    TCL = TOP + (TempSkin - TOP) / (CTC * (RA + RCl))
+
+    ExcBloodFlow = np.zeros(ta.shape, dtype=bool)
+    ExcRegulatorySweating = np.zeros(ta.shape, dtype=bool)
+    ExcCriticalWettedness = np.zeros(ta.shape, dtype=bool)
+
+    # Loop invariants
+    TCSK_FACTOR = 0.97 * BodyWeight
+    REA = 1.0 / (LR * FACL * CHC)
+    RECL = RCl / (LR * ICL)
+
+    for _ in range(LTime):
+        active = np.arange(ta.size)
+        for _ in range(100):
+            TCL_OLD = TCL[active]
+            CHR[active] = 4.0 * 0.95 * SBC * ((TCL_OLD + tr[active]) / 2.0 + 273.15) ** 3 * rad
+            CTC[active] = CHR[active] + CHC[active]
+            RA[active] = 1.0 / (FACL[active] * CTC[active])
+            TOP[active] = (CHR[active] * tr[active] + CHC[active] * ta[active]) / CTC[active]
+            TCL[active] = (RA[active] * TempSkin[active] + RCl[active] * TOP[active]) / (RA[active] + RCl[active])
+            active = active[np.abs(TCL[active] - TCL_OLD) > 0.01]
+            if not active.size:
+                break
+
+        DRY = (TempSkin - TOP) / (RA + RCl)
+        HFCS = (TempCore - TempSkin) * (5.28 + 1.163 * SkinBloodFlow)
+        ERES = 0.0023 * M * (44.0 - VaporPressure)
+        CRES = 0.0014 * M * (34.0 - ta)
+        SCR = M - HFCS - ERES - CRES - wme
+        SSK = HFCS - DRY - ESK
+        TCSK = TCSK_FACTOR * ALFA
+        TCCR = TCSK_FACTOR * (1 - ALFA)
+        DTSK = (SSK * BodySurfaceArea) / (TCSK * 60.0)
+        DTCR = (SCR * BodySurfaceArea) / (TCCR * 60.0)
+        TempSkin += DTSK
+        TempCore += DTCR
+        TB = ALFA * TempSkin + (1 - ALFA) * TempCore
+
+        SKSIG = TempSkin - TempSkinNeutral
+        COLDS = np.maximum(0.0, -SKSIG)
+        WARMS = np.maximum(0.0, SKSIG)
+        CRSIG = TempCore - TempCoreNeutral
+        COLDC = np.maximum(0.0, -CRSIG)
+        WARMC = np.maximum(0.0, CRSIG)
+        BDSIG = TB - TempBodyNeutral
+        WARMB = np.maximum(0.0, BDSIG)
+
+        SkinBloodFlow = (SkinBloodFlowNeutral + CDil * WARMC) / (1 + CStr * COLDS)
+        ExcBloodFlow |= SkinBloodFlow > max_skin_blood_flow
+        SkinBloodFlow = np.maximum(np.minimum(SkinBloodFlow, max_skin_blood_flow), 0.5)
+
+        REGSW = CSW * WARMB * np.exp(WARMS / 10.7)
+        ExcRegulatorySweating |= REGSW > 500
+        REGSW = np.minimum(REGSW, 500)
+
+        ERSW = 0.68 * REGSW
+        EMAX = (
+            _saturated_vapor_pressure_torr(TempSkin) - VaporPressure
+        ) / (REA + RECL)
+        positive = EMAX > 0
+        PRSW = np.divide(ERSW, EMAX, out=np.zeros_like(EMAX), where=positive)
+        PWET = 0.06 + 0.94 * PRSW
+        EDIF = np.where(positive, PWET * EMAX - ERSW, 0.0)
+
+        critical = PWET > WCRIT
+        PWET = np.where(critical, WCRIT, PWET)
+        PRSW = np.where(critical, WCRIT / 0.94, PRSW)
+        ERSW = np.where(critical, PRSW * EMAX, ERSW)
+        EDIF = np.where(critical, 0.06 * (1.0 - PRSW) * EMAX, EDIF)
+        ExcCriticalWettedness |= critical
+
+        negative = EMAX < 0
+        EDIF = np.where(negative, 0.0, EDIF)
+        ERSW = np.where(negative, 0.0, ERSW)
+        PWET = np.where(negative, WCRIT, PWET)
+        PRSW = np.where(negative, WCRIT, PRSW)
+
+        ESK = ERSW + EDIF
+        MSHIV = 19.4 * COLDS * COLDC
+        M = RM + MSHIV
+        ALFA = 0.0417737 + 0.7451833 / (SkinBloodFlow + 0.585417)
+
+    HSK = DRY + ESK
+    W = PWET
+    PSSK = _saturated_vapor_pressure_torr(TempSkin)
+    CHRS = CHR
+    CHCS = np.full_like(ta, max(3.0, 3.0 * PressureInAtmospheres**0.53))
+    if not calculate_ce:
+        CHCS = np.where(met > 0.85, np.maximum(CHCS, heatTransferConvMet), CHCS)
+    CTCS = CHCS + CHRS
+
+    RCLOS = 1.52 / (met - wme / MetFactor + 0.6944) - 0.1835
+    RCLS = 0.155 * RCLOS
+    FACLS = 1.0 + KClo * RCLOS
+    FCLS = 1.0 / (1.0 + 0.155 * FACLS * CTCS * RCLOS)
+    IMS = 0.45
+    ICLS = ((IMS * CHCS) / CTCS * (1 - FCLS)) / (CHCS / CTCS - FCLS * IMS)
+    RAS = 1.0 / (FACLS * CTCS)
+    REAS = 1.0 / (LR * FACLS * CHCS)
+    RECLS = RCLS / (LR * ICLS)
+    HD_S = 1.0 / (RAS + RCLS)
+    HE_S = 1.0 / (REAS + RECLS)
+
+    _set = TempSkin - HSK / HD_S
+    active = np.arange(ta.size)
+    for _ in range(100):
+        X_OLD = _set[active]
+        hsk, hd_s, he_s, w, tsk, pssk = (
+            HSK[active], HD_S[active], HE_S[active], W[active], TempSkin[active], PSSK[active]
+        )
+        ERR1 = hsk - hd_s * (tsk - X_OLD) - w * he_s * (pssk - 0.5 * _saturated_vapor_pressure_torr(X_OLD))
+        ERR2 = hsk - hd_s * (tsk - (X_OLD + DELTA)) - w * he_s * (pssk - 0.5 * _saturated_vapor_pressure_torr(X_OLD + DELTA))
+        _set[active] = X_OLD - (DELTA * ERR1) / (ERR2 - ERR1)
+        active = active[np.abs(_set[active] - X_OLD) > 0.01]
+        if not active.size:
+            break
+    else:
+        _LOGGER.warning("SET did not converge for %d of %d inputs", active.size, ta.size)
+        _set[active] = np.nan
+
+    result = {
+        "set": np.round(_set, 1) if round_output else _set,
+        "t_skin": TempSkin,
+        "t_core": TempCore,
+        "t_clo": TCL,
+        "t_mean_body": TB,
+        "q_tot_evap": ESK,
+        "q_sweat_evap": ERSW,
+        "q_vap_diff": EDIF,
+        "q_tot_sensible": DRY,
+        "q_tot_skin": HSK,
+        "q_resp": ERES,
+        "skin_wet": PWET * 100,
+        "thermal_strain": ExcRegulatorySweating | ExcBloodFlow | ExcCriticalWettedness
+    }
+    return {k: v.reshape(shape) for k, v in result.items()}
+
+
+def _pierce_set_values(ta, tr, vel, rh, met, clo, **options):
+    """
+    SET of pierce_set_batch for 1-D arrays (vel may be a scalar). Up to
+    SCALAR_TAIL elements are evaluated with the scalar model, which is
+    faster for them and gives exactly its results.
+    """
+    ta, tr, vel, rh, met, clo = np.broadcast_arrays(ta, tr, vel, rh, met, clo)
+    if ta.size > SCALAR_TAIL:
+        return pierce_set_batch(ta, tr, vel, rh, met, clo, **options)["set"]
+    return np.array([
+        pierce_set(*(float(x) for x in args), **options)["set"]
+        for args in zip(ta, tr, vel, rh, met, clo)
+    ])
+
+
+def cooling_effect_batch(ta, tr, vel, rh, met, clo, body_position="standing"):
+    """
+    Cooling Effect for many conditions at once. Solves the same objective as
+    comfort.cooling_effect with the same bracket and tolerances.
+
+    Every element runs its own Brent search (solver.brentq_steps, the
+    iteration of solver.brentq); the searches advance together and each
+    round evaluates the next points of all of them in one pierce_set_batch
+    call. Once at most SCALAR_TAIL searches remain they are evaluated with
+    the scalar model.
+
+    Returns:
+        array of CE values (°C), 0 where vel <= 0.1
+    """
+    shape, (ta, tr, vel, rh, met, clo) = _broadcast(ta, tr, vel, rh, met, clo)
+    ce = np.zeros_like(ta)
+
+    idx = np.nonzero(vel > 0.1)[0]
+    if not idx.size:
+        return ce.reshape(shape)
+
+    ce_l = 0.0
+    ce_r = 40.0
+    eps = 0.001  # accuracy threshold
+
+    options = dict(wme=0, calculate_ce=True, max_skin_blood_flow=90, body_position=body_position)
+
+    # Reference SET at current air speed
+    set_ref = np.full_like(ta, np.nan)
+    set_ref[idx] = _pierce_set_values(ta[idx], tr[idx], vel[idx], rh[idx], met[idx], clo[idx], **options)
+
+    # Target function: difference in SET with reduced temperature and still air
+    def fn(i, x):
+        set_still = _pierce_set_values(
+            ta[i] - x, tr[i] - x, STILL_AIR_THRESHOLD, rh[i], met[i], clo[i], **options
+        )
+        return set_ref[i] - set_still
+
+    # fn(0) >= 0: air movement does not cool, CE is zero
+    f_l = fn(idx, ce_l)
+    cooling = f_l < -eps
+    searches = {
+        i: solver.brentq_steps(ce_l, ce_r, xtol=eps, ftol=eps, fa=float(f))
+        for i, f in zip(idx[cooling], f_l[cooling])
+    }
+    points = {i: next(steps) for i, steps in searches.items()}
+    while points:
+        active = np.fromiter(points, dtype=int, count=len(points))
+        values = fn(active, np.array([points[i] for i in active]))
+        for i, value in zip(active, values):
+            try:
+                points[i] = searches[i].send(float(value))
+            except StopIteration as stop:
+                del points[i]
+                if stop.value.converged:
+                    ce[i] = round(max(0.0, stop.value.root), 2)
+                else:
+                    _LOGGER.warning("Cooling effect did not converge (%s)", stop.value.flag)
+
+    return ce.reshape(shape)
+
+
+def pmv_elevated_airspeed_batch(ta, tr, vel, rh, met, clo, wme=0, outputs=None):
+    """
+    Comfort parameters accounting for elevated air speed for many conditions
+    at once. Mirrors comfort.pmv_elevated_airspeed (without precomputed
+    values or warm starts).
+
+    Returns:
+        dict with the same keys as comfort.pmv_elevated_airspeed (arrays,
+        NaN for skipped results; thermal_strain as 0 / 1)
+    """
+    shape, (ta, tr, vel, rh, met, clo, wme) = _broadcast(ta, tr, vel, rh, met, clo, wme)
+    if outputs is None:
+        outputs = ("pmv", "set", "cooling_effect")
+    need_pmv = "pmv" in outputs or "ppd" in outputs
+    nan = np.full_like(ta, np.nan)
+
+    # comfort.relative_air_speed and comfort.dynamic_clothing
+    rel_vel = np.where(met > 1, vel + 0.3 * (met - 1), vel)
+    dyn_clo = np.where(met > 1.2, clo * (0.6 + 0.4 / met), clo)
+
+    result = {"pmv": nan, "ppd": nan, "set": nan, "ta_adj": nan, "tr_adj": nan, "cooling_effect": nan}
+    result.update(dict.fromkeys(PHYSIOLOGY, nan))
+    if need_pmv or "cooling_effect" in outputs:
+        ce = cooling_effect_batch(ta, tr, rel_vel, rh, met, dyn_clo)
+        ce = np.where(rel_vel <= 0.1, 0.0, ce)
+        still = ce == 0
+        ta_adj = ta - ce
+        tr_adj = tr - ce
+        if need_pmv:
+            pmv_result = pmv_batch(
+                ta_adj, tr_adj, np.where(still, rel_vel, STILL_AIR_THRESHOLD), rh, met, dyn_clo, wme
+            )
+            result["pmv"] = pmv_result["pmv"]
+            result["ppd"] = pmv_result["ppd"]
+        result.update(ta_adj=ta_adj, tr_adj=tr_adj, cooling_effect=ce)
+
+    if "set" in outputs:
+        set_result = pierce_set_batch(ta, tr, vel, rh, met, clo, wme)
+        result["set"] = set_result["set"]
+        result.update({k: np.where(np.isnan(set_result["set"]), np.nan, set_result[k]) for k in PHYSIOLOGY})
+
+    return {k: v.reshape(shape) for k, v in result.items()}
+
+
+def _round(values, digits):
+    """
+    round() of each element. np.round scales, rounds half to even and scales
+    back, so it differs from the scalar model's round() on values such as
+    0.05 (np.round gives 0.0, round 0.1).
+    """
+    return np.array([round(v, digits) for v in values.ravel().tolist()]).reshape(values.shape)
+
+
+def calculate_thermal_comfort_batch(ta, tr, va, rh, clo, met, wme=0, metrics=None):
+    """
+    Array version of comfort.calculate_thermal_comfort: the same rounding
+    (see _round), with NaN for metrics that were not requested or failed and
+    an object array of sensation labels (None where PMV is missing) for
+    "ts". The PHYSIOLOGY keys of the SET run are included too (NaN where SET
+    is missing or not requested), thermal_strain as an object array of bools
+    (None where SET is missing).
+    """
+    if metrics is None:
+        metrics = METRICS
+    outputs = set()
+    if {"pmv", "ppd", "ts"} & set(metrics):
+        outputs.add("pmv")
+    if "set" in metrics:
+        outputs.add("set")
+    if "ce" in metrics:
+        outputs.add("cooling_effect")
+
+    comfort = pmv_elevated_airspeed_batch(ta, tr, va, rh, met, clo, wme, outputs=outputs)
+    pmv = _round(comfort["pmv"], 2)
+    ts = np.empty(pmv.shape, dtype=object)
+    ts.ravel()[:] = [
+        None if np.isnan(p) else get_sensation_by_class(p, "B") for p in comfort["pmv"].ravel()
+    ]
+    result = {
+        "pmv": pmv,
+        "ppd": _round(comfort["ppd"], 0),
+        "set": _round(comfort["set"], 1),
+        "ce": _round(comfort["cooling_effect"], 1),
+        "ts": ts,
+    }
+    strain = np.empty(pmv.shape, dtype=object)
+    if "set" in outputs:
+        result.update({k: _round(comfort[k], 2) for k in PHYSIOLOGY})
+        strain.ravel()[:] = [
+            None if np.isnan(s) else bool(s) for s in comfort["thermal_strain"].ravel()
+        ]
+    else:
+        result.update({k: comfort[k] for k in PHYSIOLOGY})
+    result["thermal_strain"] = strain
+    return result
+
+
+
+def as_scalar(value):
+    """A batch element as a plain Python value, None for NaN."""
+    if value is None or isinstance(value, (str, bool)):
+        return value
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def _bisect_batch(idx, fn, a, b, epsilon):
+    """
+    Vectorized bisection for fn(idx, x) == 0 on [a, b] (scalars or one bound
+    per element) with endpoint values cached between iterations. Returns NaN
+    where the root is not bracketed.
+    """
+    a = np.broadcast_to(np.asarray(a, dtype=float), idx.shape).copy()
+    b = np.broadcast_to(np.asarray(b, dtype=float), idx.shape).copy()
+    fa = fn(idx, a)
+    fb = fn(idx, b)
+    root = np.full(idx.size, np.nan)
+
+    bracketed = np.sign(fa) * np.sign(fb) < 0
+    active = np.nonzero(bracketed)[0]
+    while active.size and np.any(np.abs(b[active] - a[active]) > 2 * epsilon):
+        midpoint = (a[active] + b[active]) / 2
+        fm = fn(idx[active], midpoint)
+        left = np.sign(fa[active]) * np.sign(fm) < 0
+        b[active] = np.where(left, midpoint, b[active])
+        fb[active] = np.where(left, fm, fb[active])
+        a[active] = np.where(left, a[active], midpoint)
+        fa[active] = np.where(left, fa[active], fm)
+        # A midpoint that is an exact root ends the search of its element
+        exact = fm == 0
+        b[active[exact]] = midpoint[exact]
+        active = active[~exact]
+
+    root[bracketed] = (a[bracketed] + b[bracketed]) / 2
+    return root
+
+
+
+def _ln_satpress_batch(tKel):
+    """Array version of psychrometrics._ln_satpress: (ln(satpress), slope)."""
+    ice = tKel < 273.15
+    value = np.where(
+        ice,
+        -5674.5359 / tKel
+        + 6.3925247
+        + tKel * (-0.009677843 + tKel * (0.00000062215701 + tKel * (0.0000000020747825 - 0.0000000000009484024 * tKel)))
+        + 4.1635019 * np.log(tKel),
+        -5800.2206 / tKel
+        + 1.3914993
+        + tKel * (-0.048640239 + tKel * (0.000041764768 + tKel * -0.000000014452093))
+        + 6.5459673 * np.log(tKel),
+    )
+    slope = np.where(
+        ice,
+        5674.5359 / tKel**2
+        - 0.009677843
+        + tKel * (2 * 0.00000062215701 + tKel * (3 * 0.0000000020747825 - 4 * 0.0000000000009484024 * tKel))
+        + 4.1635019 / tKel,
+        5800.2206 / tKel**2
+        - 0.048640239
+        + tKel * (2 * 0.000041764768 + tKel * 3 * -0.000000014452093)
+        + 6.5459673 / tKel,
+    )
+    return value, slope
+
+
+def satpress_batch(tdb):
+    """Array version of psychrometrics.satpress (Pa)."""
+    tKel = np.asarray(tdb, dtype=float) + psy.PROP["TKelConv"]
+    return np.exp(_ln_satpress_batch(tKel)[0])
+
+
+def sattemp_batch(p):
+    """
+    Array version of psychrometrics.sattemp: the same Newton iteration on
+    ln(satpress), advanced for all elements together. NaN where p <= 0.
+    """
+    p = np.asarray(p, dtype=float)
+    shape = p.shape
+    p = p.ravel()
+    t = np.full(p.shape, np.nan)
+
+    idx = np.nonzero(p > 0)[0]
+    lnp = np.log(p[idx])
+    gamma = np.log(p[idx] / 611.2)
+    tKel = 243.12 * gamma / (17.62 - gamma) + psy.PROP["TKelConv"]
+    tKel = np.where(p[idx] >= psy.P_TRIPLE, np.maximum(tKel, 273.15), np.minimum(tKel, 273.15 - 1e-9))
+
+    for _ in range(20):
+        if not idx.size:
+            break
+        value, slope = _ln_satpress_batch(tKel)
+        step = (value - lnp) / slope
+        tKel = tKel - step
+        done = np.abs(step) < 1e-9
+        t[idx[done]] = tKel[done] - psy.PROP["TKelConv"]
+        idx, lnp, tKel = idx[~done], lnp[~done], tKel[~done]
+
+    t[idx] = tKel - psy.PROP["TKelConv"]
+    return t.reshape(shape)
+
+
+def dewpoint_batch(w):
+    """Array version of psychrometrics.dewpoint."""
+    w = np.asarray(w, dtype=float)
+    return sattemp_batch((psy.PROP["Patm"] * w) / (0.62198 + w))
+
+
+def wetbulb_batch(tdb, w, tdp=None):
+    """
+    Array version of psychrometrics.wetbulb: a vectorized bisection on
+    [tdp - 1, tdb + 1], and on [-100, tdb + 5] for the elements where that
+    bracket fails.
+    """
+    shape, (tdb, w) = _broadcast(tdb, w)
+    tdp = dewpoint_batch(w) if tdp is None else np.broadcast_to(tdp, shape).ravel()
+    P = psy.PROP
+
+    def fn(i, t):
+        w_star = psy.humratio(P["Patm"], satpress_batch(t))
+        newW = ((P["Hfg"] - P["CpWat"] - P["CpVap"] * t) * w_star - P["CpAir"] * (tdb[i] - t)) / \
+               (P["Hfg"] + P["CpVap"] * tdb[i] - P["CpWat"] * t)
+        return w[i] - newW
+
+    idx = np.arange(tdb.size)
+    # NaN bounds (no dew point) are never bracketed
+    twb = _bisect_batch(idx, fn, tdp - 1, tdb + 1, 0.005)
+    failed = np.nonzero(np.isnan(twb))[0]
+    if failed.size:
+        twb[failed] = _bisect_batch(failed, fn, -100, tdb[failed] + 5, 0.005)
+    return twb.reshape(shape)
+
+
+def _derived_batch(result, tdb, outputs):
+    """Array version of psychrometrics._derived."""
+    wanted = [k for k in psy.DERIVED if (outputs is None or k in outputs) and k not in result]
+    if wanted:
+        tdp = result.get("dewpoint")
+        if tdp is None:
+            tdp = dewpoint_batch(result["w"])
+        if "dewpoint" in wanted:
+            result["dewpoint"] = tdp
+        if "wetbulb" in wanted:
+            result["wetbulb"] = wetbulb_batch(tdb, result["w"], tdp)
+    return result
+
+
+def tdb_rh_batch(tdb, rh, outputs=None):
+    """Array version of psychrometrics.tdb_rh."""
+    shape, (tdb, rh) = _broadcast(tdb, rh)
+    vappress = (rh / 100) * satpress_batch(tdb)
+    w = psy.humratio(psy.PROP["Patm"], vappress)
+    result = _derived_batch({"rh": rh, "vappress": vappress, "w": w}, tdb, outputs)
+    return {k: v.reshape(shape) for k, v in result.items()}
+
+
+def tdb_twb_batch(tdb, twb, outputs=None):
+    """Array version of psychrometrics.tdb_twb."""
+    shape, (tdb, twb) = _broadcast(tdb, twb)
+    P = psy.PROP
+    wstar = psy.humratio(P["Patm"], satpress_batch(twb))
+    w = ((P["Hfg"] + (P["CpVap"] - P["CpWat"]) * twb) * wstar - P["CpAir"] * (tdb - twb)) / \
+        (P["Hfg"] + P["CpVap"] * tdb - P["CpWat"] * twb)
+    psat = satpress_batch(tdb)
+    rh = 100 * psy.relhum(P["Patm"], psat, w)
+    result = _derived_batch(
+        {"wetbulb": twb, "w": w, "rh": rh, "vappress": (rh / 100) * psat}, tdb, outputs
+    )
+    return {k: v.reshape(shape) for k, v in result.items()}
+
+
+def tdb_w_batch(tdb, w, outputs=None, tdp=None):
+    """Array version of psychrometrics.tdb_w."""
+    shape, (tdb, w) = _broadcast(tdb, w)
+    psat = satpress_batch(tdb)
+    rh = 100 * psy.relhum(psy.PROP["Patm"], psat, w)
+    result = {"w": w, "rh": np.where(rh <= 100, rh, np.nan), "vappress": (rh / 100) * psat}
+    if tdp is not None:
+        result["dewpoint"] = np.broadcast_to(tdp, shape).ravel()
+    result = _derived_batch(result, tdb, outputs)
+    return {k: v.reshape(shape) for k, v in result.items()}
+
+
+def tdb_dewpoint_batch(tdb, dewpoint_temp, outputs=None):
+    """Array version of psychrometrics.tdb_dewpoint."""
+    shape, (tdb, tdp) = _broadcast(tdb, dewpoint_temp)
+    w = psy.humratio(psy.PROP["Patm"], satpress_batch(tdp))
+    return tdb_w_batch(tdb.reshape(shape), w.reshape(shape), outputs, tdp=tdp.reshape(shape))
+
+
+def tdb_vappress_batch(tdb, vappress, outputs=None):
+    """Array version of psychrometrics.tdb_vappress."""
+    shape, (tdb, vappress) = _broadcast(tdb, vappress)
+    rh = (100 * vappress) / satpress_batch(tdb)
+    return tdb_rh_batch(tdb.reshape(shape), rh.reshape(shape), outputs)
+
+
+def convert_batch(x, tdb, origin, target):
+    """Array version of psychrometrics.convert."""
+    converters = {
+        "rh": tdb_rh_batch,
+        "wetbulb": tdb_twb_batch,
+        "w": tdb_w_batch,
+        "dewpoint": tdb_dewpoint_batch,
+        "vappress": tdb_vappress_batch,
+    }
+    return converters[origin](tdb, x, outputs=(target,))[target]
@@ -0,0 +1,68 @@
+import time
+from collections import OrderedDict
+
+from .const import DEFAULT_CACHE_SIZE, DEFAULT_RESOLUTION
+
+INPUTS = ["ta", "tr", "va", "rh", "clo", "met"]
+
+
+class ComfortCache:
+    """
+    Bounded LRU cache of comfort results, shared by all zones.
+
+    Inputs are quantized to a configurable resolution before the lookup, and the
+    model is then evaluated on the quantized values, so a cached result is the
+    exact result for its key no matter which zone computed it first.
+    Entries expire after ttl seconds if a ttl is given.
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE, ttl=None, resolution=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.resolution = {**DEFAULT_RESOLUTION, **(resolution or {})}
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def quantize(self, inputs):
+        """
+        Returns (key, quantized inputs) for a dict with the keys in INPUTS.
+        """
+        key = tuple(round(inputs[k] / self.resolution[k]) for k in INPUTS)
+        quantized = {k: round(n * self.resolution[k], 6) for k, n in zip(INPUTS, key)}
+        return key, quantized
+
+    def get(self, key):
+        """Returns the cached result for key, or None on a miss."""
+        item = self._data.get(key)
+        if item is not None:
+            stored_at, result = item
+            if self.ttl is None or time.monotonic() - stored_at <= self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return result
+            del self._data[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, result):
+        if self.max_size <= 0:
+            return
+        self._data[key] = (time.monotonic(), result)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    @property
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
@@ -0,0 +1,98 @@
+"""
+Comfort zone boundaries and PMV / SET grids for psychrometric charts.
+
+Both are evaluated with the batch models over a (ta x rh) grid with the mean
+radiant temperature equal to the air temperature, as on the ASHRAE 55
+psychrometric chart. Results are plain lists (NaN as None) so they can be
+returned from a service call as they are.
+"""
+import numpy as np
+
+from . import psychrometrics as psy
+from .batch import _bisect_batch, pierce_set_batch, pmv_elevated_airspeed_batch, satpress_batch
+
+# Air temperature range of the charts (°C)
+TA_RANGE = (10.0, 40.0)
+
+# PMV limits of the comfort zone (ASHRAE 55 / ISO 7730 class B)
+PMV_LIMITS = (-0.5, 0.5)
+
+GRID_METRICS = ["pmv", "set"]
+
+
+def _list(values, digits):
+    return [None if np.isnan(v) else round(float(v), digits) for v in values]
+
+
+def humidity_ratio(ta, rh):
+    """Humidity ratio (g/kg dry air) of air at ta (°C) and rh (%)."""
+    return 1000 * psy.humratio(psy.PROP["Patm"], np.asarray(rh) / 100 * satpress_batch(ta))
+
+
+def comfort_zone(clo, met, va, resolution=30, grid=()):
+    """
+    The PMV comfort zone for clo, met and va.
+
+    For each of resolution + 1 relative humidities from 0 to 100 % the air
+    temperatures where PMV reaches each of PMV_LIMITS are found by a
+    vectorized bisection over TA_RANGE, all boundary points together.
+
+    grid: metrics of GRID_METRICS to evaluate additionally on a
+    (resolution + 1) x (resolution + 1) grid of ta x rh.
+
+    Returns:
+        dict with
+        "rh": the humidity axis (%),
+        "ta_cold", "ta_warm": boundary temperatures per rh (°C, None where the
+            limit is outside TA_RANGE),
+        "polygon": {"ta": [...], "w": [...]}, the closed boundary in chart
+            coordinates (humidity ratio in g/kg), cold side upwards, warm
+            side downwards,
+        and with a grid: "ta" (the temperature axis) and one list of rows
+        per metric, indexed [rh][ta].
+    """
+    rh = np.linspace(0, 100, resolution + 1)
+    n = rh.size
+    limits = np.repeat(PMV_LIMITS, n)
+    rh2 = np.tile(rh, 2)
+
+    def fn(i, ta):
+        pmv = pmv_elevated_airspeed_batch(ta, ta, va, rh2[i], met, clo, outputs=("pmv",))["pmv"]
+        return pmv - limits[i]
+
+    boundary = _bisect_batch(np.arange(2 * n), fn, TA_RANGE[0], TA_RANGE[1], 0.005)
+    ta_cold, ta_warm = boundary[:n], boundary[n:]
+
+    # Closed polygon: up the cold side, down the warm side
+    ta_polygon = np.concatenate([ta_cold, ta_warm[::-1]])
+    rh_polygon = np.concatenate([rh, rh[::-1]])
+    inside = ~np.isnan(ta_polygon)
+    ta_polygon, rh_polygon = ta_polygon[inside], rh_polygon[inside]
+
+    result = {
+        "clo": clo,
+        "met": met,
+        "va": va,
+        "rh": _list(rh, 2),
+        "ta_cold": _list(ta_cold, 2),
+        "ta_warm": _list(ta_warm, 2),
+        "polygon": {
+            "ta": _list(ta_polygon, 2),
+            "w": _list(humidity_ratio(ta_polygon, rh_polygon), 3),
+        },
+    }
+
+    if grid:
+        ta = np.linspace(TA_RANGE[0], TA_RANGE[1], resolution + 1)
+        ta_grid, rh_grid = np.meshgrid(ta, rh)
+        result["ta"] = _list(ta, 2)
+        if "pmv" in grid:
+            pmv = pmv_elevated_airspeed_batch(
+                ta_grid, ta_grid, va, rh_grid, met, clo, outputs=("pmv",)
+            )["pmv"]
+            result["pmv"] = [_list(row, 2) for row in pmv]
+        if "set" in grid:
+            set_val = pierce_set_batch(ta_grid, ta_grid, va, rh_grid, met, clo)["set"]
+            result["set"] = [_list(row, 1) for row in set_val]
+
+    return result
@@ -0,0 +1,269 @@
+"""
+Recomputes comfort metrics for logged data outside Home Assistant.
+
+    python -m custom_components.comfort_tool.cli input.csv output_dir
+
+The CSV needs a header with the columns timestamp, ta, rh, clo and met; tr
+(default: ta) and va (default: 0) are optional. Instead of rh the humidity may
+be given as dewpoint, wetbulb, w or vappress and is converted with
+psychrometrics.convert.
+
+Rows are read in chunks and evaluated by a pool of worker processes. Only a
+bounded number of chunks is in flight at any time, and results are appended to
+the output as each chunk completes, so memory use does not depend on the
+size of the input.
+
+The output directory holds one raw file per column plus schema.json:
+
+    timestamp.f64          seconds since the epoch (naive timestamps are UTC)
+    pmv/ppd/set/ce.f64     float64, NaN where the row could not be evaluated
+    ts.i8                  int8 index into schema["ts_labels"], -1 if missing
+
+A row that raises is logged with its number (the first data row after the
+header is row 1) and written as NaN/-1; the remaining rows are still processed.
+
+e.g. numpy.fromfile("output_dir/set.f64", dtype=schema["columns"]["set"]["dtype"]).
+
+Importing the package pulls in its __init__ (cache, executor, const) and the
+pure-Python model modules (comfort, psychrometrics, solver, instrumentation,
+util); neither Home Assistant nor NumPy has to be installed.
+"""
+import argparse
+import collections
+import csv
+import itertools
+import json
+import logging
+import math
+import multiprocessing
+import os
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from . import psychrometrics as psy
+from .comfort import calculate_thermal_comfort
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Columns that may carry the humidity, in order of preference
+HUMIDITY_COLUMNS = ["rh", "dewpoint", "wetbulb", "w", "vappress"]
+
+# Output columns of calculate_thermal_comfort stored as float64
+FLOAT_METRICS = ["pmv", "ppd", "set", "ce"]
+
+# Values returned by comfort.get_sensation_by_class, stored by index
+TS_LABELS = ["Cold", "Cool", "Slightly Cool", "Neutral", "Slightly Warm", "Warm", "Hot"]
+
+NAN = float("nan")
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _timestamp(value):
+    """Seconds since the epoch from an ISO 8601 string or a number."""
+    seconds = _float(value)
+    if seconds is not None:
+        return seconds
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except (AttributeError, ValueError):
+        return NAN
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _evaluate_row(row, humidity, metrics, ce_guess):
+    ta = _float(row.get("ta"))
+    tr = _float(row.get("tr")) if row.get("tr") not in (None, "") else ta
+    va = _float(row.get("va")) if row.get("va") not in (None, "") else 0.0
+    clo = _float(row.get("clo"))
+    met = _float(row.get("met"))
+    rh = _float(row.get(humidity))
+    if rh is not None and ta is not None and humidity != "rh":
+        rh = psy.convert(rh, ta, humidity, "rh")
+
+    if any(x is None or math.isnan(x) for x in [ta, tr, va, rh, clo, met]):
+        return None
+    return calculate_thermal_comfort(ta, tr, va, rh, clo, met, ce_guess=ce_guess, metrics=metrics)
+
+
+def evaluate_chunk(rows, humidity="rh", metrics=None, first_row=1):
+    """
+    Evaluates a list of CSV rows (dicts). Returns (timestamps, columns, ts,
+    errors): float64 timestamps, a dict of float64 arrays per metric of
+    FLOAT_METRICS and the int8 sensation indices, plus a list of
+    (row number, message) for rows that raised. first_row is the number of
+    the chunk's first data row in the input.
+
+    A row that fails is written as NaN/-1 like a row with missing inputs, so
+    one bad row does not abort the rest of the file.
+
+    Consecutive rows of a log are usually close to each other, so each row's
+    cooling effect warm-starts the solve of the next one.
+    """
+    timestamps = array("d")
+    columns = {metric: array("d") for metric in FLOAT_METRICS}
+    ts = array("b")
+    errors = []
+    ce_guess = None
+
+    for number, row in enumerate(rows, first_row):
+        timestamps.append(_timestamp(row.get("timestamp")))
+        try:
+            result = _evaluate_row(row, humidity, metrics, ce_guess)
+        except Exception as e:
+            errors.append((number, f"{type(e).__name__}: {e}"))
+            result = None
+        if result is not None:
+            ce_guess = result["ce"]
+
+        for metric in FLOAT_METRICS:
+            value = result[metric] if result else None
+            columns[metric].append(NAN if value is None else value)
+        label = result["ts"] if result else None
+        ts.append(TS_LABELS.index(label) if label in TS_LABELS else -1)
+
+    return timestamps, columns, ts, errors
+
+
+class ColumnWriter:
+    """Appends chunks of columns to raw files and keeps schema.json current."""
+
+    def __init__(self, directory, metrics):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.metrics = [m for m in FLOAT_METRICS if m in metrics]
+        self.with_ts = "ts" in metrics
+        self.rows = 0
+
+        byteorder = "<" if sys.byteorder == "little" else ">"
+        self.columns = {"timestamp": {"file": "timestamp.f64", "dtype": f"{byteorder}f8"}}
+        for metric in self.metrics:
+            self.columns[metric] = {"file": f"{metric}.f64", "dtype": f"{byteorder}f8"}
+        if self.with_ts:
+            self.columns["ts"] = {"file": "ts.i8", "dtype": "i1"}
+        self._files = {
+            name: open(os.path.join(directory, column["file"]), "wb")
+            for name, column in self.columns.items()
+        }
+
+    def write(self, timestamps, columns, ts):
+        timestamps.tofile(self._files["timestamp"])
+        for metric in self.metrics:
+            columns[metric].tofile(self._files[metric])
+        if self.with_ts:
+            ts.tofile(self._files["ts"])
+        self.rows += len(timestamps)
+        for f in self._files.values():
+            f.flush()
+        self._write_schema()
+
+    def _write_schema(self):
+        schema = {"rows": self.rows, "columns": self.columns}
+        if self.with_ts:
+            schema["ts_labels"] = TS_LABELS
+        path = os.path.join(self.directory, "schema.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(schema, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._write_schema()
+
+
+def _chunks(reader, size):
+    while True:
+        chunk = list(itertools.islice(reader, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(input_file, directory, metrics=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """
+    Streams input_file (an open text file) through the model into directory.
+    Returns the number of rows written.
+    """
+    metrics = tuple(metrics or FLOAT_METRICS + ["ts"])
+    reader = csv.DictReader(input_file)
+    header = reader.fieldnames or []
+    missing = [c for c in ["timestamp", "ta", "clo", "met"] if c not in header]
+    humidity = next((c for c in HUMIDITY_COLUMNS if c in header), None)
+    if humidity is None:
+        missing.append("rh")
+    if missing:
+        raise ValueError(f"Missing CSV columns: {', '.join(missing)}")
+
+    workers = workers or os.cpu_count() or 1
+    writer = ColumnWriter(directory, metrics)
+
+    def write(future):
+        timestamps, columns, ts, errors = future.result()
+        for number, message in errors:
+            _LOGGER.warning("Row %d could not be evaluated: %s", number, message)
+        writer.write(timestamps, columns, ts)
+
+    # At most two chunks per worker are read ahead of the writer
+    pending = collections.deque()
+    try:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            for index, chunk in enumerate(_chunks(reader, chunk_size)):
+                first_row = index * chunk_size + 1
+                pending.append(pool.submit(evaluate_chunk, chunk, humidity, metrics, first_row))
+                if len(pending) >= 2 * workers:
+                    write(pending.popleft())
+            while pending:
+                write(pending.popleft())
+    finally:
+        writer.close()
+    return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Recompute thermal comfort metrics from a CSV log."
+    )
+    parser.add_argument("input", help="CSV file, or - for standard input")
+    parser.add_argument("output", help="output directory for the column files")
+    parser.add_argument(
+        "--metrics", default=",".join(FLOAT_METRICS + ["ts"]),
+        help="comma separated metrics to compute (default: all)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="rows per work item (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    metrics = [m.strip() for m in args.metrics.split(",") if m.strip()]
+    unknown = set(metrics) - set(FLOAT_METRICS + ["ts"])
+    if unknown:
+        parser.error(f"unknown metrics: {', '.join(sorted(unknown))}")
+
+    try:
+        if args.input == "-":
+            rows = run(sys.stdin, args.output, metrics, args.chunk_size, args.workers)
+        else:
+            with open(args.input, newline="", encoding="utf-8") as f:
+                rows = run(f, args.output, metrics, args.chunk_size, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"{rows} rows written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
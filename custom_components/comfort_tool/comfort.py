@@ -2,6 +2,9 @@ import logging
 import math
 from . import util
 from . import psychrometrics as psy
+from . import solver
+from . import instrumentation
+from .const import METRICS, PHYSIOLOGY
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -32,7 +35,33 @@ STILL_AIR_THRESHOLD = 0.1  # m/s
 
 
 
-def calculate_thermal_comfort(ta, tr, va, rh, clo, met, wme=0):
+def calculate_thermal_comfort(ta, tr, va, rh, clo, met, wme=0, set_val=None, ce=None, ce_guess=None, metrics=None,
+                              model=None):
+    """
+    Returns a dict with the keys pmv, ppd, set, ce and ts, and the two-node
+    model state of the SET run (see PHYSIOLOGY; None when SET is not run or
+    precomputed). Every key is present, None when it could not be computed.
+
+    metrics: the keys that are actually needed (default: all). Stages that no
+    requested metric depends on are skipped and their keys are None; values
+    computed anyway as intermediates (e.g. CE for PMV at elevated air speed)
+    are still returned.
+
+    model: replaces pmv_elevated_airspeed (sensitivity.py evaluates the same
+    model with dual numbers).
+    """
+    if metrics is None:
+        metrics = METRICS
+    if model is None:
+        model = pmv_elevated_airspeed
+    outputs = set()
+    if {"pmv", "ppd", "ts"} & set(metrics):
+        outputs.add("pmv")
+    if "set" in metrics:
+        outputs.add("set")
+    if "ce" in metrics:
+        outputs.add("cooling_effect")
+
     _LOGGER.debug(
         "Calculating thermal comfort using pmv_elevated_airspeed with inputs: ta=%.2f, tr=%.2f, va=%.2f, rh=%.2f, clo=%.2f, met=%.2f",
         ta, tr, va, rh, clo, met
@@ -41,14 +70,18 @@ def calculate_thermal_comfort(ta, tr, va, rh, clo, met, wme=0):
     res = {}
     try:
         # Full comfort model: includes PMV, PPD, CE, SET based on elevated airspeed logic
-        comfort = pmv_elevated_airspeed(
+        comfort = model(
             ta=ta,
             tr=tr,
             vel=va,
             rh=rh,
             met=met,
             clo=clo,
-            wme=wme
+            wme=wme,
+            set_val=set_val,
+            ce=ce,
+            ce_guess=ce_guess,
+            outputs=outputs
         )
 
         pmv_val = comfort["pmv"]
@@ -56,27 +89,31 @@ def calculate_thermal_comfort(ta, tr, va, rh, clo, met, wme=0):
         set_temp = comfort["set"]
         ce = comfort["cooling_effect"]
 
-        # Determine thermal sensation category
-        ts = get_sensation_by_class(pmv_val, "B")
-
-        res = {
-            "pmv": round(pmv_val, 2),
-            "ppd": round(ppd_val, 0),
-            "set": round(set_temp, 1),
-            "ce": round(ce, 1),
-            "ts": ts
-        }
+        res = dict.fromkeys((*METRICS, *PHYSIOLOGY))
+        if pmv_val is not None:
+            res["pmv"] = round(pmv_val, 2)
+            res["ppd"] = round(ppd_val, 0)
+            # Determine thermal sensation category
+            res["ts"] = get_sensation_by_class(pmv_val, "B")
+        if set_temp is not None:
+            res["set"] = round(set_temp, 1)
+            for key in PHYSIOLOGY:
+                value = comfort[key]
+                res[key] = value if value is None or key == "thermal_strain" else round(value, 2)
+        if ce is not None:
+            res["ce"] = round(ce, 1)
 
         _LOGGER.debug("Thermal comfort result: %s", res)
 
     except Exception as e:
+        instrumentation.count("errors")
         _LOGGER.error("Error in comfort calculation: %s", e)
-        res = {k: None for k in ["pmv", "ppd", "set", "ce", "ts"]}
+        res = dict.fromkeys((*METRICS, *PHYSIOLOGY))
 
     return res
 
 
-def pmv_elevated_airspeed(ta, tr, vel, rh, met, clo, wme=0):
+def pmv_elevated_airspeed(ta, tr, vel, rh, met, clo, wme=0, set_val=None, ce=None, ce_guess=None, outputs=None):
     """
     Returns comfort parameters accounting for elevated air speed effects.
 
@@ -88,6 +125,11 @@ def pmv_elevated_airspeed(ta, tr, vel, rh, met, clo, wme=0):
     - met: metabolic rate (met)
     - clo: clothing insulation (clo)
     - wme: external work (met), default is 0
+    - set_val, ce: precomputed SET and cooling effect (e.g. from a lookup
+      table); calculated when None
+    - ce_guess: previous cooling effect used to warm-start its solve
+    - outputs: collection of the results needed out of "pmv" (with "ppd"),
+      "set" and "cooling_effect"; default all. Skipped results are None.
 
     Returns:
     - dict with the following keys:
@@ -96,9 +138,15 @@ def pmv_elevated_airspeed(ta, tr, vel, rh, met, clo, wme=0):
         "set": Standard Effective Temperature,
         "ta_adj": adjusted air temperature after cooling effect,
         "tr_adj": adjusted mean radiant temperature after cooling effect,
-        "cooling_effect": calculated cooling effect (°C)
+        "cooling_effect": calculated cooling effect (°C),
+        and the PHYSIOLOGY keys of the SET run: "t_skin", "t_core" (°C),
+        "skin_wet" (%), "q_tot_evap", "q_resp" (W/m²) and "thermal_strain"
+        (None unless SET was calculated here)
     """
     result = {}
+    if outputs is None:
+        outputs = ("pmv", "set", "cooling_effect")
+    need_pmv = "pmv" in outputs or "ppd" in outputs
 
     # Compute relative air speed based on metabolic rate
     rel_vel = relative_air_speed(vel, met)
@@ -107,23 +155,33 @@ def pmv_elevated_airspeed(ta, tr, vel, rh, met, clo, wme=0):
     dyn_clo = dynamic_clothing(clo, met)
 
     # Compute cooling effect from elevated air speed
-    ce = cooling_effect(ta, tr, rel_vel, rh, met, dyn_clo)
+    # (PMV needs it too; cooling_effect returns 0 in still air without solving)
+    if ce is None and (need_pmv or "cooling_effect" in outputs):
+        ce = cooling_effect(ta, tr, rel_vel, rh, met, dyn_clo, ce_guess=ce_guess)
 
     # Use adjusted or original temperatures depending on velocity and cooling effect
-    if rel_vel <= 0.1 or ce == 0:
+    pmv_result = {"pmv": None, "ppd": None}
+    ta_adj = tr_adj = None
+    if ce is not None and (rel_vel <= 0.1 or ce == 0):
         # No significant cooling, use original conditions
-        pmv_result = pmv(ta, tr, rel_vel, rh, met, dyn_clo, wme)
+        if need_pmv:
+            pmv_result = pmv(ta, tr, rel_vel, rh, met, dyn_clo, wme)
         ce = 0
         ta_adj = ta
         tr_adj = tr
-    else:
+    elif ce is not None:
         # Adjust temperatures for elevated air speed cooling effect
-        pmv_result = pmv(ta - ce, tr - ce, STILL_AIR_THRESHOLD, rh, met, dyn_clo, wme)
+        if need_pmv:
+            pmv_result = pmv(ta - ce, tr - ce, STILL_AIR_THRESHOLD, rh, met, dyn_clo, wme)
         ta_adj = ta - ce
         tr_adj = tr - ce
 
     # Compute accurate SET using the original input parameters
-    set_val = pierce_set(ta, tr, vel, rh, met, clo, wme)["set"]
+    physiology = dict.fromkeys(PHYSIOLOGY)
+    if set_val is None and "set" in outputs:
+        set_result = pierce_set(ta, tr, vel, rh, met, clo, wme)
+        set_val = set_result["set"]
+        physiology = {k: set_result[k] for k in PHYSIOLOGY}
 
     # Return all comfort parameters
     result["pmv"] = pmv_result["pmv"]
@@ -132,12 +190,13 @@ def pmv_elevated_airspeed(ta, tr, vel, rh, met, clo, wme=0):
     result["ta_adj"] = ta_adj
     result["tr_adj"] = tr_adj
     result["cooling_effect"] = ce
+    result.update(physiology)
 
     return result
 
 
 
-def pmv(ta, tr, vel, rh, met, clo, wme=0):
+def pmv(ta, tr, vel, rh, met, clo, wme=0, mathlib=math):
     """
     PMV (Predicted Mean Vote) and PPD (Predicted Percentage Dissatisfied) calculation.
 
@@ -150,10 +209,13 @@ def pmv(ta, tr, vel, rh, met, clo, wme=0):
         clo : float - clothing insulation (clo)
         wme : float - external work (met), default is 0
 
+    ta, tr, vel and rh may also be sensitivity.Dual numbers, with
+    mathlib=sensitivity.DualMath; the results then carry their derivatives.
+
     Returns:
         dict with keys: pmv, ppd, hl1 to hl6
     """
-    pa = rh * 10 * math.exp(16.6536 - 4030.183 / (ta + 235))
+    pa = rh * 10 * mathlib.exp(16.6536 - 4030.183 / (ta + 235))
     icl = 0.155 * clo
     m = met * 58.15
     w = wme * 58.15
@@ -164,7 +226,7 @@ def pmv(ta, tr, vel, rh, met, clo, wme=0):
     else:
         fcl = 1.05 + 0.645 * icl
 
-    hcf = 12.1 * math.sqrt(vel)
+    hcf = 12.1 * mathlib.sqrt(vel)
     taa = ta + 273
     tra = tr + 273
     t_cla = taa + (35.5 - ta) / (3.5 * icl + 0.1)
@@ -187,8 +249,10 @@ def pmv(ta, tr, vel, rh, met, clo, wme=0):
         xn = (p5 + p4 * hc - p2 * (xf ** 4)) / (100 + p3 * hc)
         n += 1
         if n > 150:
+            instrumentation.count("non_convergence")
             raise RuntimeError("Max iterations exceeded in PMV calculation")
 
+    instrumentation.count("pmv_iterations", n)
     tcl = 100 * xn - 273
 
     hl1 = 3.05 * 0.001 * (5733 - 6.99 * mw - pa)
@@ -200,7 +264,7 @@ def pmv(ta, tr, vel, rh, met, clo, wme=0):
 
     ts = 0.303 * math.exp(-0.036 * m) + 0.028
     pmv = ts * (mw - hl1 - hl2 - hl3 - hl4 - hl5 - hl6)
-    ppd = 100.0 - 95.0 * math.exp(-0.03353 * pmv ** 4 - 0.2179 * pmv ** 2)
+    ppd = 100.0 - 95.0 * mathlib.exp(-0.03353 * pmv ** 4 - 0.2179 * pmv ** 2)
 
     return {
         "pmv": pmv,
@@ -215,10 +279,21 @@ def pmv(ta, tr, vel, rh, met, clo, wme=0):
 
 
 
-def cooling_effect(ta, tr, vel, rh, met, clo, body_position="standing"):
+# Half-width of the bracket tried around a previous cooling effect solution (°C)
+CE_WARM_START_SPAN = 0.5
+
+
+def cooling_effect(ta, tr, vel, rh, met, clo, body_position="standing", ce_guess=None, set_ref=None):
     """
     Calculates the Cooling Effect (CE) — the difference in SET between current conditions
     and still air conditions (velocity = 0.1 m/s).
+
+    ce_guess: previous solution for similar conditions (e.g. the last update of
+    the same zone). The solve then starts from a tight bracket around it and
+    falls back to the full bracket only if that fails.
+
+    set_ref: SET at the current air speed if already known (sensitivity.py
+    evaluates it with derivatives).
     """
     if vel <= 0.1:
         return 0.0
@@ -228,19 +303,20 @@ def cooling_effect(ta, tr, vel, rh, met, clo, body_position="standing"):
     eps = 0.001  # accuracy threshold
 
     # Reference SET at current air speed
-    set_ref = pierce_set(
-        ta=ta,
-        tr=tr,
-        vel=vel,
-        rh=rh,
-        met=met,
-        clo=clo,
-        wme=0,
-        round_output=False,
-        calculate_ce=True,
-        max_skin_blood_flow=90,
-        body_position=body_position
-    )["set"]
+    if set_ref is None:
+        set_ref = pierce_set(
+            ta=ta,
+            tr=tr,
+            vel=vel,
+            rh=rh,
+            met=met,
+            clo=clo,
+            wme=0,
+            round_output=False,
+            calculate_ce=True,
+            max_skin_blood_flow=90,
+            body_position=body_position
+        )["set"]
 
     # Target function: difference in SET with reduced temperature and still air
     def fn(ce):
@@ -259,18 +335,33 @@ def cooling_effect(ta, tr, vel, rh, met, clo, body_position="standing"):
         )["set"]
         return set_ref - set_still
 
-    # Use secant method to solve for CE
-    try:
-        ce = util.secant(ce_l, ce_r, fn, eps)
-    except ValueError:
-        # If secant method fails, fall back to bisection method
-        ce = util.bisect(ce_l, ce_r, fn, eps, 0)
-
-    return round(max(0.0, ce), 2)
-
-
+    # fn grows with ce: a warmer still-air reference is needed for a larger cooling effect
+    if ce_guess:
+        result = solver.brentq_near(
+            fn, ce_guess, CE_WARM_START_SPAN, ce_l, ce_r, increasing=True, xtol=eps, ftol=eps
+        )
+        instrumentation.count("ce_evaluations", result.evaluations)
+        if result.converged:
+            instrumentation.count("ce_solves")
+            return round(max(0.0, result.root), 2)
+        # Tight bracket did not contain the root
+        instrumentation.count("ce_warm_start_fallbacks")
+
+    # fn(0) >= 0: air movement does not cool, CE is zero
+    f_l = fn(ce_l)
+    instrumentation.count("ce_evaluations")
+    if f_l >= -eps:
+        return 0.0
 
+    result = solver.brentq(fn, ce_l, ce_r, xtol=eps, ftol=eps, fa=f_l)
+    instrumentation.count("ce_evaluations", result.evaluations)
+    instrumentation.count("ce_solves")
+    if not result.converged:
+        instrumentation.count("non_convergence")
+        _LOGGER.warning("Cooling effect did not converge (%s)", result.flag)
+        return 0.0
 
+    return round(max(0.0, result.root), 2)
 
 
 
@@ -285,8 +376,17 @@ def pierce_set(
     round_output=False,
     calculate_ce=False,
     max_skin_blood_flow=90,
-    body_position="sitting"
+    body_position="sitting",
+    mathlib=math
 ):
+    """
+    Standard Effective Temperature and the state of the two-node (Gagge)
+    body model after a 60-minute exposure.
+
+    mathlib: provider of exp; sensitivity.DualMath when the inputs are
+    sensitivity.Dual numbers.
+    """
+    exp = mathlib.exp
     SBC = 5.6697e-8  # Stefan-Boltzmann constant
     DELTA = 0.0001
     MetFactor = 58.2
@@ -300,10 +400,11 @@ def pierce_set(
     TempCoreNeutral = 36.8
     TempBodyNeutral = 0.1 * TempSkinNeutral + 0.9 * TempCoreNeutral
     SkinBloodFlowNeutral = 6.3
-    VaporPressure = rh * util.FindSaturatedVaporPressureTorr(ta) / 100
+    VaporPressure = rh * util.FindSaturatedVaporPressureTorr(ta, exp) / 100
     AirSpeed = max(vel, 0.1)
     p = psy.PROP["Patm"] / 1000
     PressureInAtmospheres = p * 0.009869
+    PressureFactor = PressureInAtmospheres**0.53
     LTime = 60.0
     RCl = 0.155 * clo
     FACL = 1.0 + 0.15 * clo
@@ -321,7 +422,7 @@ def pierce_set(
     heatTransferConvMet = (
         3.0 if met < 0.85 else 5.66 * (met - 0.85) ** 0.39
     )
-    CHC = max(3.0 * PressureInAtmospheres**0.53, 8.600001 * (AirSpeed * PressureInAtmospheres)**0.53)
+    CHC = max(3.0 * PressureFactor, 8.600001 * (AirSpeed * PressureInAtmospheres)**0.53)
     if not calculate_ce:
         CHC = max(CHC, heatTransferConvMet)
 
@@ -340,14 +441,23 @@ def pierce_set(
     ExcBloodFlow = False
     ExcRegulatorySweating = False
     ExcCriticalWettedness = False
+    tcl_iterations = 0
+
+    # Loop invariants, grouped so that every result stays bit-identical to
+    # evaluating the full expressions inside the loop
+    RadiationConstant = 4.0 * 0.95 * SBC
+    RadiatingAreaFactor = 0.7 if body_position == "sitting" else 0.73
+    RespVaporDeficit = 44.0 - VaporPressure
+    RespTempDeficit = 34.0 - ta
+    REA = 1.0 / (LR * FACL * CHC)
+    RECL = RCl / (LR * ICL)
+    EvapResistance = REA + RECL
 
     for _ in range(int(LTime)):
         while True:
+            tcl_iterations += 1
             TCL_OLD = TCL
-            if body_position == "sitting":
-                CHR = 4.0 * 0.95 * SBC * ((TCL + tr) / 2.0 + 273.15) ** 3 * 0.7
-            else:
-                CHR = 4.0 * 0.95 * SBC * ((TCL + tr) / 2.0 + 273.15) ** 3 * 0.73
+            CHR = RadiationConstant * ((TCL + tr) / 2.0 + 273.15) ** 3 * RadiatingAreaFactor
             CTC = CHR + CHC
             RA = 1.0 / (FACL * CTC)
             TOP = (CHR * tr + CHC * ta) / CTC
@@ -357,8 +467,8 @@ def pierce_set(
 
         DRY = (TempSkin - TOP) / (RA + RCl)
         HFCS = (TempCore - TempSkin) * (5.28 + 1.163 * SkinBloodFlow)
-        ERES = 0.0023 * M * (44.0 - VaporPressure)
-        CRES = 0.0014 * M * (34.0 - ta)
+        ERES = 0.0023 * M * RespVaporDeficit
+        CRES = 0.0014 * M * RespTempDeficit
         SCR = M - HFCS - ERES - CRES - wme
         SSK = HFCS - DRY - ESK
         TCSK = 0.97 * ALFA * BodyWeight
@@ -385,17 +495,15 @@ def pierce_set(
         if SkinBloodFlow < 0.5:
             SkinBloodFlow = 0.5
 
-        REGSW = CSW * WARMB * math.exp(WARMS / 10.7)
+        REGSW = CSW * WARMB * exp(WARMS / 10.7)
         if REGSW > 500:
             REGSW = 500
             ExcRegulatorySweating = True
 
         ERSW = 0.68 * REGSW
-        REA = 1.0 / (LR * FACL * CHC)
-        RECL = RCl / (LR * ICL)
         EMAX = (
-            util.FindSaturatedVaporPressureTorr(TempSkin) - VaporPressure
-        ) / (REA + RECL)
+            util.FindSaturatedVaporPressureTorr(TempSkin, exp) - VaporPressure
+        ) / EvapResistance
         PRSW = ERSW / EMAX if EMAX > 0 else 0
         PWET = 0.06 + 0.94 * PRSW
         EDIF = PWET * EMAX - ERSW if EMAX > 0 else 0
@@ -420,9 +528,9 @@ def pierce_set(
 
     HSK = DRY + ESK
     W = PWET
-    PSSK = util.FindSaturatedVaporPressureTorr(TempSkin)
+    PSSK = util.FindSaturatedVaporPressureTorr(TempSkin, exp)
     CHRS = CHR
-    CHCS = max(3.0, 3.0 * PressureInAtmospheres**0.53)
+    CHCS = max(3.0, 3.0 * PressureFactor)
     if not calculate_ce and met > 0.85:
         CHCS = max(CHCS, heatTransferConvMet)
     CTCS = CHCS + CHRS
@@ -441,13 +549,19 @@ def pierce_set(
 
     X_OLD = TempSkin - HSK / HD_S
     dx = 100.0
+    set_iterations = 0
     while abs(dx) > 0.01:
-        ERR1 = HSK - HD_S * (TempSkin - X_OLD) - W * HE_S * (PSSK - 0.5 * util.FindSaturatedVaporPressureTorr(X_OLD))
-        ERR2 = HSK - HD_S * (TempSkin - (X_OLD + DELTA)) - W * HE_S * (PSSK - 0.5 * util.FindSaturatedVaporPressureTorr(X_OLD + DELTA))
+        set_iterations += 1
+        ERR1 = HSK - HD_S * (TempSkin - X_OLD) - W * HE_S * (PSSK - 0.5 * util.FindSaturatedVaporPressureTorr(X_OLD, exp))
+        ERR2 = HSK - HD_S * (TempSkin - (X_OLD + DELTA)) - W * HE_S * (PSSK - 0.5 * util.FindSaturatedVaporPressureTorr(X_OLD + DELTA, exp))
         _set = X_OLD - (DELTA * ERR1) / (ERR2 - ERR1)
         dx = _set - X_OLD
         X_OLD = _set
 
+    instrumentation.count("pierce_set_runs")
+    instrumentation.count("tcl_iterations", tcl_iterations)
+    instrumentation.count("set_newton_steps", set_iterations)
+
     return {
         "set": round(_set, 1) if round_output else _set,
         "t_skin": TempSkin,
@@ -491,6 +605,70 @@ def operative_temperature(ta, tr, va):
     return to
 
 
+# Prevailing mean outdoor temperatures (°C) for which the adaptive model applies
+ADAPTIVE_T_RM_RANGE = (10.0, 33.5)
+
+
+def adaptive_ashrae(ta, tr, t_running_mean, va):
+    """
+    ASHRAE 55 adaptive comfort model for occupant-controlled, naturally
+    conditioned spaces.
+
+    Parameters:
+    - ta: air temperature (°C)
+    - tr: mean radiant temperature (°C)
+    - t_running_mean: prevailing mean outdoor temperature (°C)
+    - va: air speed (m/s)
+
+    Returns:
+    - dict with the operative temperature "to", the neutral temperature
+      "tmp_cmf", the 80 % and 90 % acceptability limits, whether "to" lies
+      within them and the cooling effect "ce" credited to the upper limits
+      at elevated air speed. Everything except "to" is None when
+      t_running_mean is outside ADAPTIVE_T_RM_RANGE.
+    """
+    to = operative_temperature(ta, tr, va)
+    result = {
+        "to": round(to, 1),
+        "tmp_cmf": None,
+        "tmp_cmf_80_low": None,
+        "tmp_cmf_80_up": None,
+        "tmp_cmf_90_low": None,
+        "tmp_cmf_90_up": None,
+        "acceptability_80": None,
+        "acceptability_90": None,
+        "ce": None,
+    }
+    low, high = ADAPTIVE_T_RM_RANGE
+    if not low <= t_running_mean <= high:
+        return result
+
+    tmp_cmf = 0.31 * t_running_mean + 17.8
+
+    # Increase of the upper limits at elevated air speed (operative temperature above 25 °C)
+    ce = 0.0
+    if va >= 0.6 and to >= 25:
+        if va < 0.9:
+            ce = 1.2
+        elif va < 1.2:
+            ce = 1.8
+        else:
+            ce = 2.2
+
+    limits = {
+        "tmp_cmf_80_low": tmp_cmf - 3.5,
+        "tmp_cmf_80_up": tmp_cmf + 3.5 + ce,
+        "tmp_cmf_90_low": tmp_cmf - 2.5,
+        "tmp_cmf_90_up": tmp_cmf + 2.5 + ce,
+    }
+    result.update({k: round(v, 1) for k, v in limits.items()})
+    result["tmp_cmf"] = round(tmp_cmf, 1)
+    result["acceptability_80"] = limits["tmp_cmf_80_low"] <= to <= limits["tmp_cmf_80_up"]
+    result["acceptability_90"] = limits["tmp_cmf_90_low"] <= to <= limits["tmp_cmf_90_up"]
+    result["ce"] = ce
+    return result
+
+
 def get_sensation_by_class(pmv: float, comfort_class: str = "B") -> str:
     """
     Returns thermal sensation based on PMV value and thermal environment class (A, B, C),
@@ -1,8 +1,30 @@
 from homeassistant import config_entries
 import voluptuous as vol
+from homeassistant.core import callback
 from homeassistant.helpers.selector import selector
 
-from .const import DOMAIN
+from .const import (
+    CONF_ENGINE,
+    CONF_ENTRY_TYPE,
+    CONF_MIN_INTERVAL,
+    CONF_OCCUPANCY,
+    CONF_SENSITIVITIES,
+    CONF_SET_THRESHOLD,
+    CONF_STATS_PERIOD,
+    CONF_UPDATE_MODE,
+    CONF_ZONES,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_SET_THRESHOLD,
+    DEFAULT_STATS_PERIOD,
+    DOMAIN,
+    ENGINE_EXACT,
+    ENGINES,
+    ENTRY_TYPE_MULTI_ZONE,
+    ENTRY_TYPE_ZONE,
+    STATS_PERIODS,
+    UPDATE_MODE_POLL,
+    UPDATE_MODES,
+)
 
 SENSOR_SELECTOR = selector({
     "entity": {
@@ -10,6 +32,53 @@ SENSOR_SELECTOR = selector({
     }
 })
 
+UPDATE_MODE_SELECTOR = selector({
+    "select": {
+        "options": UPDATE_MODES,
+        "translation_key": CONF_UPDATE_MODE
+    }
+})
+
+ENGINE_SELECTOR = selector({
+    "select": {
+        "options": ENGINES,
+        "translation_key": CONF_ENGINE
+    }
+})
+
+OCCUPANCY_SELECTOR = selector({
+    "entity": {
+        "domain": ["binary_sensor", "input_boolean"]
+    }
+})
+
+STATS_PERIOD_SELECTOR = selector({
+    "select": {
+        "options": STATS_PERIODS,
+        "translation_key": CONF_STATS_PERIOD
+    }
+})
+
+SET_THRESHOLD_SELECTOR = selector({
+    "number": {
+        "min": 20,
+        "max": 40,
+        "step": 0.5,
+        "unit_of_measurement": "°C",
+        "mode": "box"
+    }
+})
+
+MIN_INTERVAL_SELECTOR = selector({
+    "number": {
+        "min": 0.1,
+        "max": 60,
+        "step": 0.1,
+        "unit_of_measurement": "s",
+        "mode": "box"
+    }
+})
+
 CONFIG_SCHEMA = vol.Schema({
     vol.Optional("name"): str,
     vol.Required("ta"): SENSOR_SELECTOR,
@@ -18,16 +87,73 @@ CONFIG_SCHEMA = vol.Schema({
     vol.Required("rh"): SENSOR_SELECTOR,
     vol.Required("clo"): SENSOR_SELECTOR,
     vol.Required("met"): SENSOR_SELECTOR,
+    vol.Optional("t_out"): SENSOR_SELECTOR,
+    vol.Optional(CONF_UPDATE_MODE, default=UPDATE_MODE_POLL): UPDATE_MODE_SELECTOR,
+    vol.Optional(CONF_MIN_INTERVAL, default=DEFAULT_MIN_INTERVAL): MIN_INTERVAL_SELECTOR,
+    vol.Optional(CONF_ENGINE, default=ENGINE_EXACT): ENGINE_SELECTOR,
+    vol.Optional(CONF_OCCUPANCY): OCCUPANCY_SELECTOR,
+    vol.Optional(CONF_STATS_PERIOD, default=DEFAULT_STATS_PERIOD): STATS_PERIOD_SELECTOR,
+    vol.Optional(CONF_SET_THRESHOLD, default=DEFAULT_SET_THRESHOLD): SET_THRESHOLD_SELECTOR,
+    vol.Optional(CONF_SENSITIVITIES, default=False): bool,
+})
+
+# Several zones sharing clo and met: shared inputs first, then one
+# ZONE_SCHEMA form per zone
+MULTI_ZONE_SCHEMA = vol.Schema({
+    vol.Optional("name"): str,
+    vol.Required("clo"): SENSOR_SELECTOR,
+    vol.Required("met"): SENSOR_SELECTOR,
+    vol.Optional(CONF_UPDATE_MODE, default=UPDATE_MODE_POLL): UPDATE_MODE_SELECTOR,
+    vol.Optional(CONF_MIN_INTERVAL, default=DEFAULT_MIN_INTERVAL): MIN_INTERVAL_SELECTOR,
+})
+
+ZONE_SCHEMA = vol.Schema({
+    vol.Required("name"): str,
+    vol.Required("ta"): SENSOR_SELECTOR,
+    vol.Optional("tr"): SENSOR_SELECTOR,
+    vol.Optional("va"): SENSOR_SELECTOR,
+    vol.Required("rh"): SENSOR_SELECTOR,
+    vol.Optional("add_another", default=False): bool,
 })
 
 class ComfortToolConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
+    def __init__(self):
+        self._data = {}
+
     async def async_step_user(self, user_input=None):
+        return self.async_show_menu(
+            step_id="user", menu_options=[ENTRY_TYPE_ZONE, ENTRY_TYPE_MULTI_ZONE]
+        )
+
+    async def async_step_zone(self, user_input=None):
         if user_input is not None:
             return self.async_create_entry(title="Indoor Thermal Comfort", data=user_input)
 
-        return self.async_show_form(step_id="user", data_schema=CONFIG_SCHEMA)
+        return self.async_show_form(step_id="zone", data_schema=CONFIG_SCHEMA)
+
+    async def async_step_multi_zone(self, user_input=None):
+        if user_input is not None:
+            self._data = {**user_input, CONF_ENTRY_TYPE: ENTRY_TYPE_MULTI_ZONE, CONF_ZONES: []}
+            return await self.async_step_zone_sensors()
+
+        return self.async_show_form(step_id="multi_zone", data_schema=MULTI_ZONE_SCHEMA)
+
+    async def async_step_zone_sensors(self, user_input=None):
+        if user_input is not None:
+            add_another = user_input.pop("add_another", False)
+            self._data[CONF_ZONES].append(user_input)
+            if not add_another:
+                return self.async_create_entry(
+                    title=self._data.get("name", "Indoor Thermal Comfort"), data=self._data
+                )
+
+        return self.async_show_form(
+            step_id="zone_sensors",
+            data_schema=ZONE_SCHEMA,
+            description_placeholders={"zone": str(len(self._data[CONF_ZONES]) + 1)},
+        )
 
     async def async_step_reauth(self, user_input=None):
         return await self.async_step_user()
@@ -35,27 +161,68 @@ class ComfortToolConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_import(self, import_config):
         return await self.async_step_user()
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return ComfortToolOptionsFlowHandler(config_entry)
+
+# Optional sensors of a zone; the options form can also clear them
+OPTIONAL_SENSORS = ["tr", "va", "t_out", CONF_OCCUPANCY]
+
 class ComfortToolOptionsFlowHandler(config_entries.OptionsFlow):
+    """
+    Changes the settings of an entry. The options override entry.data
+    wherever the configuration is read, and the entry is reloaded to apply
+    them.
+    """
+
     def __init__(self, config_entry):
         self.config_entry = config_entry
 
     async def async_step_init(self, user_input=None):
+        multi_zone = self.config_entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_MULTI_ZONE
         if user_input is not None:
+            if not multi_zone:
+                # An emptied optional sensor is missing from user_input; store
+                # None so that it does not fall back to the one in entry.data
+                user_input = {**dict.fromkeys(OPTIONAL_SENSORS), **user_input}
             return self.async_create_entry(title="", data=user_input)
 
-        options = self.config_entry.options
-        return self.async_show_form(
-            step_id="init",
-            data_schema=vol.Schema({
-                vol.Optional("name", default=options.get("name", self.config_entry.title)): str,
-                vol.Required("ta", default=options.get("ta", "")): SENSOR_SELECTOR,
-                vol.Optional("tr", default=options.get("tr", "")): SENSOR_SELECTOR,
-                vol.Optional("va", default=options.get("va", "")): SENSOR_SELECTOR,
-                vol.Required("rh", default=options.get("rh", "")): SENSOR_SELECTOR,
-                vol.Required("clo", default=options.get("clo", "")): SENSOR_SELECTOR,
-                vol.Required("met", default=options.get("met", "")): SENSOR_SELECTOR,
-            })
-        )
+        config = {**self.config_entry.data, **self.config_entry.options}
+
+        def sensor(key):
+            # Suggested rather than default, so that an optional sensor can be cleared
+            return {"description": {"suggested_value": config.get(key)}}
 
-async def async_get_options_flow(config_entry):
-    return ComfortToolOptionsFlowHandler(config_entry)
+        fields = {
+            vol.Optional("name", default=config.get("name", self.config_entry.title)): str,
+        }
+        if multi_zone:
+            # Zones are set up in the config flow; only the shared inputs can change
+            fields.update({
+                vol.Required("clo", **sensor("clo")): SENSOR_SELECTOR,
+                vol.Required("met", **sensor("met")): SENSOR_SELECTOR,
+            })
+        else:
+            fields.update({
+                vol.Required("ta", **sensor("ta")): SENSOR_SELECTOR,
+                vol.Optional("tr", **sensor("tr")): SENSOR_SELECTOR,
+                vol.Optional("va", **sensor("va")): SENSOR_SELECTOR,
+                vol.Required("rh", **sensor("rh")): SENSOR_SELECTOR,
+                vol.Required("clo", **sensor("clo")): SENSOR_SELECTOR,
+                vol.Required("met", **sensor("met")): SENSOR_SELECTOR,
+                vol.Optional("t_out", **sensor("t_out")): SENSOR_SELECTOR,
+            })
+        fields.update({
+            vol.Optional(CONF_UPDATE_MODE, default=config.get(CONF_UPDATE_MODE, UPDATE_MODE_POLL)): UPDATE_MODE_SELECTOR,
+            vol.Optional(CONF_MIN_INTERVAL, default=config.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)): MIN_INTERVAL_SELECTOR,
+        })
+        if not multi_zone:
+            fields.update({
+                vol.Optional(CONF_ENGINE, default=config.get(CONF_ENGINE, ENGINE_EXACT)): ENGINE_SELECTOR,
+                vol.Optional(CONF_OCCUPANCY, **sensor(CONF_OCCUPANCY)): OCCUPANCY_SELECTOR,
+                vol.Optional(CONF_STATS_PERIOD, default=config.get(CONF_STATS_PERIOD, DEFAULT_STATS_PERIOD)): STATS_PERIOD_SELECTOR,
+                vol.Optional(CONF_SET_THRESHOLD, default=config.get(CONF_SET_THRESHOLD, DEFAULT_SET_THRESHOLD)): SET_THRESHOLD_SELECTOR,
+                vol.Optional(CONF_SENSITIVITIES, default=config.get(CONF_SENSITIVITIES, False)): bool,
+            })
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(fields))
@@ -0,0 +1,43 @@
+"""
+Schema of the optional comfort_tool YAML section (worker pool, result cache
+and service limits). Imported lazily by the package: it needs Home
+Assistant's voluptuous, which process-pool workers do not load.
+"""
+import voluptuous as vol
+
+from .const import (
+    CONF_CACHE_SIZE,
+    CONF_CACHE_TTL,
+    CONF_EXECUTOR,
+    CONF_MAX_BATCH_SIZE,
+    CONF_MAX_WORKERS,
+    CONF_RESOLUTION,
+    DEFAULT_CACHE_SIZE,
+    DEFAULT_MAX_BATCH_SIZE,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_RESOLUTION,
+    DOMAIN,
+    EXECUTOR_PROCESS,
+    EXECUTOR_THREAD,
+)
+
+POSITIVE_FLOAT = vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False))
+
+# Rounding step per model input, all of them optional
+RESOLUTION_SCHEMA = vol.Schema({vol.Optional(name): POSITIVE_FLOAT for name in DEFAULT_RESOLUTION})
+
+DOMAIN_SCHEMA = vol.Schema({
+    vol.Optional(CONF_EXECUTOR, default=EXECUTOR_THREAD): vol.In([EXECUTOR_THREAD, EXECUTOR_PROCESS]),
+    vol.Optional(CONF_MAX_WORKERS, default=DEFAULT_MAX_WORKERS): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=64)
+    ),
+    # 0 disables the cache
+    vol.Optional(CONF_CACHE_SIZE, default=DEFAULT_CACHE_SIZE): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    vol.Optional(CONF_CACHE_TTL): POSITIVE_FLOAT,
+    vol.Optional(CONF_RESOLUTION, default={}): RESOLUTION_SCHEMA,
+    vol.Optional(CONF_MAX_BATCH_SIZE, default=DEFAULT_MAX_BATCH_SIZE): vol.All(
+        vol.Coerce(int), vol.Range(min=1)
+    ),
+})
+
+CONFIG_SCHEMA = vol.Schema({vol.Optional(DOMAIN, default={}): DOMAIN_SCHEMA}, extra=vol.ALLOW_EXTRA)
@@ -1 +1,105 @@
-DOMAIN = "comfort_tool"
+from datetime import timedelta
+
+DOMAIN = "comfort_tool"
+
+# Metrics published by every zone, in the order the sensors are created
+METRICS = ["pmv", "ppd", "set", "ce", "ts"]
+
+# Two-node model state of the SET run, returned with SET at no extra cost
+PHYSIOLOGY = ["t_skin", "t_core", "skin_wet", "q_tot_evap", "q_resp", "thermal_strain"]
+# The ones published as (disabled by default) sensors; thermal_strain is an
+# attribute of the SET sensor
+PHYSIOLOGY_SENSORS = ["t_skin", "t_core", "skin_wet", "q_tot_evap", "q_resp"]
+
+# Matches the default scan interval of the sensor platform
+SCAN_INTERVAL = timedelta(seconds=30)
+
+# How a zone decides when to recalculate
+CONF_UPDATE_MODE = "update_mode"
+UPDATE_MODE_POLL = "poll"    # fixed scan interval
+UPDATE_MODE_EVENT = "event"  # state changes of the source entities
+UPDATE_MODES = [UPDATE_MODE_POLL, UPDATE_MODE_EVENT]
+
+# Minimum time between two recalculations in event mode (seconds).
+# State changes arriving within this window are coalesced into one run.
+CONF_MIN_INTERVAL = "min_interval"
+DEFAULT_MIN_INTERVAL = 0.5
+
+# The first refresh of each entry waits for its source entities; entries
+# still waiting start this many seconds apart so that startup work is spread
+STARTUP_STAGGER = 0.5
+
+# Worker pool running the model off the event loop (configured in YAML)
+DATA_EXECUTOR = "executor"
+CONF_EXECUTOR = "executor"
+CONF_MAX_WORKERS = "max_workers"
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+DEFAULT_MAX_WORKERS = 2
+
+# Shared result cache (configured in YAML)
+DATA_CACHE = "cache"
+CONF_CACHE_SIZE = "cache_size"
+CONF_CACHE_TTL = "cache_ttl"
+CONF_RESOLUTION = "resolution"
+DEFAULT_CACHE_SIZE = 1024
+
+# Inputs are rounded to these steps before lookup and calculation
+DEFAULT_RESOLUTION = {
+    "ta": 0.05,  # °C
+    "tr": 0.05,  # °C
+    "va": 0.01,  # m/s
+    "rh": 0.5,   # %
+    "clo": 0.01,
+    "met": 0.01,
+}
+
+# How SET and CE are obtained
+CONF_ENGINE = "engine"
+ENGINE_EXACT = "exact"  # full model on every update
+ENGINE_TABLE = "table"  # interpolation in precomputed tables, exact outside them
+ENGINES = [ENGINE_EXACT, ENGINE_TABLE]
+
+# Precomputed tables, stored below the Home Assistant .storage directory
+DATA_TABLES = "tables"
+TABLE_DIRECTORY = "comfort_tool_tables"
+
+# Comfort statistics sensors
+CONF_OCCUPANCY = "occupancy"
+CONF_STATS_PERIOD = "stats_period"
+CONF_SET_THRESHOLD = "set_threshold"
+PERIOD_DAILY = "daily"
+PERIOD_WEEKLY = "weekly"
+PERIOD_MONTHLY = "monthly"
+PERIOD_YEARLY = "yearly"
+PERIOD_NEVER = "never"
+STATS_PERIODS = [PERIOD_DAILY, PERIOD_WEEKLY, PERIOD_MONTHLY, PERIOD_YEARLY, PERIOD_NEVER]
+DEFAULT_STATS_PERIOD = PERIOD_MONTHLY
+# Statistics sensor -> the metric it integrates
+STATISTICS_METRICS = {
+    "time_in_comfort": "pmv",
+    "ppd_exceedance": "ppd",
+    "set_degree_hours": "set",
+}
+# SET above which degree-hours are counted (LEED passive survivability uses 30 °C)
+DEFAULT_SET_THRESHOLD = 30.0
+
+# Partial derivatives of PMV, SET and CE as sensor attributes (opt-in, costs
+# three SET model runs with derivatives per update)
+CONF_SENSITIVITIES = "sensitivities"
+
+# Config entry types: one zone, or several zones sharing clo and met
+CONF_ENTRY_TYPE = "entry_type"
+ENTRY_TYPE_ZONE = "zone"
+ENTRY_TYPE_MULTI_ZONE = "multi_zone"
+CONF_ZONES = "zones"
+
+# Comfort zone / grid service results, cached by clo, met, va and resolution
+DATA_CHARTS = "charts"
+CHART_CACHE_SIZE = 32
+DEFAULT_CHART_RESOLUTION = 30  # grid steps per axis
+DATA_INVERSE = "inverse"
+
+# Records accepted by one comfort_tool.calculate call (configured in YAML)
+CONF_MAX_BATCH_SIZE = "max_batch_size"
+DEFAULT_MAX_BATCH_SIZE = 1000
@@ -0,0 +1,383 @@
+import abc
+import logging
+import time
+from functools import partial
+
+import numpy as np
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_call_at, async_track_state_change_event
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import (
+    CONF_ENGINE,
+    CONF_MIN_INTERVAL,
+    CONF_OCCUPANCY,
+    CONF_SENSITIVITIES,
+    CONF_SET_THRESHOLD,
+    CONF_STATS_PERIOD,
+    CONF_UPDATE_MODE,
+    CONF_ZONES,
+    DATA_CACHE,
+    DATA_EXECUTOR,
+    DATA_TABLES,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_SET_THRESHOLD,
+    DEFAULT_STATS_PERIOD,
+    DOMAIN,
+    ENGINE_EXACT,
+    ENGINE_TABLE,
+    METRICS,
+    PHYSIOLOGY,
+    PHYSIOLOGY_SENSORS,
+    SCAN_INTERVAL,
+    STATISTICS_METRICS,
+    UPDATE_MODE_EVENT,
+    UPDATE_MODE_POLL,
+)
+from .batch import as_scalar, calculate_thermal_comfort_batch
+from .cache import INPUTS
+from .comfort import calculate_thermal_comfort
+from .executor import StaleJobError
+from .instrumentation import ZoneDiagnostics, instrumented
+from .sensitivity import calculate_thermal_comfort_sensitivities
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class BaseComfortCoordinator(DataUpdateCoordinator, abc.ABC):
+    """
+    Shared part of the single- and multi-zone coordinators: worker pool,
+    cache, update mode, source tracking and diagnostics.
+    """
+
+    def __init__(self, hass, entry):
+        # Options saved by the options flow override the setup data
+        config = {**entry.data, **entry.options}
+
+        self.clo = config["clo"]
+        self.met = config["met"]
+
+        self.zone = entry.entry_id
+        self.executor = hass.data[DOMAIN][DATA_EXECUTOR]
+        self.cache = hass.data[DOMAIN][DATA_CACHE]
+        self.tables = hass.data[DOMAIN][DATA_TABLES]
+        self.engine = config.get(CONF_ENGINE, ENGINE_EXACT)
+        self.update_mode = config.get(CONF_UPDATE_MODE, UPDATE_MODE_POLL)
+        self.diagnostics = ZoneDiagnostics()
+        self.first_refresh_pending = True
+        # In event mode nothing is polled: idle zones cost nothing
+        polled = self.update_mode != UPDATE_MODE_EVENT and not entry.pref_disable_polling
+        self.poll_interval = SCAN_INTERVAL if polled else None
+        min_interval = config.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_{entry.entry_id}",
+            # Polls are scheduled by async_schedule_first_refresh, not by
+            # DataUpdateCoordinator, which would run them all in the same tick
+            update_interval=None,
+            # Refresh requests are delayed by min_interval so that bursts of
+            # state changes (e.g. ta and rh reporting together) run the model once
+            request_refresh_debouncer=Debouncer(
+                hass, _LOGGER, cooldown=min_interval, immediate=False
+            ),
+        )
+
+    @property
+    @abc.abstractmethod
+    def source_entities(self):
+        """All configured input entities."""
+
+    @callback
+    def async_track_sources(self):
+        """
+        Subscribes to state changes of the source entities (event mode).
+        Returns the callback that removes the subscription.
+        """
+        return async_track_state_change_event(
+            self.hass, self.source_entities, self._handle_source_change
+        )
+
+    @callback
+    def _handle_source_change(self, event):
+        if self.first_refresh_pending:
+            # Sources reporting during startup: the scheduled first refresh covers them
+            return
+        self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def async_schedule_first_refresh(self, delay):
+        """
+        Schedules the first refresh instead of running it during setup: delay
+        seconds after all source entities have a numeric state, or after Home
+        Assistant has started if some of them never get one. In poll mode the
+        polls start with it, so each zone keeps the offset of its first
+        refresh. Returns the callback that cancels the first refresh and the
+        polls.
+        """
+        unsubscribe = []
+
+        @callback
+        def cancel():
+            while unsubscribe:
+                unsubscribe.pop()()
+
+        @callback
+        def start(*_):
+            cancel()
+            refresh_at(self.hass.loop.time() + delay)
+
+        @callback
+        def refresh_at(when):
+            @callback
+            def refresh(_now):
+                unsubscribe.clear()
+                self.first_refresh_pending = False
+                if self.poll_interval is not None:
+                    # Timed from the scheduled refresh, not from when it ran,
+                    # so that late refreshes do not shift the zone's polls
+                    refresh_at(when + self.poll_interval.total_seconds())
+                self.hass.async_create_task(self.async_refresh())
+
+            unsubscribe.append(async_call_at(self.hass, refresh, when))
+
+        @callback
+        def check_sources(event=None):
+            if all(self._get(entity_id) is not None for entity_id in self.source_entities):
+                start()
+
+        unsubscribe.append(
+            async_track_state_change_event(self.hass, self.source_entities, check_sources)
+        )
+        unsubscribe.append(async_at_started(self.hass, start))
+        check_sources()
+        return cancel
+
+    def _is_enabled(self, unique_id):
+        """Whether the sensor with unique_id f"{DOMAIN}_{zone}_{unique_id}" is enabled."""
+        registry = er.async_get(self.hass)
+        entity_id = registry.async_get_entity_id("sensor", DOMAIN, f"{DOMAIN}_{self.zone}_{unique_id}")
+        entry = registry.async_get(entity_id) if entity_id else None
+        # Sensors not registered yet are enabled by default
+        return entry is None or not entry.disabled_by
+
+    def _get(self, entity_id):
+        state = self.hass.states.get(entity_id)
+        try:
+            return float(state.state) if state else None
+        except (ValueError, TypeError):
+            return None
+
+
+class ComfortCoordinator(BaseComfortCoordinator):
+    """
+    Reads the source entities of one config entry and runs the comfort model
+    once per cycle. The resulting dict is shared by all sensors of the zone.
+    """
+
+    def __init__(self, hass, entry):
+        config = {**entry.data, **entry.options}
+
+        self.ta = config["ta"]
+        self.rh = config["rh"]
+        self.tr = config.get("tr")  # Optional
+        self.va = config.get("va")  # Optional
+        self.t_out = config.get("t_out")  # Optional, adaptive model only
+        self.occupancy = config.get(CONF_OCCUPANCY)  # Optional, statistics only
+        self.stats_period = config.get(CONF_STATS_PERIOD, DEFAULT_STATS_PERIOD)
+        self.set_threshold = config.get(CONF_SET_THRESHOLD, DEFAULT_SET_THRESHOLD)
+        self.sensitivities = config.get(CONF_SENSITIVITIES, False)
+        super().__init__(hass, entry)
+
+    @property
+    def source_entities(self):
+        """All configured input entities of this zone."""
+        return [e for e in [self.ta, self.tr, self.va, self.rh, self.clo, self.met] if e]
+
+    async def _async_update_data(self):
+        start = time.perf_counter()
+        inputs = self.read_inputs()
+        if inputs is None:
+            self.diagnostics.count("missing_inputs")
+            return dict.fromkeys((*METRICS, *PHYSIOLOGY))
+
+        metrics = self.enabled_metrics()
+        key, inputs = self.cache.quantize(inputs)
+        key += (metrics, self.sensitivities)
+        model = (
+            calculate_thermal_comfort_sensitivities if self.sensitivities else calculate_thermal_comfort
+        )
+
+        # The table path runs on the event loop, so only the cheap float model
+        # may use it: sensitivities need the full dual-number run in the pool
+        if self.engine == ENGINE_TABLE and not self.sensitivities:
+            # None while the table is being built or outside the grid
+            values = self.tables.lookup(**inputs)
+            if values is not None:
+                set_val, ce = values
+                result, counters, seconds = instrumented(
+                    calculate_thermal_comfort, **inputs, set_val=set_val, ce=ce, metrics=metrics
+                )
+                counters["table_hits"] = 1
+                self.diagnostics.record(time.perf_counter() - start, counters, seconds, inputs)
+                return result
+
+        result = self.cache.get(key)
+        if result is not None:
+            self.diagnostics.record(time.perf_counter() - start, {"cache_hits": 1})
+            return result
+
+        # The last cooling effect of this zone warm-starts the next solve
+        ce_guess = self.data.get("ce") if self.data else None
+
+        try:
+            result, counters, seconds = await self.executor.async_run(
+                self.zone,
+                partial(
+                    instrumented,
+                    model,
+                    **inputs,
+                    ce_guess=ce_guess,
+                    metrics=metrics,
+                ),
+            )
+        except StaleJobError:
+            # A newer update for this zone is already running and will publish
+            self.diagnostics.count("stale_jobs")
+            return self.data
+
+        self.diagnostics.record(time.perf_counter() - start, counters, seconds, inputs)
+
+        # Failed calculations are not cached so they are retried next time
+        if any(v is not None for v in result.values()):
+            self.cache.put(key, result)
+        return result
+
+    def enabled_metrics(self):
+        """
+        The metrics whose sensors are enabled, so that the model can skip
+        stages nobody uses (e.g. the SET run when the SET sensor is disabled).
+        """
+        needed = {m for m in METRICS if self._is_enabled(m)}
+        # Statistics sensors integrate the metric they are based on
+        needed.update(m for key, m in STATISTICS_METRICS.items() if self._is_enabled(f"stats_{key}"))
+        # Physiology sensors read the state of the SET run
+        if any(self._is_enabled(key) for key in PHYSIOLOGY_SENSORS):
+            needed.add("set")
+        return tuple(m for m in METRICS if m in needed)
+
+    def read_inputs(self):
+        """Returns the current model inputs, or None if a required one is missing."""
+        ta = self._get(self.ta)
+        rh = self._get(self.rh)
+        clo = self._get(self.clo)
+        met = self._get(self.met)
+
+        # Optional parameters
+        va = self._get(self.va) if self.va else 0.0
+        tr = self._get(self.tr) if self.tr else ta  # fallback to ta
+
+        if any(x is None for x in [ta, rh, clo, met, va, tr]):
+            return None
+
+        return {"ta": ta, "tr": tr, "va": va, "rh": rh, "clo": clo, "met": met}
+
+
+class MultiZoneCoordinator(BaseComfortCoordinator):
+    """
+    Several zones sharing the clo and met entities of one config entry. Each
+    cycle reads all zones and evaluates those not found in the cache in a
+    single calculate_thermal_comfort_batch call. The data is a list with the
+    result dict of each zone, in the order of the entry's zones.
+    """
+
+    def __init__(self, hass, entry):
+        # Each zone: {"name", "ta", "rh"} and optionally "tr", "va"
+        self.zones = entry.data[CONF_ZONES]
+        super().__init__(hass, entry)
+
+    @property
+    def source_entities(self):
+        """All configured input entities of all zones."""
+        entities = [self.clo, self.met]
+        for zone in self.zones:
+            entities += [zone.get(k) for k in ("ta", "tr", "va", "rh") if zone.get(k)]
+        return entities
+
+    async def _async_update_data(self):
+        start = time.perf_counter()
+        clo = self._get(self.clo)
+        met = self._get(self.met)
+        metrics = self.enabled_metrics()
+
+        results = [None] * len(self.zones)
+        pending = []  # (zone index, cache key, quantized inputs)
+        counters = {"cache_hits": 0}
+        for i, zone in enumerate(self.zones):
+            inputs = self.read_inputs(zone, clo, met)
+            if inputs is None:
+                results[i] = dict.fromkeys((*METRICS, *PHYSIOLOGY))
+                continue
+            key, inputs = self.cache.quantize(inputs)
+            key += (metrics,)
+            results[i] = self.cache.get(key)
+            if results[i] is None:
+                pending.append((i, key, inputs))
+            else:
+                counters["cache_hits"] += 1
+
+        seconds = None
+        if pending:
+            arrays = {name: np.array([inputs[name] for _, _, inputs in pending]) for name in INPUTS}
+            try:
+                batch, model_counters, seconds = await self.executor.async_run(
+                    self.zone,
+                    partial(instrumented, calculate_thermal_comfort_batch, **arrays, metrics=metrics),
+                )
+            except StaleJobError:
+                # A newer update of this entry is already running and will publish
+                self.diagnostics.count("stale_jobs")
+                return self.data
+
+            counters.update(model_counters, batch_zones=len(pending))
+            for j, (i, key, _) in enumerate(pending):
+                result = {k: as_scalar(values[j]) for k, values in batch.items()}
+                results[i] = result
+                # Failed calculations are not cached so they are retried next time
+                if any(v is not None for v in result.values()):
+                    self.cache.put(key, result)
+
+        self.diagnostics.record(time.perf_counter() - start, counters, seconds)
+        return results
+
+    def enabled_metrics(self):
+        """The metrics with an enabled sensor in any zone."""
+        zones = range(len(self.zones))
+        needed = {m for m in METRICS if any(self._is_enabled(f"{i}_{m}") for i in zones)}
+        # Physiology sensors read the state of the SET run
+        if any(self._is_enabled(f"{i}_{key}") for i in zones for key in PHYSIOLOGY_SENSORS):
+            needed.add("set")
+        return tuple(m for m in METRICS if m in needed)
+
+    def zone_inputs(self, index):
+        """Returns the current model inputs of the zone at index, or None."""
+        return self.read_inputs(self.zones[index], self._get(self.clo), self._get(self.met))
+
+    def read_inputs(self, zone, clo, met):
+        """
+        Returns the model inputs of one zone, or None if a required one is
+        missing. clo and met are the shared values.
+        """
+        ta = self._get(zone["ta"])
+        rh = self._get(zone["rh"])
+        va = self._get(zone["va"]) if zone.get("va") else 0.0
+        tr = self._get(zone["tr"]) if zone.get("tr") else ta  # fallback to ta
+
+        if any(x is None for x in [ta, rh, clo, met, va, tr]):
+            return None
+
+        return {"ta": ta, "tr": tr, "va": va, "rh": rh, "clo": clo, "met": met}
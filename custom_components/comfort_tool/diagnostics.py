@@ -0,0 +1,17 @@
+"""Diagnostics download of a comfort zone: its solver counters and timings."""
+from .const import DATA_CACHE, DATA_EXECUTOR, DOMAIN
+
+
+async def async_get_config_entry_diagnostics(hass, entry):
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    executor = hass.data[DOMAIN][DATA_EXECUTOR]
+
+    return {
+        "entry": {**entry.data, **entry.options},
+        "engine": coordinator.engine,
+        "update_mode": coordinator.update_mode,
+        "last_result": coordinator.data,
+        "diagnostics": coordinator.diagnostics.as_dict(),
+        "cache": hass.data[DOMAIN][DATA_CACHE].stats,
+        "executor": {"backend": executor.backend, "max_workers": executor.max_workers},
+    }
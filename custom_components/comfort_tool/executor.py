@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .const import DEFAULT_MAX_WORKERS, DOMAIN, EXECUTOR_PROCESS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StaleJobError(Exception):
+    """Raised when a job was superseded by a newer job for the same zone."""
+
+
+class ComfortExecutor:
+    """
+    Runs comfort model jobs off the event loop in a bounded worker pool.
+
+    At most max_workers jobs run at the same time; the rest wait in the pool queue.
+    Every job belongs to a zone. Submitting a new job for a zone cancels the job
+    still queued for it (or discards its result if it is already running), so a
+    busy pool never spends time on stale inputs.
+
+    The thread backend is the default. The process backend sidesteps the GIL for
+    very large installs; it requires the job function and its arguments to be
+    picklable, which holds for the module-level functions in comfort.py.
+    """
+
+    def __init__(self, backend=None, max_workers=DEFAULT_MAX_WORKERS):
+        self.backend = backend
+        self.max_workers = max_workers
+        if backend == EXECUTOR_PROCESS:
+            # Forking the multi-threaded Home Assistant process is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix=DOMAIN)
+        self._jobs = {}
+
+    async def async_run(self, zone, fn, *args):
+        """
+        Runs fn(*args) in the pool and returns its result.
+        Raises StaleJobError if a newer job for the same zone replaced this one.
+        """
+        previous = self._jobs.pop(zone, None)
+        if previous is not None and not previous.done():
+            previous.cancel()
+
+        future = asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        self._jobs[zone] = future
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if self._jobs.get(zone) is not future and future.cancelled():
+                raise StaleJobError(f"Job for {zone} superseded") from None
+            raise
+        finally:
+            if self._jobs.get(zone) is future:
+                del self._jobs[zone]
+
+    def shutdown(self):
+        _LOGGER.debug("Shutting down %s executor", self.backend or "thread")
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,105 @@
+"""
+Counters and timings for the hot paths of the comfort model.
+
+The model functions report what they did (loop iterations, solver
+evaluations, non-convergence) through count(). Counting only happens inside
+instrumented(), which installs a fresh recorder for one call in the current
+context; everywhere else count() is a single context variable lookup. Because
+the recorder travels back with the result, counts stay correct when the model
+runs in a thread or process pool.
+"""
+import bisect
+import contextvars
+import time
+
+_recorder = contextvars.ContextVar("comfort_tool_recorder", default=None)
+
+# Upper bounds of the timing histogram buckets (ms); the last bucket is open
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+
+
+def count(name, n=1):
+    """Adds n to counter name of the active recorder, if any."""
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder[name] = recorder.get(name, 0) + n
+
+
+def instrumented(fn, *args, **kwargs):
+    """
+    Calls fn(*args, **kwargs) with a fresh recorder.
+    Returns (result, counters, seconds).
+    """
+    token = _recorder.set({})
+    start = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        counters = _recorder.get()
+        _recorder.reset(token)
+    return result, counters, time.perf_counter() - start
+
+
+class TimingHistogram:
+    """Fixed-bucket histogram of durations in milliseconds."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    @property
+    def samples(self):
+        return sum(self.counts)
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.samples if self.samples else None
+
+    def as_dict(self):
+        labels = [f"<={b}" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+        return {
+            "samples": self.samples,
+            "mean_ms": round(self.mean_ms, 3) if self.samples else None,
+            "max_ms": round(self.max_ms, 3),
+            "buckets_ms": dict(zip(labels, self.counts)),
+        }
+
+
+class ZoneDiagnostics:
+    """Accumulated counters and timings of one zone's updates."""
+
+    def __init__(self):
+        self.counters = {}
+        self.update_time = TimingHistogram()   # wall time of the whole update
+        self.compute_time = TimingHistogram()  # time spent in the model itself
+        self.last_update_ms = None
+        self.slowest = None
+
+    def record(self, wall_seconds, counters=None, compute_seconds=None, inputs=None):
+        ms = wall_seconds * 1000
+        self.last_update_ms = ms
+        self.update_time.record(ms)
+        if compute_seconds is not None:
+            self.compute_time.record(compute_seconds * 1000)
+        for name, n in (counters or {}).items():
+            self.counters[name] = self.counters.get(name, 0) + n
+        if self.slowest is None or ms > self.slowest["ms"]:
+            self.slowest = {"ms": round(ms, 3), "inputs": inputs, "counters": counters}
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def as_dict(self):
+        return {
+            "counters": dict(self.counters),
+            "last_update_ms": round(self.last_update_ms, 3) if self.last_update_ms is not None else None,
+            "update_time": self.update_time.as_dict(),
+            "compute_time": self.compute_time.as_dict(),
+            "slowest_update": self.slowest,
+        }
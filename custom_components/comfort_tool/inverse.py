@@ -0,0 +1,137 @@
+"""
+Inverse comfort problems: the air temperature or air speed at which PMV or
+SET reaches a target value, all other inputs held at their current values.
+
+solve() is a pure function so that it can run in the worker pool. The
+caller keeps the previous solution per zone (see InverseCache) and passes it
+as the guess of the next solve; with slowly changing conditions the root is
+then found on a tight bracket next to it in a few evaluations.
+"""
+import logging
+import math
+
+from . import solver
+from .comfort import pmv_elevated_airspeed
+
+_LOGGER = logging.getLogger(__name__)
+
+# Variable -> (lower bound, upper bound, step of the warm-start bracket, xtol,
+# whether PMV and SET increase with it)
+VARIABLES = {
+    "ta": (10.0, 40.0, 0.5, 0.01, True),
+    "va": (0.0, 2.0, 0.1, 0.005, False),
+}
+
+# Tolerance on the target value
+FTOL = {"pmv": 0.005, "set": 0.01}
+
+# Flag of a search ended by a model failure at one of its points (e.g. the
+# PMV clothing temperature iteration not converging)
+MODEL_FAILED = "model_failed"
+
+DEFAULT_MAX_EVALUATIONS = 20
+
+
+def solve(inputs, variable, metric, target, guess=None, max_evaluations=DEFAULT_MAX_EVALUATIONS,
+          tr_follows_ta=False):
+    """
+    Finds the value of variable ("ta" or "va") at which metric ("pmv" or
+    "set") equals target.
+
+    Parameters:
+    - inputs: dict with ta, tr, va, rh, clo and met
+    - guess: previous solution to warm-start from, if any
+    - max_evaluations: total model evaluations allowed, including the
+      warm-start attempt
+    - tr_follows_ta: move tr together with ta (zones without a radiant
+      temperature sensor use tr = ta)
+
+    Returns:
+    - dict with "value" (None unless converged), "achieved" (the metric at
+      value), "converged", "flag" (solver.CONVERGED, NOT_BRACKETED when the
+      target is not reachable within the variable's bounds, MAX_EVALUATIONS,
+      or MODEL_FAILED when the model raised at a point of the search),
+      "evaluations" and "limit": the bound closest to the target when it is
+      not reachable.
+    """
+    lower, upper, step, xtol, increasing = VARIABLES[variable]
+    ftol = FTOL[metric]
+    state = {"ce": None, "evaluations": 0, "achieved": {}}
+
+    def fn(x):
+        args = dict(inputs)
+        args[variable] = x
+        if variable == "ta" and tr_follows_ta:
+            args["tr"] = x
+        state["evaluations"] += 1
+        try:
+            result = pmv_elevated_airspeed(
+                args["ta"], args["tr"], args["va"], args["rh"], args["met"], args["clo"],
+                ce_guess=state["ce"], outputs=(metric,),
+            )
+        except (RuntimeError, ArithmeticError) as err:
+            raise _ModelError(f"{variable}={x}: {err}") from err
+        # Neighbouring evaluations have similar cooling effects
+        if result["cooling_effect"]:
+            state["ce"] = result["cooling_effect"]
+        state["achieved"][x] = result[metric]
+        return result[metric] - target
+
+    try:
+        result = None
+        if guess is not None and lower <= guess <= upper:
+            result = solver.brentq_near(
+                fn, guess, step, lower, upper, increasing,
+                xtol=xtol, ftol=ftol, max_evaluations=max_evaluations,
+            )
+
+        if result is None or (not result.converged and state["evaluations"] < max_evaluations):
+            budget = max_evaluations - state["evaluations"]
+            f_lower = fn(lower) if budget >= 2 else None
+            f_upper = fn(upper) if budget >= 2 else None
+            if f_lower is not None and f_lower * f_upper > 0:
+                # Target outside the range: report the bound that comes closest
+                limit = lower if abs(f_lower) < abs(f_upper) else upper
+                return _result(None, state, solver.NOT_BRACKETED, limit)
+            if f_lower is not None:
+                result = solver.brentq(
+                    fn, lower, upper, xtol=xtol, ftol=ftol,
+                    max_evaluations=budget - 2, fa=f_lower, fb=f_upper,
+                )
+    except _ModelError as err:
+        _LOGGER.warning("Setpoint search stopped, the comfort model failed at %s", err)
+        return _result(None, state, MODEL_FAILED)
+
+    if result is None or not result.converged:
+        return _result(None, state, solver.MAX_EVALUATIONS)
+    return _result(result.root, state, solver.CONVERGED)
+
+
+class _ModelError(Exception):
+    """The comfort model raised at a point of the search."""
+
+
+def _result(value, state, flag, limit=None):
+    achieved = state["achieved"].get(value if value is not None else limit)
+    return {
+        "value": round(value, 3) if value is not None else None,
+        "achieved": round(achieved, 3) if achieved is not None and not math.isnan(achieved) else None,
+        "converged": flag == solver.CONVERGED,
+        "flag": flag,
+        "evaluations": state["evaluations"],
+        "limit": limit,
+    }
+
+
+class InverseCache:
+    """Last solution per (zone, variable, metric), the guess of the next solve."""
+
+    def __init__(self):
+        self._solutions = {}
+
+    def guess(self, zone, variable, metric):
+        return self._solutions.get((zone, variable, metric))
+
+    def update(self, zone, variable, metric, result):
+        if result["converged"]:
+            self._solutions[(zone, variable, metric)] = result["value"]
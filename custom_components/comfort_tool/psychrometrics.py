@@ -1,5 +1,5 @@
 import math
-from . import util
+from .solver import brentq
 
 PROP = {
     "Patm": 101325.0,
@@ -54,70 +54,140 @@ def dewpoint(w):
     pw = (PROP["Patm"] * w) / (0.62198 + w)
     return sattemp(pw)
 
+# Saturation pressure at 0 °C (Pa); below it satpress uses the ice formula
+P_TRIPLE = satpress(0.0)
+
+def _ln_satpress(tKel):
+    """ln(satpress) and its derivative with respect to the temperature."""
+    if tKel < 273.15:
+        return (
+            -5674.5359 / tKel
+            + 6.3925247
+            + tKel * (-0.009677843 + tKel * (0.00000062215701 + tKel * (0.0000000020747825 - 0.0000000000009484024 * tKel)))
+            + 4.1635019 * math.log(tKel),
+            5674.5359 / tKel**2
+            - 0.009677843
+            + tKel * (2 * 0.00000062215701 + tKel * (3 * 0.0000000020747825 - 4 * 0.0000000000009484024 * tKel))
+            + 4.1635019 / tKel,
+        )
+    return (
+        -5800.2206 / tKel
+        + 1.3914993
+        + tKel * (-0.048640239 + tKel * (0.000041764768 + tKel * -0.000000014452093))
+        + 6.5459673 * math.log(tKel),
+        5800.2206 / tKel**2
+        - 0.048640239
+        + tKel * (2 * 0.000041764768 + tKel * 3 * -0.000000014452093)
+        + 6.5459673 / tKel,
+    )
+
 def sattemp(p):
-    fn = lambda t: p - satpress(t)
-    return util.bisect(0, 500, fn, 0.0001, 0)
+    """
+    Inverse of satpress: Newton iteration on ln(satpress), started from the
+    inverted Magnus formula (within 0.5 °C on -40..100 °C), so it converges
+    in 2-3 steps.
+    """
+    if not p > 0:
+        return float("nan")
+    lnp = math.log(p)
+    gamma = math.log(p / 611.2)
+    tKel = 243.12 * gamma / (17.62 - gamma) + PROP["TKelConv"]
+    # Stay on one side of the kink of satpress at 0 °C
+    tKel = max(tKel, 273.15) if p >= P_TRIPLE else min(tKel, 273.15 - 1e-9)
+    for _ in range(20):
+        value, slope = _ln_satpress(tKel)
+        step = (value - lnp) / slope
+        tKel -= step
+        if abs(step) < 1e-9:
+            break
+    return tKel - PROP["TKelConv"]
 
 def tairsat(hsat):
     fn = lambda t: hsat - enthsat(t)
-    return util.bisect(0, 1000, fn, 0.01, 0)
-
-def wetbulb(tdb, w):
+    # Saturation pressure exceeds the atmospheric pressure above 100 °C
+    return brentq(fn, -100, 99, xtol=0.01).value
+
+def wetbulb(tdb, w, tdp=None):
+    """
+    Wet bulb temperature, solved on a bracket of a few degrees around
+    [dewpoint, tdb]. tdp is the dew point if the caller already has it.
+    """
     def fn(t):
         psat_star = satpress(t)
         w_star = humratio(PROP["Patm"], psat_star)
         newW = ((PROP["Hfg"] - PROP["CpWat"] - PROP["CpVap"] * t) * w_star - PROP["CpAir"] * (tdb - t)) / \
                (PROP["Hfg"] + PROP["CpVap"] * tdb - PROP["CpWat"] * t)
         return w - newW
-    return util.bisect(-100, 200, fn, 0.01, 0)
-
-def tdb_rh(tdb, rh):
+    if tdp is None:
+        tdp = dewpoint(w)
+    # The wet bulb temperature lies between the dew point and tdb
+    if not math.isnan(tdp):
+        result = brentq(fn, tdp - 1, tdb + 1, xtol=0.01)
+        if result.converged:
+            return result.root
+    return brentq(fn, -100, tdb + 5, xtol=0.01).value
+
+# Quantities of the tdb_* conversions that need an iterative solve. They are
+# computed only when requested through outputs (None: all of them).
+DERIVED = ("wetbulb", "dewpoint")
+
+def _derived(result, tdb, outputs):
+    wanted = [k for k in DERIVED if (outputs is None or k in outputs) and k not in result]
+    if wanted:
+        tdp = result.get("dewpoint")
+        if tdp is None:
+            tdp = dewpoint(result["w"])
+        if "dewpoint" in wanted:
+            result["dewpoint"] = tdp
+        if "wetbulb" in wanted:
+            result["wetbulb"] = wetbulb(tdb, result["w"], tdp)
+    return result
+
+def tdb_rh(tdb, rh, outputs=None):
     psat = satpress(tdb)
     vappress = (rh / 100) * psat
     w = humratio(PROP["Patm"], vappress)
-    return {
+    return _derived({
         "rh": rh,
         "vappress": vappress,
         "w": w,
-        "wetbulb": wetbulb(tdb, w),
-        "dewpoint": dewpoint(w),
-    }
+    }, tdb, outputs)
 
-def tdb_twb(tdb, twb):
+def tdb_twb(tdb, twb, outputs=None):
     psat = satpress(twb)
     wstar = humratio(PROP["Patm"], psat)
     w = ((PROP["Hfg"] + (PROP["CpVap"] - PROP["CpWat"]) * twb) * wstar - PROP["CpAir"] * (tdb - twb)) / \
         (PROP["Hfg"] + PROP["CpVap"] * tdb - PROP["CpWat"] * twb)
     psat = satpress(tdb)
     rh = 100 * relhum(PROP["Patm"], psat, w)
-    return {
+    return _derived({
         "wetbulb": twb,
         "w": w,
         "rh": rh,
-        "dewpoint": dewpoint(w),
         "vappress": (rh / 100) * psat,
-    }
+    }, tdb, outputs)
 
-def tdb_w(tdb, w):
+def tdb_w(tdb, w, outputs=None, tdp=None):
     psat = satpress(tdb)
     rh = 100 * relhum(PROP["Patm"], psat, w)
-    return {
+    result = {
         "w": w,
         "rh": rh if rh <= 100 else float('nan'),
-        "wetbulb": wetbulb(tdb, w),
-        "dewpoint": dewpoint(w),
         "vappress": (rh / 100) * psat,
     }
+    if tdp is not None:
+        result["dewpoint"] = tdp
+    return _derived(result, tdb, outputs)
 
-def tdb_dewpoint(tdb, dewpoint_temp):
-    fn = lambda w: dewpoint_temp - dewpoint(w)
-    w = util.bisect(0.00001, 0.2, fn, 0.0001, 0)
-    return tdb_w(tdb, w)
+def tdb_dewpoint(tdb, dewpoint_temp, outputs=None):
+    # The dew point fixes the vapour pressure directly
+    w = humratio(PROP["Patm"], satpress(dewpoint_temp))
+    return tdb_w(tdb, w, outputs, tdp=dewpoint_temp)
 
-def tdb_vappress(tdb, vappress):
+def tdb_vappress(tdb, vappress, outputs=None):
     psat = satpress(tdb)
     rh = (100 * vappress) / psat
-    return tdb_rh(tdb, rh)
+    return tdb_rh(tdb, rh, outputs)
 
 def convert(x, tdb, origin, target):
     converters = {
@@ -127,7 +197,7 @@ def convert(x, tdb, origin, target):
         "dewpoint": tdb_dewpoint,
         "vappress": tdb_vappress,
     }
-    a = converters[origin](tdb, x)
+    a = converters[origin](tdb, x, outputs=(target,))
     return a[target]
 
 def globetemp(ta, vel, tglobe, diameter, emissivity):
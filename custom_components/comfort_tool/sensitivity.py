@@ -0,0 +1,302 @@
+"""
+Sensitivities of PMV, SET and the cooling effect with respect to ta, tr, va
+and rh, in one pass of the models.
+
+pmv() and pierce_set() are evaluated with forward-mode dual numbers: every
+input carries its partial derivatives, and every operation of the model
+propagates them, including through the clothing-temperature and skin-model
+iterations. The cooling effect is the root of
+
+    SET(ta, tr, va, rh) = SET(ta - ce, tr - ce, 0.1, rh)
+
+and is differentiated implicitly from the partial derivatives of both sides
+at the solution, so the root search runs on floats only, once.
+"""
+import math
+
+from .comfort import (
+    STILL_AIR_THRESHOLD,
+    calculate_thermal_comfort,
+    cooling_effect,
+    dynamic_clothing,
+    pierce_set,
+    pmv,
+    relative_air_speed,
+)
+from .const import METRICS, PHYSIOLOGY
+
+# The inputs derivatives are taken with respect to, in the order of Dual.d
+INPUTS = ("ta", "tr", "va", "rh")
+
+# Metrics with sensitivities
+SENSITIVITY_METRICS = ("pmv", "set", "ce")
+
+
+class Dual:
+    """
+    A value x with its partial derivatives d0 to d3 with respect to INPUTS.
+    The four components are spelled out instead of looping over a tuple:
+    the models run a few thousand operations, so this is several times
+    faster.
+    """
+
+    __slots__ = ("x", "d0", "d1", "d2", "d3")
+
+    def __init__(self, x, d0=0.0, d1=0.0, d2=0.0, d3=0.0):
+        self.x = x
+        self.d0 = d0
+        self.d1 = d1
+        self.d2 = d2
+        self.d3 = d3
+
+    @classmethod
+    def variable(cls, x, index):
+        """The input at INPUTS[index] with value x."""
+        d = [0.0] * len(INPUTS)
+        d[index] = 1.0
+        return cls(x, *d)
+
+    @property
+    def d(self):
+        return (self.d0, self.d1, self.d2, self.d3)
+
+    def gradient(self):
+        return dict(zip(INPUTS, self.d))
+
+    def _scale(self, x, factor):
+        """A Dual with value x and the derivatives of self times factor (chain rule)."""
+        return Dual(x, factor * self.d0, factor * self.d1, factor * self.d2, factor * self.d3)
+
+    def __add__(self, other):
+        if isinstance(other, Dual):
+            return Dual(
+                self.x + other.x,
+                self.d0 + other.d0, self.d1 + other.d1, self.d2 + other.d2, self.d3 + other.d3,
+            )
+        return Dual(self.x + other, self.d0, self.d1, self.d2, self.d3)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, Dual):
+            return Dual(
+                self.x - other.x,
+                self.d0 - other.d0, self.d1 - other.d1, self.d2 - other.d2, self.d3 - other.d3,
+            )
+        return Dual(self.x - other, self.d0, self.d1, self.d2, self.d3)
+
+    def __rsub__(self, other):
+        return Dual(other - self.x, -self.d0, -self.d1, -self.d2, -self.d3)
+
+    def __neg__(self):
+        return Dual(-self.x, -self.d0, -self.d1, -self.d2, -self.d3)
+
+    def __mul__(self, other):
+        if isinstance(other, Dual):
+            x, y = self.x, other.x
+            return Dual(
+                x * y,
+                self.d0 * y + x * other.d0,
+                self.d1 * y + x * other.d1,
+                self.d2 * y + x * other.d2,
+                self.d3 * y + x * other.d3,
+            )
+        return Dual(self.x * other, other * self.d0, other * self.d1, other * self.d2, other * self.d3)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, Dual):
+            y = other.x
+            x = self.x / y
+            return Dual(
+                x,
+                (self.d0 - x * other.d0) / y,
+                (self.d1 - x * other.d1) / y,
+                (self.d2 - x * other.d2) / y,
+                (self.d3 - x * other.d3) / y,
+            )
+        return Dual(self.x / other, self.d0 / other, self.d1 / other, self.d2 / other, self.d3 / other)
+
+    def __rtruediv__(self, other):
+        x = other / self.x
+        return self._scale(x, -x / self.x)
+
+    def __pow__(self, n):
+        # Constant exponents only
+        return self._scale(self.x ** n, n * self.x ** (n - 1))
+
+    def __round__(self, n=None):
+        return round(self.x, n)
+
+    def __abs__(self):
+        return -self if self.x < 0 else self
+
+    def exp(self):
+        x = math.exp(self.x)
+        return self._scale(x, x)
+
+    def sqrt(self):
+        x = math.sqrt(self.x)
+        # Infinite slope at 0, where it only occurs for the forced convection
+        # coefficient of still air, which the natural one then dominates
+        return self._scale(x, 0.5 / x if x > 0 else 0.0)
+
+    # Branches of the models follow the values
+    def __lt__(self, other):
+        return self.x < (other.x if isinstance(other, Dual) else other)
+
+    def __le__(self, other):
+        return self.x <= (other.x if isinstance(other, Dual) else other)
+
+    def __gt__(self, other):
+        return self.x > (other.x if isinstance(other, Dual) else other)
+
+    def __ge__(self, other):
+        return self.x >= (other.x if isinstance(other, Dual) else other)
+
+    def __repr__(self):
+        return f"Dual({self.x!r}, {self.d!r})"
+
+
+class DualMath:
+    """
+    exp and sqrt for models evaluated with Dual numbers, passed to pmv() and
+    pierce_set() as their mathlib. Plain floats still occur there (e.g.
+    functions of met only) and go to math.
+    """
+
+    @staticmethod
+    def exp(x):
+        return x.exp() if isinstance(x, Dual) else math.exp(x)
+
+    @staticmethod
+    def sqrt(x):
+        return x.sqrt() if isinstance(x, Dual) else math.sqrt(x)
+
+
+def _gradient(value):
+    """Partial derivatives of a model output, zero for outputs that are constants."""
+    if isinstance(value, Dual):
+        return value.gradient()
+    return dict.fromkeys(INPUTS, 0.0)
+
+
+# pierce_set options of the cooling effect's SET runs (see comfort.cooling_effect)
+CE_SET_OPTIONS = dict(wme=0, calculate_ce=True, max_skin_blood_flow=90, body_position="standing")
+
+
+def pmv_elevated_airspeed_dual(ta, tr, vel, rh, met, clo, wme=0, set_val=None, ce=None, ce_guess=None,
+                               outputs=None):
+    """
+    comfort.pmv_elevated_airspeed evaluated with Dual numbers: the same
+    results, those depending on ta, tr, vel and rh as Duals carrying their
+    partial derivatives.
+
+    The cooling effect is solved once with floats, on the reference SET of
+    the dual run; only the still-air SET at the root is evaluated with
+    Duals again for the implicit derivative. A precomputed set_val is
+    returned as it is, without derivatives.
+    """
+    if outputs is None:
+        outputs = ("pmv", "set", "cooling_effect")
+    need_pmv = "pmv" in outputs or "ppd" in outputs
+    ta_d, tr_d, vel_d, rh_d = (Dual.variable(x, i) for i, x in enumerate((ta, tr, vel, rh)))
+
+    rel_vel = relative_air_speed(vel, met)
+    rel_vel_d = relative_air_speed(vel_d, met)
+    dyn_clo = dynamic_clothing(clo, met)
+
+    ce_d = None
+    still = rel_vel <= 0.1
+    if still and (ce is not None or need_pmv or "cooling_effect" in outputs):
+        ce_d = 0
+    elif ce is not None or need_pmv or "cooling_effect" in outputs:
+        set_ref = pierce_set(
+            ta_d, tr_d, rel_vel_d, rh_d, met, dyn_clo, **CE_SET_OPTIONS, mathlib=DualMath,
+        )["set"]
+        if ce is None:
+            ce = cooling_effect(
+                ta, tr, rel_vel, rh, met, dyn_clo,
+                ce_guess=ce_guess, set_ref=set_ref.x,
+            )
+        still = ce == 0
+        if still:
+            ce_d = 0
+        else:
+            # Implicit differentiation of SET_ref(x) = SET_still(ta - ce, tr - ce, rh):
+            #   dce/dx = (dSET_still/dx - dSET_ref/dx) / (dSET_still/dta + dSET_still/dtr)
+            # with the still-air partials taken at the shifted temperatures
+            set_still = pierce_set(
+                Dual.variable(ta - ce, 0), Dual.variable(tr - ce, 1), STILL_AIR_THRESHOLD, rh_d,
+                met, dyn_clo, **CE_SET_OPTIONS, mathlib=DualMath,
+            )["set"]
+            ce_d = Dual(ce, *(
+                (still - ref) / (set_still.d0 + set_still.d1)
+                for still, ref in zip(set_still.d, set_ref.d)
+            ))
+
+    pmv_result = {"pmv": None, "ppd": None}
+    ta_adj = tr_adj = None
+    if ce_d is not None:
+        ta_adj = ta_d - ce_d
+        tr_adj = tr_d - ce_d
+        if need_pmv and still:
+            pmv_result = pmv(ta_d, tr_d, rel_vel_d, rh_d, met, dyn_clo, wme, mathlib=DualMath)
+        elif need_pmv:
+            pmv_result = pmv(ta_adj, tr_adj, STILL_AIR_THRESHOLD, rh_d, met, dyn_clo, wme, mathlib=DualMath)
+
+    physiology = dict.fromkeys(PHYSIOLOGY)
+    if set_val is None and "set" in outputs:
+        set_result = pierce_set(
+            ta_d, tr_d, vel_d, rh_d, met, clo, wme, mathlib=DualMath
+        )
+        set_val = set_result["set"]
+        physiology = {k: set_result[k] for k in PHYSIOLOGY}
+
+    return {
+        "pmv": pmv_result["pmv"],
+        "ppd": pmv_result["ppd"],
+        "set": set_val,
+        "ta_adj": ta_adj,
+        "tr_adj": tr_adj,
+        "cooling_effect": ce_d,
+        **physiology,
+    }
+
+
+def calculate_thermal_comfort_sensitivities(ta, tr, va, rh, clo, met, wme=0, metrics=None, **kwargs):
+    """
+    calculate_thermal_comfort evaluated once with Dual numbers: the same
+    results, with the sensitivities of pmv, set and ce (those requested and
+    available) added under "sensitivities", rounded to 4 decimals.
+    """
+    comfort = {}
+
+    def model(**args):
+        comfort.update(pmv_elevated_airspeed_dual(**args))
+        return comfort
+
+    result = calculate_thermal_comfort(ta, tr, va, rh, clo, met, wme, metrics=metrics, model=model, **kwargs)
+    values = {"pmv": comfort.get("pmv"), "set": comfort.get("set"), "ce": comfort.get("cooling_effect")}
+    outputs = [
+        m for m in SENSITIVITY_METRICS
+        if m in (metrics if metrics is not None else METRICS) and result[m] is not None
+    ]
+    if outputs:
+        result["sensitivities"] = {
+            metric: {k: round(v, 4) for k, v in _gradient(values[metric]).items()} for metric in outputs
+        }
+    return result
+
+
+def calculate_thermal_comfort_sensitivities_batch(ta, tr, va, rh, clo, met, wme, metrics=None):
+    """
+    calculate_thermal_comfort_sensitivities for each element of equally
+    shaped 1-D arrays, as a list of result dicts. There is no vectorized
+    dual-number model, so the elements are evaluated one at a time.
+    """
+    return [
+        calculate_thermal_comfort_sensitivities(*(float(x) for x in args), metrics=metrics)
+        for args in zip(ta, tr, va, rh, clo, met, wme)
+    ]
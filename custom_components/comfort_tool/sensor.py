@@ -1,57 +1,122 @@
 import logging
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
-from homeassistant.const import UnitOfTemperature, PERCENTAGE
+from homeassistant.const import UnitOfTemperature, UnitOfTime, PERCENTAGE
+from homeassistant.core import callback
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity import EntityCategory
-from .const import DOMAIN
-from .comfort import calculate_thermal_comfort
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.restore_state import RestoredExtraData, RestoreEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+from .accumulators import ComfortStatistics, RunningMeanTemperature
+from .comfort import adaptive_ashrae
+from .const import CONF_ENTRY_TYPE, DOMAIN, ENTRY_TYPE_MULTI_ZONE, METRICS, PHYSIOLOGY_SENSORS, STATISTICS_METRICS
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
     _LOGGER.debug("Setting up comfort sensors")
-    config = entry.data
-
-    ta = config["ta"]
-    rh = config["rh"]
-    clo = config["clo"]
-    met = config["met"]
-    tr = config.get("tr")  # Optional
-    va = config.get("va")  # Optional
+    config = {**entry.data, **entry.options}
+    coordinator = hass.data[DOMAIN][entry.entry_id]
     prefix = config.get("name", "Comfort")
 
     entities = []
-    for metric in ["pmv", "ppd", "set", "ce", "ts"]:
+    for key in DIAGNOSTICS:
+        entities.append(ComfortDiagnosticSensor(
+            coordinator, entry.entry_id,
+            key, prefix
+        ))
+
+    if config.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_MULTI_ZONE:
+        # One device with the five metric sensors (and physiology) per zone
+        for zone, zone_config in enumerate(coordinator.zones):
+            for metric in METRICS:
+                entities.append(ComfortSensor(
+                    coordinator, entry.entry_id,
+                    metric, zone_config["name"], zone
+                ))
+            for key in PHYSIOLOGY_SENSORS:
+                entities.append(ComfortPhysiologySensor(
+                    coordinator, entry.entry_id,
+                    key, zone_config["name"], zone
+                ))
+        async_add_entities(entities)
+        return
+
+    for metric in METRICS:
         entities.append(ComfortSensor(
-            hass, entry.entry_id,
-            ta, tr, va, rh, clo, met,
+            coordinator, entry.entry_id,
             metric, prefix
         ))
+    for key in PHYSIOLOGY_SENSORS:
+        entities.append(ComfortPhysiologySensor(
+            coordinator, entry.entry_id,
+            key, prefix
+        ))
+    if coordinator.t_out:
+        entities.append(AdaptiveComfortSensor(coordinator, entry.entry_id, prefix))
+    for key in STATISTICS:
+        entities.append(ComfortStatisticsSensor(
+            coordinator, entry.entry_id,
+            key, prefix
+        ))
+
+    async_add_entities(entities)
+
+# Diagnostic entities: key -> (name, icon). "update_time" is the wall time of
+# the last update, the others are running totals of the model's counters.
+DIAGNOSTICS = {
+    "update_time": ("Update Time", "mdi:timer-outline"),
+    "pierce_set_runs": ("SET Model Runs", "mdi:counter"),
+    "tcl_iterations": ("Clothing Iterations", "mdi:counter"),
+    "pmv_iterations": ("PMV Iterations", "mdi:counter"),
+    "ce_evaluations": ("CE Evaluations", "mdi:counter"),
+    "ce_warm_start_fallbacks": ("CE Warm Start Fallbacks", "mdi:counter"),
+    "non_convergence": ("Convergence Failures", "mdi:alert-circle-outline"),
+    "errors": ("Calculation Errors", "mdi:alert-outline"),
+}
+
+# Statistics entities: key -> (name, icon, unit, ComfortStatistics attribute)
+STATISTICS = {
+    "time_in_comfort": ("Time in Comfort", "mdi:percent-circle-outline", PERCENTAGE, "time_in_comfort"),
+    "ppd_exceedance": ("PPD Exceedance Hours", "mdi:timer-alert-outline", UnitOfTime.HOURS, "ppd_exceedance_hours"),
+    "set_degree_hours": ("SET Degree-Hours", "mdi:thermometer-alert", "°C·h", "set_degree_hours"),
+}
+
+# Physiology entities (two-node model state of the SET run): key -> (name, icon, unit)
+PHYSIOLOGY = {
+    "t_skin": ("Skin Temperature", "mdi:thermometer-lines", UnitOfTemperature.CELSIUS),
+    "t_core": ("Core Temperature", "mdi:thermometer-lines", UnitOfTemperature.CELSIUS),
+    "skin_wet": ("Skin Wettedness", "mdi:water-percent", PERCENTAGE),
+    "q_tot_evap": ("Skin Evaporative Heat Loss", "mdi:water-thermometer-outline", "W/m²"),
+    "q_resp": ("Respiratory Heat Loss", "mdi:lungs", "W/m²"),
+}
 
-    async_add_entities(entities, True)
+def _device_info(identifier, name):
+    return DeviceInfo(
+        identifiers={(DOMAIN, identifier)},
+        name=name,
+        manufacturer="Indoor Thermal Comfort",
+        model="Comfort Tool",
+        entry_type=DeviceEntryType.SERVICE,
+    )
 
-class ComfortSensor(SensorEntity):
-    def __init__(self, hass, entry_id, ta, tr, va, rh, clo, met, metric, prefix):
-        self._hass = hass
+class ComfortSensor(CoordinatorEntity, SensorEntity):
+    def __init__(self, coordinator, entry_id, metric, prefix, zone=None):
+        """zone: index of the zone in a multi-zone entry, None for a single zone."""
+        super().__init__(coordinator)
         self._metric = metric
-        self._ta = ta
-        self._tr = tr
-        self._va = va
-        self._rh = rh
-        self._clo = clo
-        self._met = met
+        self._zone = zone
 
         self._attr_name = f"{prefix} {metric.upper()}"
-        self._attr_unique_id = f"{DOMAIN}_{entry_id}_{metric}"
+        if zone is None:
+            self._attr_unique_id = f"{DOMAIN}_{entry_id}_{metric}"
+            self._attr_device_info = _device_info(entry_id, prefix)
+        else:
+            self._attr_unique_id = f"{DOMAIN}_{entry_id}_{zone}_{metric}"
+            self._attr_device_info = _device_info(f"{entry_id}_{zone}", prefix)
 #       self._attr_entity_category = EntityCategory.DIAGNOSTIC
         self._attr_native_value = None
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, entry_id)},
-            name=prefix,
-            manufacturer="Indoor Thermal Comfort",
-            model="Comfort Tool",
-            entry_type=DeviceEntryType.SERVICE,
-        )
 
         icon_map = {
             "pmv": "mdi:scale-balance",
@@ -77,28 +142,239 @@ class ComfortSensor(SensorEntity):
 
     @property
     def native_value(self):
-        return self._attr_native_value
+        data = self.coordinator.data
+        if data and self._zone is not None:
+            data = data[self._zone]
+        if not data:
+            return None
+        return data.get(self._metric)
 
-    async def async_update(self):
-        ta = self._get(self._ta)
-        rh = self._get(self._rh)
-        clo = self._get(self._clo)
-        met = self._get(self._met)
+    @property
+    def extra_state_attributes(self):
+        """
+        Partial derivatives of the metric, e.g. dpmv_dva, when sensitivities
+        are enabled, and for SET whether its run hit a thermoregulation limit.
+        """
+        data = self.coordinator.data
+        if data and self._zone is not None:
+            data = data[self._zone]
+        data = data or {}
+        attributes = {}
+        gradient = data.get("sensitivities", {}).get(self._metric)
+        if gradient:
+            attributes.update({f"d{self._metric}_d{name}": value for name, value in gradient.items()})
+        if self._metric == "set" and data.get("thermal_strain") is not None:
+            attributes["thermal_strain"] = data["thermal_strain"]
+        return attributes or None
 
-        # Optional parameters
-        va = self._get(self._va) if self._va else 0.0
-        tr = self._get(self._tr) if self._tr else ta  # fallback to ta
 
-        if any(x is None for x in [ta, rh, clo, met]) or tr is None:
-            self._attr_native_value = None
-            return
+class ComfortPhysiologySensor(ComfortSensor):
+    """
+    One output of the two-node model taken from the zone's SET run. Disabled
+    by default; enabling one makes the zone calculate SET.
+    """
+
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, entry_id, key, prefix, zone=None):
+        super().__init__(coordinator, entry_id, key, prefix, zone)
+        name, self._attr_icon, self._attr_native_unit_of_measurement = PHYSIOLOGY[key]
+        self._attr_name = f"{prefix} {name}"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+
+class ComfortDiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """Exposes one counter or timing of the zone's ZoneDiagnostics."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, entry_id, key, prefix):
+        super().__init__(coordinator)
+        self._key = key
+        name, icon = DIAGNOSTICS[key]
+
+        self._attr_name = f"{prefix} {name}"
+        self._attr_unique_id = f"{DOMAIN}_{entry_id}_diag_{key}"
+        self._attr_icon = icon
+        self._attr_device_info = _device_info(entry_id, prefix)
+
+        if key == "update_time":
+            self._attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+        else:
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def native_value(self):
+        diagnostics = self.coordinator.diagnostics
+        if self._key == "update_time":
+            if diagnostics.last_update_ms is None:
+                return None
+            return round(diagnostics.last_update_ms, 3)
+        return diagnostics.counters.get(self._key, 0)
+
+    @property
+    def extra_state_attributes(self):
+        if self._key == "update_time":
+            return self.coordinator.diagnostics.update_time.as_dict()
+        return None
+
+
+class AdaptiveComfortSensor(CoordinatorEntity, RestoreEntity, SensorEntity):
+    """
+    Neutral temperature of the ASHRAE 55 adaptive model, with the
+    acceptability limits as attributes.
+
+    The prevailing mean outdoor temperature is accumulated from the outdoor
+    sensor's state changes as they arrive and saved with the entity's restore
+    data, so no history is read from the recorder.
+    """
+
+    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:home-thermometer-outline"
+
+    def __init__(self, coordinator, entry_id, prefix):
+        super().__init__(coordinator)
+        self._attr_name = f"{prefix} Adaptive Comfort Temperature"
+        self._attr_unique_id = f"{DOMAIN}_{entry_id}_adaptive"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, entry_id)})
+        self._running_mean = RunningMeanTemperature()
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        if (last := await self.async_get_last_extra_data()) is not None:
+            self._running_mean = RunningMeanTemperature.from_dict(
+                last.as_dict(), self._running_mean.alpha
+            )
+
+        self._add_reading(self.hass.states.get(self.coordinator.t_out))
+        self.async_on_remove(async_track_state_change_event(
+            self.hass, [self.coordinator.t_out], self._handle_outdoor_change
+        ))
 
-        result = calculate_thermal_comfort(ta, tr, va, rh, clo, met)
-        self._attr_native_value = result.get(self._metric)
+    @callback
+    def _handle_outdoor_change(self, event):
+        self._add_reading(event.data.get("new_state"))
+        self.async_write_ha_state()
 
-    def _get(self, entity_id):
-        state = self._hass.states.get(entity_id)
+    def _add_reading(self, state):
         try:
-            return float(state.state) if state else None
-        except (ValueError, TypeError):
+            value = float(state.state)
+        except (AttributeError, ValueError, TypeError):
+            return
+        self._running_mean.add(value, dt_util.as_local(state.last_updated))
+
+    @property
+    def extra_restore_state_data(self):
+        return RestoredExtraData(self._running_mean.as_dict())
+
+    def _adaptive(self):
+        inputs = self.coordinator.read_inputs()
+        t_running_mean = self._running_mean.value
+        if inputs is None or t_running_mean is None:
             return None
+        return adaptive_ashrae(inputs["ta"], inputs["tr"], t_running_mean, inputs["va"])
+
+    @property
+    def native_value(self):
+        result = self._adaptive()
+        return result["tmp_cmf"] if result else None
+
+    @property
+    def extra_state_attributes(self):
+        t_running_mean = self._running_mean.value
+        attributes = {
+            "t_running_mean": round(t_running_mean, 2) if t_running_mean is not None else None,
+            "running_mean_days": self._running_mean.days,
+        }
+        result = self._adaptive()
+        if result:
+            attributes.update(result)
+        return attributes
+
+
+class ComfortStatisticsSensor(CoordinatorEntity, RestoreEntity, SensorEntity):
+    """
+    One statistic of ComfortStatistics over the configured reset period.
+
+    Every coordinator result is added as it is published, and occupancy
+    changes close the running interval, so the statistic is integrated over
+    time without reading history. The accumulator is saved with the entity's
+    restore data; the time Home Assistant was down is not counted.
+
+    Disabled by default: an enabled statistic makes the zone compute the
+    metric it integrates even when that metric's sensor is disabled.
+    """
+
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, entry_id, key, prefix):
+        super().__init__(coordinator)
+        name, icon, unit, self._attribute = STATISTICS[key]
+
+        self._attr_name = f"{prefix} {name}"
+        self._attr_unique_id = f"{DOMAIN}_{entry_id}_stats_{key}"
+        self._attr_icon = icon
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, entry_id)})
+        if key == "time_in_comfort":
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+        else:
+            self._attr_state_class = SensorStateClass.TOTAL
+        self._stats = ComfortStatistics(coordinator.stats_period, coordinator.set_threshold)
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        if (last := await self.async_get_last_extra_data()) is not None:
+            self._stats = ComfortStatistics.from_dict(
+                last.as_dict(), self._stats.period, self._stats.set_threshold
+            )
+            self._stats.pause()
+
+        self._add_result()
+        if self.coordinator.occupancy:
+            self.async_on_remove(async_track_state_change_event(
+                self.hass, [self.coordinator.occupancy], self._handle_occupancy_change
+            ))
+
+    @callback
+    def _handle_coordinator_update(self):
+        self._add_result()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _handle_occupancy_change(self, event):
+        self._add_result()
+        self.async_write_ha_state()
+
+    def _add_result(self):
+        occupied = True
+        if self.coordinator.occupancy:
+            state = self.hass.states.get(self.coordinator.occupancy)
+            occupied = state is not None and state.state == "on"
+        self._stats.add(self.coordinator.data, dt_util.now(), occupied)
+
+    @property
+    def extra_restore_state_data(self):
+        return RestoredExtraData(self._stats.as_dict())
+
+    @property
+    def native_value(self):
+        value = getattr(self._stats, self._attribute)
+        return round(value, 2) if value is not None else None
+
+    @property
+    def last_reset(self):
+        if self._attr_state_class != SensorStateClass.TOTAL:
+            return None
+        return self._stats.period_start
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            **self._stats.totals(),
+            "period": self._stats.period,
+            "last_period": self._stats.last_period,
+        }
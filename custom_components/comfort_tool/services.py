@@ -0,0 +1,253 @@
+"""Services of the comfort_tool domain."""
+import asyncio
+import logging
+from functools import partial
+
+import numpy as np
+import voluptuous as vol
+from homeassistant.core import SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+
+from .batch import as_scalar, calculate_thermal_comfort_batch
+from .cache import ComfortCache
+from .charts import GRID_METRICS, comfort_zone
+from .const import (
+    CHART_CACHE_SIZE,
+    DATA_CHARTS,
+    DATA_EXECUTOR,
+    DATA_INVERSE,
+    DEFAULT_CHART_RESOLUTION,
+    DEFAULT_RESOLUTION,
+    DOMAIN,
+    METRICS,
+    PHYSIOLOGY,
+)
+from .coordinator import BaseComfortCoordinator, MultiZoneCoordinator
+from .executor import StaleJobError
+from .inverse import DEFAULT_MAX_EVALUATIONS, FTOL, VARIABLES, InverseCache, solve
+from .sensitivity import calculate_thermal_comfort_sensitivities_batch
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_COMFORT_ZONE = "comfort_zone"
+SERVICE_SOLVE_SETPOINT = "solve_setpoint"
+SERVICE_CALCULATE = "calculate"
+
+COMFORT_ZONE_SCHEMA = vol.Schema({
+    vol.Required("entry_id"): cv.string,
+    vol.Optional("zone"): vol.Coerce(int),
+    vol.Optional("clo"): vol.Coerce(float),
+    vol.Optional("met"): vol.Coerce(float),
+    vol.Optional("va"): vol.Coerce(float),
+    vol.Optional("resolution", default=DEFAULT_CHART_RESOLUTION): vol.All(
+        vol.Coerce(int), vol.Range(min=4, max=100)
+    ),
+    vol.Optional("grid", default=[]): vol.All(cv.ensure_list, [vol.In(GRID_METRICS)]),
+})
+
+SOLVE_SETPOINT_SCHEMA = vol.Schema({
+    vol.Required("entry_id"): cv.string,
+    vol.Optional("zone"): vol.Coerce(int),
+    vol.Required("variable"): vol.In(list(VARIABLES)),
+    vol.Optional("metric", default="pmv"): vol.In(list(FTOL)),
+    vol.Optional("target", default=0.0): vol.Coerce(float),
+    vol.Optional("max_evaluations", default=DEFAULT_MAX_EVALUATIONS): vol.All(
+        vol.Coerce(int), vol.Range(min=2, max=100)
+    ),
+})
+
+# tr defaults to ta, va and wme to 0
+RECORD_SCHEMA = vol.Schema({
+    vol.Required("ta"): vol.Coerce(float),
+    vol.Optional("tr"): vol.Coerce(float),
+    vol.Optional("va", default=0.0): vol.Coerce(float),
+    vol.Required("rh"): vol.Coerce(float),
+    vol.Required("clo"): vol.Coerce(float),
+    vol.Required("met"): vol.Coerce(float),
+    vol.Optional("wme", default=0.0): vol.Coerce(float),
+})
+
+CALCULATE_SCHEMA = vol.Schema({
+    vol.Required("records"): vol.All(cv.ensure_list, [RECORD_SCHEMA]),
+    vol.Optional("metrics", default=METRICS): vol.All(cv.ensure_list, [vol.In(METRICS)]),
+    vol.Optional("sensitivities", default=False): cv.boolean,
+})
+
+
+async def async_setup_services(hass, max_batch_size):
+    hass.data[DOMAIN][DATA_CHARTS] = ComfortCharts(hass)
+    hass.data[DOMAIN][DATA_INVERSE] = InverseCache()
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_COMFORT_ZONE,
+        partial(_async_comfort_zone, hass),
+        schema=COMFORT_ZONE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SOLVE_SETPOINT,
+        partial(_async_solve_setpoint, hass),
+        schema=SOLVE_SETPOINT_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CALCULATE,
+        partial(_async_calculate, hass, max_batch_size),
+        schema=CALCULATE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+def _coordinator(hass, call):
+    """
+    The coordinator addressed by the call, the current model inputs of its
+    zone (None if one is missing) and whether the zone has a radiant
+    temperature sensor.
+    """
+    coordinator = hass.data[DOMAIN].get(call.data["entry_id"])
+    if not isinstance(coordinator, BaseComfortCoordinator):
+        raise HomeAssistantError(f"Unknown comfort_tool entry: {call.data['entry_id']}")
+
+    zone = call.data.get("zone")
+    if isinstance(coordinator, MultiZoneCoordinator):
+        if zone is None or not 0 <= zone < len(coordinator.zones):
+            raise HomeAssistantError(f"Entry {call.data['entry_id']} has no zone {zone}")
+        return coordinator, coordinator.zone_inputs(zone), bool(coordinator.zones[zone].get("tr"))
+    return coordinator, coordinator.read_inputs(), bool(coordinator.tr)
+
+
+def _zone_inputs(hass, call):
+    """clo, met and va of the zone addressed by the call, with its overrides."""
+    _, inputs, _ = _coordinator(hass, call)
+    inputs = {k: inputs[k] for k in ("clo", "met", "va")} if inputs else {}
+    inputs.update({k: call.data[k] for k in ("clo", "met", "va") if k in call.data})
+    if len(inputs) < 3:
+        raise HomeAssistantError("The zone's clo, met and va are not available")
+    return inputs
+
+
+async def _async_comfort_zone(hass, call):
+    inputs = _zone_inputs(hass, call)
+    return await hass.data[DOMAIN][DATA_CHARTS].async_comfort_zone(
+        **inputs, resolution=call.data["resolution"], grid=call.data["grid"]
+    )
+
+
+async def _async_solve_setpoint(hass, call):
+    coordinator, inputs, has_tr = _coordinator(hass, call)
+    if inputs is None:
+        raise HomeAssistantError("The zone's inputs are not available")
+
+    variable, metric = call.data["variable"], call.data["metric"]
+    zone = (call.data["entry_id"], call.data.get("zone"))
+    solutions = hass.data[DOMAIN][DATA_INVERSE]
+    guess = solutions.guess(zone, variable, metric)
+
+    try:
+        result = await coordinator.executor.async_run(
+            (SERVICE_SOLVE_SETPOINT,) + zone + (variable, metric),
+            partial(
+                solve, inputs, variable, metric, call.data["target"], guess,
+                call.data["max_evaluations"], tr_follows_ta=not has_tr,
+            ),
+        )
+    except StaleJobError as err:
+        raise HomeAssistantError("Setpoint calculation was superseded by a newer one") from err
+
+    solutions.update(zone, variable, metric, result)
+    return {**result, "variable": variable, "metric": metric, "warm_start": guess is not None}
+
+
+async def _async_calculate(hass, max_batch_size, call):
+    records = call.data["records"]
+    if len(records) > max_batch_size:
+        raise HomeAssistantError(
+            f"{len(records)} records exceed the maximum batch size of {max_batch_size}"
+        )
+    if not records:
+        return {"results": []}
+
+    metrics = tuple(m for m in METRICS if m in call.data["metrics"])
+    arrays = {name: np.array([r[name] for r in records]) for name in ("ta", "va", "rh", "clo", "met", "wme")}
+    arrays["tr"] = np.array([r.get("tr", r["ta"]) for r in records])
+    # The two-node model state comes with SET at no extra cost
+    keys = metrics + tuple(PHYSIOLOGY) if "set" in metrics else metrics
+    # Every call is its own job: concurrent calls must not supersede each
+    # other, and calls from the same script run share their context id
+    job = (SERVICE_CALCULATE, object())
+    try:
+        if call.data["sensitivities"]:
+            # One dual-number evaluation per record yields values and derivatives
+            evaluated = await hass.data[DOMAIN][DATA_EXECUTOR].async_run(
+                job,
+                partial(calculate_thermal_comfort_sensitivities_batch, **arrays, metrics=metrics),
+            )
+            results = [
+                {**{k: result.get(k) for k in keys}, "sensitivities": result.get("sensitivities")}
+                for result in evaluated
+            ]
+        else:
+            batch = await hass.data[DOMAIN][DATA_EXECUTOR].async_run(
+                job,
+                partial(calculate_thermal_comfort_batch, **arrays, metrics=metrics),
+            )
+            results = [{k: as_scalar(batch[k][i]) for k in keys} for i in range(len(records))]
+    except StaleJobError as err:
+        raise HomeAssistantError("Calculation was cancelled") from err
+
+    return {"results": results}
+
+
+class ComfortCharts:
+    """
+    Computes comfort zones in the worker pool and caches them by their inputs
+    (clo, met and va quantized like the result cache, resolution and grid).
+    Identical requests arriving while one is computed share its result.
+    """
+
+    def __init__(self, hass):
+        self.hass = hass
+        self.cache = ComfortCache(CHART_CACHE_SIZE)
+        self._pending = {}
+
+    def key(self, clo, met, va, resolution, grid):
+        return (
+            round(clo / DEFAULT_RESOLUTION["clo"]),
+            round(met / DEFAULT_RESOLUTION["met"]),
+            round(va / DEFAULT_RESOLUTION["va"]),
+            resolution,
+            tuple(sorted(grid)),
+        )
+
+    async def async_comfort_zone(self, clo, met, va, resolution, grid):
+        key = self.key(clo, met, va, resolution, grid)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        task = self._pending.get(key)
+        if task is None:
+            task = self.hass.async_create_task(self._async_compute(key))
+            self._pending[key] = task
+        return await asyncio.shield(task)
+
+    async def _async_compute(self, key):
+        clo, met, va = (
+            round(n * DEFAULT_RESOLUTION[k], 6) for n, k in zip(key, ("clo", "met", "va"))
+        )
+        executor = self.hass.data[DOMAIN][DATA_EXECUTOR]
+        try:
+            result = await executor.async_run(
+                (SERVICE_COMFORT_ZONE,) + key,
+                partial(comfort_zone, clo, met, va, key[3], key[4]),
+            )
+        except StaleJobError as err:
+            raise HomeAssistantError("Comfort zone calculation was cancelled") from err
+        finally:
+            del self._pending[key]
+        self.cache.put(key, result)
+        return result
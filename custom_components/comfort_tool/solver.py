@@ -0,0 +1,170 @@
+"""
+Root finding for the comfort and psychrometric models.
+
+The objectives solved here are expensive (a cooling effect evaluation is a
+full pierce_set run), so the solvers evaluate each point once, accept
+already known endpoint values, stop at an evaluation budget and report how
+many evaluations they used.
+"""
+import logging
+import math
+import sys
+from dataclasses import dataclass
+
+_LOGGER = logging.getLogger(__name__)
+
+CONVERGED = "converged"
+NOT_BRACKETED = "not_bracketed"
+MAX_EVALUATIONS = "max_evaluations"
+
+
+@dataclass
+class RootResult:
+    """Outcome of a root search."""
+    root: float          # last iterate; only meaningful if converged
+    converged: bool
+    flag: str            # CONVERGED, NOT_BRACKETED or MAX_EVALUATIONS
+    evaluations: int     # calls of the objective made by this search
+    iterations: int = 0
+
+    @property
+    def value(self):
+        """The root, or NaN if the search failed."""
+        return self.root if self.converged else math.nan
+
+
+def brentq(fn, a, b, xtol=1e-6, ftol=0.0, max_evaluations=100, fa=None, fb=None):
+    """
+    Brent's method for fn(x) == 0 on the bracket [a, b].
+
+    Combines inverse quadratic interpolation and secant steps with bisection
+    as a safeguard, so it converges superlinearly on smooth objectives and
+    never worse than bisection otherwise.
+
+    Parameters:
+        fn : objective
+        a, b : bracket; fn(a) and fn(b) must differ in sign
+        xtol : absolute tolerance on the root
+        ftol : also stop when |fn(x)| <= ftol
+        max_evaluations : evaluation budget, including the endpoints
+        fa, fb : fn(a) and fn(b) if already known (not evaluated again)
+
+    Returns:
+        RootResult
+    """
+    return run(brentq_steps(a, b, xtol, ftol, max_evaluations, fa, fb), fn)
+
+
+def brentq_steps(a, b, xtol=1e-6, ftol=0.0, max_evaluations=100, fa=None, fb=None):
+    """
+    brentq as a generator: yields each point to evaluate, expects fn(x) to be
+    sent back and returns the RootResult. Many searches can then advance
+    together, with the objective of all of them evaluated in one vectorized
+    call (see batch.cooling_effect_batch).
+    """
+    evaluations = 0
+
+    xpre, xcur = float(a), float(b)
+    if fa is None:
+        fa = yield xpre
+        evaluations += 1
+    if fb is None:
+        fb = yield xcur
+        evaluations += 1
+    fpre, fcur = fa, fb
+
+    if fpre == 0:
+        return RootResult(xpre, True, CONVERGED, evaluations)
+    if fcur == 0:
+        return RootResult(xcur, True, CONVERGED, evaluations)
+    if fpre * fcur > 0 or math.isnan(fpre * fcur):
+        return RootResult(math.nan, False, NOT_BRACKETED, evaluations)
+
+    rtol = 4 * sys.float_info.epsilon
+    xblk = fblk = spre = scur = 0.0
+    iterations = 0
+
+    while True:
+        iterations += 1
+        if fpre * fcur < 0:
+            xblk, fblk = xpre, fpre
+            spre = scur = xcur - xpre
+        if abs(fblk) < abs(fcur):
+            xpre, xcur, xblk = xcur, xblk, xcur
+            fpre, fcur, fblk = fcur, fblk, fcur
+
+        delta = (xtol + rtol * abs(xcur)) / 2
+        sbis = (xblk - xcur) / 2
+        if fcur == 0 or abs(sbis) < delta or abs(fcur) <= ftol:
+            return RootResult(xcur, True, CONVERGED, evaluations, iterations)
+
+        if abs(spre) > delta and abs(fcur) < abs(fpre):
+            if xpre == xblk:
+                # Secant step
+                stry = -fcur * (xcur - xpre) / (fcur - fpre)
+            else:
+                # Inverse quadratic interpolation
+                dpre = (fpre - fcur) / (xpre - xcur)
+                dblk = (fblk - fcur) / (xblk - xcur)
+                stry = -fcur * (fblk * dblk - fpre * dpre) / (dblk * dpre * (fblk - fpre))
+            if 2 * abs(stry) < min(abs(spre), 3 * abs(sbis) - delta):
+                spre, scur = scur, stry
+            else:
+                spre = scur = sbis
+        else:
+            spre = scur = sbis
+
+        xpre, fpre = xcur, fcur
+        if abs(scur) > delta:
+            xcur += scur
+        else:
+            xcur += delta if sbis > 0 else -delta
+
+        if evaluations >= max_evaluations:
+            _LOGGER.debug("Brent's method exhausted its budget of %d evaluations", max_evaluations)
+            return RootResult(xcur, False, MAX_EVALUATIONS, evaluations, iterations)
+        fcur = yield xcur
+        evaluations += 1
+
+
+def run(steps, fn):
+    """Drives a search generator such as brentq_steps with fn; returns its result."""
+    try:
+        x = next(steps)
+        while True:
+            x = steps.send(fn(x))
+    except StopIteration as stop:
+        return stop.value
+
+
+def brentq_near(fn, guess, step, lower=-math.inf, upper=math.inf, increasing=True,
+                xtol=1e-6, ftol=0.0, max_evaluations=100):
+    """
+    Searches for a root next to a known approximate solution, e.g. the result
+    of the previous solve of a slowly changing problem.
+
+    Evaluates fn(guess), then one point a distance step away in the direction
+    of the root (known from the sign of fn(guess) and whether fn is increasing),
+    clipped to [lower, upper]. If the two points bracket the root, the search
+    continues with brentq on that tight bracket; otherwise NOT_BRACKETED is
+    returned and the caller falls back to its wide bracket.
+
+    Returns:
+        RootResult; evaluations include the probes
+    """
+    f_guess = fn(guess)
+    if abs(f_guess) <= ftol:
+        return RootResult(guess, True, CONVERGED, 1)
+
+    towards_root = -1 if (f_guess > 0) == increasing else 1
+    x = min(max(guess + towards_root * abs(step), lower), upper)
+    if x == guess:
+        return RootResult(math.nan, False, NOT_BRACKETED, 1)
+    f_x = fn(x)
+    if f_guess * f_x > 0:
+        return RootResult(math.nan, False, NOT_BRACKETED, 2)
+
+    result = brentq(fn, guess, x, xtol=xtol, ftol=ftol,
+                    max_evaluations=max_evaluations - 2, fa=f_guess, fb=f_x)
+    result.evaluations += 2
+    return result
@@ -0,0 +1,21 @@
+"""
+The comfort model modules import without Home Assistant, so these tests run
+with plain pytest from the repository root:
+
+    python -m pytest tests
+
+Tests of the Home Assistant side need pytest-homeassistant-custom-component
+and are skipped without it.
+"""
+import importlib.util
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def pytest_addoption(parser):
+    # asyncio_mode in pytest.ini is read by pytest-asyncio, which comes with
+    # the Home Assistant test harness
+    if importlib.util.find_spec("pytest_asyncio") is None:
+        parser.addini("asyncio_mode", "pytest-asyncio mode (unused without pytest-asyncio)")
@@ -0,0 +1,209 @@
+"""Day and period boundaries of the streaming accumulators."""
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.comfort_tool.accumulators import (
+    MAX_GAP_DAYS,
+    ComfortStatistics,
+    RunningMeanTemperature,
+    period_end,
+    period_start,
+)
+from custom_components.comfort_tool.const import (
+    PERIOD_DAILY,
+    PERIOD_MONTHLY,
+    PERIOD_WEEKLY,
+    PERIOD_YEARLY,
+)
+
+TZ = timezone(timedelta(hours=1))
+
+
+def at(day, hour=0, minute=0, month=3, year=2024):
+    return datetime(year, month, day, hour, minute, tzinfo=TZ)
+
+
+def comfortable(pmv=0.0, ppd=5.0, set_val=24.0):
+    return {"pmv": pmv, "ppd": ppd, "set": set_val}
+
+
+class TestRunningMeanTemperature:
+    def test_first_day_is_estimated_from_the_readings_so_far(self):
+        rm = RunningMeanTemperature()
+        assert rm.value is None
+        rm.add(10.0, at(1, 0))
+        assert rm.value == 10.0
+        rm.add(20.0, at(1, 6))
+        rm.add(20.0, at(1, 12))
+        # 10 °C for 6 h, 20 °C for 6 h
+        assert rm.value == pytest.approx(15.0)
+        assert rm.mean is None and rm.days == 0
+
+    def test_readings_are_weighted_by_duration(self):
+        rm = RunningMeanTemperature()
+        rm.add(10.0, at(1, 0))
+        rm.add(20.0, at(1, 18))
+        rm.add(20.0, at(2, 0))
+        # 18 h at 10 °C, 6 h at 20 °C
+        assert rm.days == 1
+        assert rm.value == pytest.approx(12.5)
+
+    def test_reading_holds_across_midnight(self):
+        rm = RunningMeanTemperature()
+        rm.add(10.0, at(1, 0))
+        rm.add(30.0, at(1, 12))
+        rm.add(0.0, at(2, 12))
+        # Day 1: 12 h at 10, 12 h at 30; day 2 so far: 12 h at 30
+        assert rm.days == 1 and rm.mean == pytest.approx(20.0)
+        assert rm._day_sum / rm._day_seconds == pytest.approx(30.0)
+
+    def test_exponential_weighting_of_complete_days(self):
+        rm = RunningMeanTemperature(alpha=0.8)
+        for day, temperature in enumerate([10.0, 20.0, 30.0], start=1):
+            rm.add(temperature, at(day, 0))
+        rm.add(0.0, at(4, 0))
+        assert rm.days == 3
+        expected = 10.0
+        for day_mean in (20.0, 30.0):
+            expected = 0.2 * day_mean + 0.8 * expected
+        assert rm.value == pytest.approx(expected)
+
+    def test_days_without_readings_repeat_the_last_value(self):
+        rm = RunningMeanTemperature(alpha=0.5)
+        rm.add(10.0, at(1, 0))
+        rm.add(10.0, at(4, 0))
+        assert rm.days == 3 and rm.mean == pytest.approx(10.0)
+
+    def test_long_gap_starts_over(self):
+        rm = RunningMeanTemperature()
+        rm.add(10.0, at(1, 0))
+        rm.add(10.0, at(2, 0))
+        rm.add(25.0, at(2 + MAX_GAP_DAYS + 1, 8))
+        assert rm.days == 0 and rm.mean is None
+        assert rm.value == 25.0
+
+    def test_out_of_order_reading_is_ignored(self):
+        rm = RunningMeanTemperature()
+        rm.add(10.0, at(1, 12))
+        rm.add(50.0, at(1, 6))
+        rm.add(10.0, at(1, 18))
+        assert rm.value == pytest.approx(10.0)
+
+    def test_round_trip(self):
+        rm = RunningMeanTemperature()
+        rm.add(10.0, at(1, 0))
+        rm.add(20.0, at(2, 6))
+        restored = RunningMeanTemperature.from_dict(json.loads(json.dumps(rm.as_dict())))
+        assert restored.as_dict() == rm.as_dict()
+        rm.add(15.0, at(3, 0))
+        restored.add(15.0, at(3, 0))
+        assert restored.value == rm.value
+
+    def test_changed_alpha_discards_the_saved_mean(self):
+        rm = RunningMeanTemperature()
+        rm.add(10.0, at(1, 0))
+        rm.add(10.0, at(2, 0))
+        restored = RunningMeanTemperature.from_dict(rm.as_dict(), alpha=0.9)
+        assert restored.alpha == 0.9 and restored.mean is None and restored.days == 0
+
+
+@pytest.mark.parametrize("period, start, end", [
+    (PERIOD_DAILY, at(13), at(14)),
+    # 2024-03-13 is a Wednesday
+    (PERIOD_WEEKLY, at(11), at(18)),
+    (PERIOD_MONTHLY, at(1), at(1, month=4)),
+    (PERIOD_YEARLY, at(1, month=1), at(1, month=1, year=2025)),
+])
+def test_period_boundaries(period, start, end):
+    assert period_start(at(13, 15, 30), period) == start
+    assert period_end(start, period) == end
+
+
+def test_december_ends_in_january():
+    start = period_start(at(24, 12, month=12), PERIOD_MONTHLY)
+    assert period_end(start, PERIOD_MONTHLY) == at(1, month=1, year=2025)
+
+
+class TestComfortStatistics:
+    def test_time_weighted_totals(self):
+        stats = ComfortStatistics(PERIOD_DAILY, set_threshold=26.0)
+        stats.add(comfortable(), at(1, 8))
+        stats.add(comfortable(pmv=1.0, ppd=26.0, set_val=28.0), at(1, 10))
+        stats.add(comfortable(), at(1, 11))
+        # 2 h in comfort, then 1 h warm with SET 2 °C above the threshold
+        assert stats.occupied_seconds == 3 * 3600
+        assert stats.time_in_comfort == pytest.approx(100 * 2 / 3)
+        assert stats.ppd_exceedance_hours == pytest.approx(1.0)
+        assert stats.set_degree_hours == pytest.approx(2.0)
+
+    def test_unoccupied_and_empty_results_are_not_counted(self):
+        stats = ComfortStatistics(PERIOD_DAILY)
+        stats.add(comfortable(), at(1, 8), occupied=False)
+        stats.add(comfortable(), at(1, 10))
+        stats.add(None, at(1, 11))
+        stats.add(comfortable(), at(1, 15))
+        stats.add(comfortable(), at(1, 16))
+        assert stats.occupied_seconds == 2 * 3600
+
+    def test_pause_drops_the_held_result(self):
+        stats = ComfortStatistics(PERIOD_DAILY)
+        stats.add(comfortable(), at(1, 8))
+        stats.pause()
+        stats.add(comfortable(), at(1, 12))
+        stats.add(comfortable(), at(1, 13))
+        assert stats.occupied_seconds == 3600
+
+    def test_daily_rollover_splits_at_midnight(self):
+        stats = ComfortStatistics(PERIOD_DAILY)
+        stats.add(comfortable(), at(1, 22))
+        stats.add(comfortable(), at(2, 3))
+        assert stats.last_period["period_start"] == at(1).isoformat()
+        assert stats.last_period["occupied_hours"] == 2.0
+        assert stats.last_period["time_in_comfort"] == 100.0
+        # The held result carries over into the new period
+        assert stats.period_start == at(2)
+        assert stats.occupied_seconds == 3 * 3600
+
+    def test_monthly_rollover(self):
+        stats = ComfortStatistics(PERIOD_MONTHLY)
+        stats.add(comfortable(pmv=1.0, ppd=26.0), at(31, 23, month=3))
+        stats.add(comfortable(), at(1, 1, month=4))
+        assert stats.last_period["period_start"] == at(1, month=3).isoformat()
+        assert stats.last_period["ppd_exceedance_hours"] == 1.0
+        assert stats.last_period["time_in_comfort"] == 0.0
+        assert stats.period_start == at(1, month=4)
+        assert stats.ppd_exceedance_hours == pytest.approx(1.0)
+
+    def test_reading_within_the_period_does_not_roll_over(self):
+        stats = ComfortStatistics(PERIOD_MONTHLY)
+        stats.add(comfortable(), at(1, 0))
+        stats.add(comfortable(), at(31, 23))
+        assert stats.last_period is None
+        assert stats.occupied_seconds == (30 * 24 + 23) * 3600
+
+    def test_out_of_order_result_is_ignored(self):
+        stats = ComfortStatistics(PERIOD_DAILY)
+        stats.add(comfortable(), at(1, 10))
+        stats.add(comfortable(pmv=2.0), at(1, 9))
+        stats.add(comfortable(), at(1, 11))
+        assert stats.time_in_comfort == 100.0
+
+    def test_round_trip(self):
+        stats = ComfortStatistics(PERIOD_DAILY)
+        stats.add(comfortable(), at(1, 22))
+        stats.add(comfortable(pmv=0.8, ppd=18.0, set_val=29.0), at(2, 3))
+        restored = ComfortStatistics.from_dict(json.loads(json.dumps(stats.as_dict())))
+        assert restored.as_dict() == stats.as_dict()
+        stats.add(comfortable(), at(2, 5))
+        restored.add(comfortable(), at(2, 5))
+        assert restored.totals() == stats.totals()
+
+    def test_changed_settings_start_over(self):
+        stats = ComfortStatistics(PERIOD_DAILY)
+        stats.add(comfortable(), at(1, 8))
+        stats.add(comfortable(), at(1, 9))
+        restored = ComfortStatistics.from_dict(stats.as_dict(), period=PERIOD_WEEKLY)
+        assert restored.period == PERIOD_WEEKLY
+        assert restored.occupied_seconds == 0 and restored.period_start is None
@@ -0,0 +1,87 @@
+"""The vectorized models against their scalar counterparts."""
+import itertools
+
+import numpy as np
+import pytest
+
+from custom_components.comfort_tool.batch import (
+    SCALAR_TAIL,
+    _bisect_batch,
+    as_scalar,
+    calculate_thermal_comfort_batch,
+    cooling_effect_batch,
+    pmv_batch,
+)
+from custom_components.comfort_tool.comfort import (
+    calculate_thermal_comfort,
+    cooling_effect,
+    dynamic_clothing,
+    pmv,
+    relative_air_speed,
+)
+from custom_components.comfort_tool.const import METRICS, PHYSIOLOGY
+
+# (ta, va, rh, clo, met); tr = ta + 1
+GRID = list(itertools.product(
+    [16, 20, 24, 27, 30, 33, 36], [0.05, 0.2, 0.5, 0.9, 1.5], [25, 50, 75], [0.4, 0.8], [1.0, 1.3, 2.0]
+))
+
+
+def _columns(grid):
+    ta, va, rh, clo, met = np.array(grid, dtype=float).T
+    return ta, ta + 1, va, rh, clo, met
+
+
+def test_calculate_thermal_comfort_batch_matches_scalar():
+    ta, tr, va, rh, clo, met = _columns(GRID)
+    batch = calculate_thermal_comfort_batch(ta, tr, va, rh, clo, met)
+    for j, (ta_j, va_j, rh_j, clo_j, met_j) in enumerate(GRID):
+        expected = calculate_thermal_comfort(ta_j, ta_j + 1, va_j, rh_j, clo_j, met_j)
+        result = {k: as_scalar(batch[k][j]) for k in METRICS + PHYSIOLOGY}
+        assert result == expected, GRID[j]
+
+
+def test_calculate_thermal_comfort_batch_skips_metrics():
+    ta, tr, va, rh, clo, met = _columns(GRID[:3])
+    batch = calculate_thermal_comfort_batch(ta, tr, va, rh, clo, met, metrics=("pmv",))
+    assert np.isnan(batch["set"]).all() and np.isnan(batch["t_skin"]).all()
+    assert not np.isnan(batch["pmv"]).any()
+    for j, (ta_j, va_j, rh_j, clo_j, met_j) in enumerate(GRID[:3]):
+        expected = calculate_thermal_comfort(ta_j, ta_j + 1, va_j, rh_j, clo_j, met_j, metrics=("pmv",))
+        assert {k: as_scalar(batch[k][j]) for k in batch} == expected
+
+
+@pytest.mark.parametrize("size", [SCALAR_TAIL, 4 * SCALAR_TAIL])
+def test_cooling_effect_batch_matches_scalar(size):
+    """Below and above the size where the batch switches to the scalar model."""
+    grid = [p for p in GRID if p[1] > 0.1][:size]
+    ta, tr, va, rh, clo, met = _columns(grid)
+    vel = np.array([relative_air_speed(v, m) for v, m in zip(va, met)])
+    dyn_clo = np.array([dynamic_clothing(c, m) for c, m in zip(clo, met)])
+    expected = [cooling_effect(*args) for args in zip(ta, tr, vel, rh, met, dyn_clo)]
+    assert cooling_effect_batch(ta, tr, vel, rh, met, dyn_clo).tolist() == expected
+
+
+def test_cooling_effect_batch_still_air():
+    assert cooling_effect_batch([25.0, 30.0], 25.0, [0.05, 0.1], 50, 1.0, 0.5).tolist() == [0.0, 0.0]
+
+
+def test_pmv_batch_matches_scalar():
+    ta, tr, va, rh, clo, met = _columns(GRID)
+    batch = pmv_batch(ta, tr, va, rh, met, clo)
+    expected = [pmv(*args)["pmv"] for args in zip(ta, tr, va, rh, met, clo)]
+    np.testing.assert_allclose(batch["pmv"], expected, atol=1e-9)
+
+
+def test_bisect_batch():
+    idx = np.arange(4)
+    roots = np.array([0.5, 0.3, -2.0, 0.9])
+
+    def fn(i, x):
+        return x - roots[i]
+
+    # 0.5 is the first midpoint: an exact root stops its element there
+    result = _bisect_batch(idx, fn, 0.0, [1.0, 1.0, 1.0, 2.0], 0.005)
+    assert result[0] == 0.5
+    np.testing.assert_allclose(result[[1, 3]], roots[[1, 3]], atol=0.005)
+    assert np.isnan(result[2])
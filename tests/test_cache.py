@@ -0,0 +1,44 @@
+"""Quantization, LRU bound and expiry of the shared comfort cache."""
+import pytest
+
+from custom_components.comfort_tool import cache as cache_module
+from custom_components.comfort_tool.cache import ComfortCache
+
+INPUTS = {"ta": 22.04, "tr": 22.96, "va": 0.12, "rh": 48.7, "clo": 0.5, "met": 1.2}
+
+
+def test_nearby_inputs_share_a_key():
+    cache = ComfortCache(resolution={"ta": 0.1, "tr": 0.1, "va": 0.05, "rh": 1.0, "clo": 0.1, "met": 0.1})
+    key, quantized = cache.quantize(INPUTS)
+    other_key, _ = cache.quantize({**INPUTS, "ta": 21.97, "rh": 49.2})
+    assert key == other_key
+    assert quantized == {"ta": 22.0, "tr": 23.0, "va": 0.1, "rh": 49.0, "clo": 0.5, "met": 1.2}
+    assert cache.quantize({**INPUTS, "ta": 22.2})[0] != key
+
+
+def test_lru_bound():
+    cache = ComfortCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    # "b" was the least recently used
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats == {"size": 2, "max_size": 2, "hits": 3, "misses": 1, "hit_rate": 0.75}
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ComfortCache(max_size=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None and cache.stats["size"] == 0
+
+
+@pytest.mark.parametrize("elapsed, expected", [(59.0, 1), (61.0, None)])
+def test_ttl(monkeypatch, elapsed, expected):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = ComfortCache(ttl=60)
+    cache.put("a", 1)
+    now[0] += elapsed
+    assert cache.get("a") == expected
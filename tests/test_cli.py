@@ -0,0 +1,38 @@
+"""Row evaluation of the offline CLI."""
+import math
+
+from custom_components.comfort_tool import cli
+from custom_components.comfort_tool.comfort import calculate_thermal_comfort
+
+ROW = {"timestamp": "2024-03-01T12:00:00", "ta": "24", "rh": "50", "clo": "0.5", "met": "1.2", "va": "0.3"}
+
+
+def test_evaluate_chunk_matches_the_model():
+    timestamps, columns, ts, errors = cli.evaluate_chunk([ROW, {**ROW, "tr": "26"}])
+    assert errors == []
+    assert timestamps[0] == 1709294400.0
+    for j, tr in enumerate([24.0, 26.0]):
+        expected = calculate_thermal_comfort(24.0, tr, 0.3, 50.0, 0.5, 1.2)
+        assert [columns[m][j] for m in cli.FLOAT_METRICS] == [expected[m] for m in cli.FLOAT_METRICS]
+        assert cli.TS_LABELS[ts[j]] == expected["ts"]
+
+
+def test_missing_inputs_are_blank():
+    _, columns, ts, errors = cli.evaluate_chunk([{**ROW, "ta": ""}])
+    assert errors == [] and math.isnan(columns["pmv"][0]) and ts[0] == -1
+
+
+def test_failing_row_is_reported_and_the_rest_evaluated(monkeypatch):
+    convert = cli.psy.convert
+
+    def failing(value, *args):
+        if value > 100:
+            raise OverflowError("math range error")
+        return convert(value, *args)
+
+    monkeypatch.setattr(cli.psy, "convert", failing)
+    rows = [{**ROW, "dewpoint": "12"}, {**ROW, "dewpoint": "1e6"}, {**ROW, "dewpoint": "14"}]
+    _, columns, ts, errors = cli.evaluate_chunk(rows, humidity="dewpoint", first_row=41)
+    assert errors == [(42, "OverflowError: math range error")]
+    assert math.isnan(columns["pmv"][1]) and ts[1] == -1
+    assert not math.isnan(columns["pmv"][0]) and not math.isnan(columns["pmv"][2])
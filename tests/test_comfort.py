@@ -0,0 +1,20 @@
+"""Result keys of the scalar comfort model."""
+from custom_components.comfort_tool.comfort import calculate_thermal_comfort
+from custom_components.comfort_tool.const import METRICS, PHYSIOLOGY
+
+KEYS = {*METRICS, *PHYSIOLOGY}
+INPUTS = (26.0, 26.0, 0.4, 45.0, 0.6, 1.2)
+
+
+def test_every_path_returns_the_same_keys():
+    result = calculate_thermal_comfort(*INPUTS)
+    assert result.keys() == KEYS and None not in result.values()
+
+    skipped = calculate_thermal_comfort(*INPUTS, metrics=("pmv",))
+    assert skipped.keys() == KEYS
+    assert skipped["set"] is None and skipped["t_skin"] is None
+
+    def failing(**kwargs):
+        raise ValueError("math domain error")
+
+    assert calculate_thermal_comfort(*INPUTS, model=failing) == dict.fromkeys(KEYS)
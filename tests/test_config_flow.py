@@ -0,0 +1,97 @@
+"""
+The options flow, and that saved options take effect.
+
+Needs Home Assistant's test harness (pytest-homeassistant-custom-component);
+skipped without it.
+"""
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.data_entry_flow import FlowResultType  # noqa: E402
+from pytest_homeassistant_custom_component.common import MockConfigEntry  # noqa: E402
+
+from custom_components.comfort_tool.const import (  # noqa: E402
+    CONF_ENTRY_TYPE,
+    CONF_SENSITIVITIES,
+    CONF_UPDATE_MODE,
+    CONF_ZONES,
+    DATA_EXECUTOR,
+    DOMAIN,
+    ENTRY_TYPE_MULTI_ZONE,
+    UPDATE_MODE_EVENT,
+)
+
+ZONE = {
+    "name": "Office",
+    "ta": "sensor.office_ta",
+    "rh": "sensor.office_rh",
+    "va": "sensor.office_va",
+    "clo": "input_number.clo",
+    "met": "input_number.met",
+}
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    yield
+
+
+async def _setup(hass, data):
+    entry = MockConfigEntry(domain=DOMAIN, data=data)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def _teardown(hass, entry):
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    hass.data[DOMAIN][DATA_EXECUTOR]._pool.shutdown(wait=True)
+
+
+async def test_options_are_applied(hass):
+    entry = await _setup(hass, ZONE)
+    assert hass.data[DOMAIN][entry.entry_id].va == "sensor.office_va"
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] == FlowResultType.FORM
+    options = {k: v for k, v in ZONE.items() if k != "va"}
+    options.update({"ta": "sensor.office_ta_2", CONF_UPDATE_MODE: UPDATE_MODE_EVENT, CONF_SENSITIVITIES: True})
+    result = await hass.config_entries.options.async_configure(result["flow_id"], user_input=options)
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    await hass.async_block_till_done()
+
+    # The entry was reloaded with a new coordinator reading the options
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert coordinator.ta == "sensor.office_ta_2"
+    assert coordinator.update_mode == UPDATE_MODE_EVENT
+    assert coordinator.sensitivities is True
+    # The cleared optional sensor does not fall back to entry.data
+    assert coordinator.va is None
+    await _teardown(hass, entry)
+
+
+async def test_multi_zone_options_change_shared_inputs_only(hass):
+    data = {
+        "name": "Floor",
+        "clo": "input_number.clo",
+        "met": "input_number.met",
+        CONF_ENTRY_TYPE: ENTRY_TYPE_MULTI_ZONE,
+        CONF_ZONES: [{"name": "A", "ta": "sensor.a_ta", "rh": "sensor.a_rh"}],
+    }
+    entry = await _setup(hass, data)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert {str(key) for key in result["data_schema"].schema} == {
+        "name", "clo", "met", CONF_UPDATE_MODE, "min_interval"
+    }
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={"name": "Floor", "clo": "input_number.clo_2", "met": "input_number.met"}
+    )
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert coordinator.clo == "input_number.clo_2"
+    assert coordinator.zones == data[CONF_ZONES]
+    await _teardown(hass, entry)
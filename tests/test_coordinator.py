@@ -0,0 +1,134 @@
+"""
+One model run per zone and update, shared by all sensors of the zone.
+
+Needs Home Assistant's test harness (pytest-homeassistant-custom-component);
+skipped without it.
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.helpers import entity_registry as er  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry,
+    async_fire_time_changed,
+    async_fire_time_changed_exact,
+)
+
+from custom_components.comfort_tool import coordinator  # noqa: E402
+from custom_components.comfort_tool.comfort import calculate_thermal_comfort  # noqa: E402
+from custom_components.comfort_tool.const import (  # noqa: E402
+    DATA_EXECUTOR,
+    DOMAIN,
+    METRICS,
+    SCAN_INTERVAL,
+)
+
+SOURCES = {
+    "sensor.office_ta": "26.0",
+    "sensor.office_rh": "45",
+    "sensor.office_va": "0.4",
+    "input_number.clo": "0.6",
+    "input_number.met": "1.2",
+}
+
+ZONE = {
+    "name": "Office",
+    "ta": "sensor.office_ta",
+    "rh": "sensor.office_rh",
+    "va": "sensor.office_va",
+    "clo": "input_number.clo",
+    "met": "input_number.met",
+}
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    yield
+
+
+async def _tick(hass, seconds):
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=seconds))
+    await hass.async_block_till_done()
+
+
+def _metric_states(hass, entry):
+    registry = er.async_get(hass)
+    states = {}
+    for metric in METRICS:
+        entity_id = registry.async_get_entity_id("sensor", DOMAIN, f"{DOMAIN}_{entry.entry_id}_{metric}")
+        states[metric] = hass.states.get(entity_id).state
+    return states
+
+
+def _expected_states(result):
+    return {metric: str(result[metric]) for metric in METRICS}
+
+
+async def test_zone_sensors_share_one_calculation(hass):
+    for entity_id, value in SOURCES.items():
+        hass.states.async_set(entity_id, value)
+    entry = MockConfigEntry(domain=DOMAIN, data=ZONE)
+    entry.add_to_hass(hass)
+
+    with patch.object(
+        coordinator, "calculate_thermal_comfort", wraps=calculate_thermal_comfort
+    ) as model:
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        # The first refresh is scheduled, not run during setup
+        await _tick(hass, 1)
+
+        assert model.call_count == 1
+        expected = calculate_thermal_comfort(26.0, 26.0, 0.4, 45.0, 0.6, 1.2)
+        assert _metric_states(hass, entry) == _expected_states(expected)
+
+        # Next poll with new inputs: again one run for all five sensors
+        hass.states.async_set("sensor.office_ta", "28.0")
+        await _tick(hass, SCAN_INTERVAL.total_seconds() + 1)
+
+        assert model.call_count == 2
+        expected = calculate_thermal_comfort(28.0, 28.0, 0.4, 45.0, 0.6, 1.2)
+        assert _metric_states(hass, entry) == _expected_states(expected)
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    hass.data[DOMAIN][DATA_EXECUTOR]._pool.shutdown(wait=True)
+
+
+async def test_zones_set_up_together_poll_apart(hass):
+    for entity_id, value in SOURCES.items():
+        hass.states.async_set(entity_id, value)
+    entries = [MockConfigEntry(domain=DOMAIN, data={**ZONE, "name": name}) for name in ("A", "B")]
+    for entry in entries:
+        entry.add_to_hass(hass)
+    a, b = (entry.entry_id for entry in entries)
+    update = coordinator.ComfortCoordinator._async_update_data
+
+    with patch.object(
+        coordinator.ComfortCoordinator, "_async_update_data", autospec=True, side_effect=update
+    ) as updates:
+        # Setting up the integration sets up both entries
+        assert await hass.config_entries.async_setup(a)
+        await hass.async_block_till_done()
+        start = dt_util.utcnow()
+        poll = SCAN_INTERVAL.total_seconds()
+        for seconds, zones in [
+            # First refreshes 0.5 s apart
+            (0.25, [a]),
+            (0.75, [a, b]),
+            # The polls keep that offset
+            (poll + 0.25, [a, b, a]),
+            (poll + 0.75, [a, b, a, b]),
+            (2 * poll + 0.25, [a, b, a, b, a]),
+        ]:
+            async_fire_time_changed_exact(hass, start + timedelta(seconds=seconds))
+            await hass.async_block_till_done()
+            assert [call.args[0].zone for call in updates.call_args_list] == zones
+
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    hass.data[DOMAIN][DATA_EXECUTOR]._pool.shutdown(wait=True)
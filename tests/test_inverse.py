@@ -0,0 +1,55 @@
+"""The setpoint solver against the forward model."""
+import pytest
+
+from custom_components.comfort_tool import inverse, solver
+from custom_components.comfort_tool.comfort import pmv_elevated_airspeed
+
+INPUTS = {"ta": 28.0, "tr": 28.0, "va": 0.1, "rh": 50.0, "clo": 0.5, "met": 1.1}
+
+
+def _achieved(inputs, variable, metric, value, tr_follows_ta=False):
+    args = {**inputs, variable: value}
+    if variable == "ta" and tr_follows_ta:
+        args["tr"] = value
+    return pmv_elevated_airspeed(
+        args["ta"], args["tr"], args["va"], args["rh"], args["met"], args["clo"]
+    )[metric]
+
+
+@pytest.mark.parametrize("variable, metric, target", [
+    ("ta", "pmv", 0.0),
+    ("ta", "set", 25.0),
+    ("va", "pmv", 0.5),
+])
+def test_solution_reaches_the_target(variable, metric, target):
+    result = inverse.solve(INPUTS, variable, metric, target, tr_follows_ta=True)
+    assert result["converged"] and result["flag"] == solver.CONVERGED
+    assert result["evaluations"] <= inverse.DEFAULT_MAX_EVALUATIONS
+    achieved = _achieved(INPUTS, variable, metric, result["value"], tr_follows_ta=True)
+    assert achieved == pytest.approx(target, abs=2 * inverse.FTOL[metric])
+
+
+def test_warm_start_needs_fewer_evaluations():
+    cold = inverse.solve(INPUTS, "ta", "pmv", 0.0)
+    warm = inverse.solve({**INPUTS, "rh": 52.0}, "ta", "pmv", 0.0, guess=cold["value"])
+    assert warm["converged"] and warm["evaluations"] < cold["evaluations"]
+
+
+def test_unreachable_target_reports_the_closest_bound():
+    result = inverse.solve(INPUTS, "va", "pmv", -3.0)
+    assert not result["converged"] and result["flag"] == solver.NOT_BRACKETED
+    assert result["value"] is None and result["limit"] == inverse.VARIABLES["va"][1]
+
+
+def test_model_failure_ends_the_search(monkeypatch):
+    def failing(ta, *args, **kwargs):
+        if ta > 30:
+            raise RuntimeError("Max iterations exceeded in PMV calculation")
+        return pmv_elevated_airspeed(ta, *args, **kwargs)
+
+    monkeypatch.setattr(inverse, "pmv_elevated_airspeed", failing)
+    result = inverse.solve(INPUTS, "ta", "pmv", 0.0)
+    assert result["flag"] == inverse.MODEL_FAILED
+    assert not result["converged"] and result["value"] is None
+    # The lower bound and the failing upper bound
+    assert result["evaluations"] == 2
@@ -0,0 +1,139 @@
+"""Dual-number sensitivities against finite differences of the float models."""
+import math
+
+import pytest
+
+from custom_components.comfort_tool.comfort import (
+    STILL_AIR_THRESHOLD,
+    calculate_thermal_comfort,
+    dynamic_clothing,
+    pierce_set,
+    pmv,
+    relative_air_speed,
+)
+from custom_components.comfort_tool.sensitivity import (
+    CE_SET_OPTIONS,
+    INPUTS,
+    Dual,
+    DualMath,
+    calculate_thermal_comfort_sensitivities,
+    calculate_thermal_comfort_sensitivities_batch,
+    pmv_elevated_airspeed_dual,
+)
+from custom_components.comfort_tool.solver import brentq
+
+# (ta, tr, va, rh, clo, met)
+CONDITIONS = [
+    (22.0, 22.0, 0.1, 50.0, 0.5, 1.2),
+    (26.0, 27.5, 0.6, 40.0, 0.6, 1.1),
+    (30.0, 31.0, 1.2, 65.0, 0.4, 1.0),
+    (18.0, 17.0, 0.3, 30.0, 1.0, 1.6),
+]
+
+STEP = 1e-4
+
+
+def _central_difference(fn, args, index, h=STEP):
+    up, down = list(args), list(args)
+    up[index] += h
+    down[index] -= h
+    return (fn(*up) - fn(*down)) / (2 * h)
+
+
+def _duals(ta, tr, vel, rh):
+    return [Dual.variable(x, i) for i, x in enumerate((ta, tr, vel, rh))]
+
+
+def test_dual_arithmetic():
+    x = Dual.variable(1.5, 0)
+    y = Dual.variable(0.5, 1)
+    f = (x * y + 2) / (1 - y) - x ** 3 + DualMath.exp(x / y) * DualMath.sqrt(x)
+    # Analytic partial derivatives
+    dfdx = y.x / (1 - y.x) - 3 * x.x ** 2 + math.exp(x.x / y.x) * (
+        math.sqrt(x.x) / y.x + 0.5 / math.sqrt(x.x)
+    )
+    dfdy = (x.x * (1 - y.x) + (x.x * y.x + 2)) / (1 - y.x) ** 2 - math.exp(x.x / y.x) * x.x / y.x ** 2 * math.sqrt(x.x)
+    assert f.d0 == pytest.approx(dfdx, rel=1e-12)
+    assert f.d1 == pytest.approx(dfdy, rel=1e-12)
+    assert f.d2 == f.d3 == 0.0
+    assert DualMath.exp(1.0) == math.exp(1.0)
+
+
+@pytest.mark.parametrize("ta, tr, va, rh, clo, met", CONDITIONS)
+def test_pmv_gradient(ta, tr, va, rh, clo, met):
+    dual = pmv(*_duals(ta, tr, va, rh), met, clo, mathlib=DualMath)["pmv"]
+
+    def fn(ta, tr, va, rh):
+        return pmv(ta, tr, va, rh, met, clo)["pmv"]
+
+    assert dual.x == fn(ta, tr, va, rh)
+    for i, name in enumerate(INPUTS):
+        expected = _central_difference(fn, (ta, tr, va, rh), i)
+        assert dual.d[i] == pytest.approx(expected, rel=1e-5, abs=1e-7), name
+
+
+@pytest.mark.parametrize("ta, tr, va, rh, clo, met", CONDITIONS)
+def test_pierce_set_gradient(ta, tr, va, rh, clo, met):
+    dual = pierce_set(*_duals(ta, tr, va, rh), met, clo, mathlib=DualMath)["set"]
+
+    def fn(ta, tr, va, rh):
+        return pierce_set(ta, tr, va, rh, met, clo)["set"]
+
+    assert dual.x == pytest.approx(fn(ta, tr, va, rh), abs=1e-12)
+    for i, name in enumerate(INPUTS):
+        expected = _central_difference(fn, (ta, tr, va, rh), i)
+        assert dual.d[i] == pytest.approx(expected, rel=1e-4, abs=1e-6), name
+
+
+def _exact_cooling_effect(ta, tr, vel, rh, met, clo):
+    """The cooling effect solved to 1e-10, unrounded, for finite differences."""
+    set_ref = pierce_set(ta, tr, vel, rh, met, clo, **CE_SET_OPTIONS)["set"]
+
+    def fn(ce):
+        return set_ref - pierce_set(ta - ce, tr - ce, STILL_AIR_THRESHOLD, rh, met, clo, **CE_SET_OPTIONS)["set"]
+
+    return brentq(fn, 0.0, 40.0, xtol=1e-10).root
+
+
+@pytest.mark.parametrize("ta, tr, va, rh, clo, met", CONDITIONS[1:])
+def test_cooling_effect_gradient(ta, tr, va, rh, clo, met):
+    ce = pmv_elevated_airspeed_dual(ta, tr, va, rh, met, clo)["cooling_effect"]
+    assert isinstance(ce, Dual) and ce.x > 0
+
+    def fn(ta, tr, va, rh):
+        return _exact_cooling_effect(
+            ta, tr, relative_air_speed(va, met), rh, met, dynamic_clothing(clo, met)
+        )
+
+    for i, name in enumerate(INPUTS):
+        expected = _central_difference(fn, (ta, tr, va, rh), i, h=1e-3)
+        # The derivative is taken at the cooling effect rounded to 0.01 °C
+        assert ce.d[i] == pytest.approx(expected, rel=2e-3, abs=1e-4), name
+
+
+def test_still_air_has_no_cooling_effect_gradient():
+    ce = pmv_elevated_airspeed_dual(*CONDITIONS[0][:4], 1.0, 0.5)["cooling_effect"]
+    assert ce == 0
+
+
+@pytest.mark.parametrize("ta, tr, va, rh, clo, met", CONDITIONS)
+def test_sensitivities_keep_the_results(ta, tr, va, rh, clo, met):
+    result = calculate_thermal_comfort_sensitivities(ta, tr, va, rh, clo, met)
+    sensitivities = result.pop("sensitivities")
+    assert result == calculate_thermal_comfort(ta, tr, va, rh, clo, met)
+    assert set(sensitivities) == {"pmv", "set", "ce"}
+    assert all(set(gradient) == set(INPUTS) for gradient in sensitivities.values())
+    # Warmer air raises PMV and SET
+    assert sensitivities["pmv"]["ta"] > 0 and sensitivities["set"]["ta"] > 0
+
+
+def test_sensitivities_follow_metrics():
+    result = calculate_thermal_comfort_sensitivities(26.0, 27.5, 0.6, 40.0, 0.6, 1.1, metrics=("set",))
+    assert set(result["sensitivities"]) == {"set"}
+    assert result["pmv"] is None
+
+
+def test_sensitivities_batch():
+    columns = [list(c) for c in zip(*CONDITIONS)] + [[0.0] * len(CONDITIONS)]
+    results = calculate_thermal_comfort_sensitivities_batch(*columns)
+    assert results == [calculate_thermal_comfort_sensitivities(*c) for c in CONDITIONS]
@@ -0,0 +1,124 @@
+"""Brent's method against known roots."""
+import math
+
+import pytest
+
+from custom_components.comfort_tool.solver import (
+    CONVERGED,
+    MAX_EVALUATIONS,
+    NOT_BRACKETED,
+    brentq,
+    brentq_near,
+    brentq_steps,
+    run,
+)
+
+
+class Counted:
+    """fn wrapper counting its calls."""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.calls = 0
+
+    def __call__(self, x):
+        self.calls += 1
+        return self.fn(x)
+
+
+@pytest.mark.parametrize("fn, a, b, root", [
+    (lambda x: x * x - 2, 0, 2, math.sqrt(2)),
+    (lambda x: math.cos(x) - x, 0, 1, 0.7390851332151607),
+    (lambda x: x ** 3 - 2 * x - 5, 2, 3, 2.0945514815423265),
+    (lambda x: math.exp(x) - 10, -5, 5, math.log(10)),
+    # Not smooth: converges through bisection
+    (lambda x: -1.0 if x < 0.3 else 1.0, 0, 1, 0.3),
+])
+def test_brentq_finds_known_roots(fn, a, b, root):
+    counted = Counted(fn)
+    result = brentq(counted, a, b, xtol=1e-10)
+    assert result.converged and result.flag == CONVERGED
+    assert result.root == pytest.approx(root, abs=1e-9)
+    assert result.evaluations == counted.calls
+
+
+def test_brentq_bracket_in_either_order():
+    assert brentq(lambda x: x * x - 2, 2, 0, xtol=1e-10).root == pytest.approx(math.sqrt(2), abs=1e-9)
+
+
+def test_brentq_root_at_endpoint():
+    result = brentq(lambda x: x - 1, 1, 3)
+    assert result.converged and result.root == 1 and result.evaluations == 2
+
+
+def test_brentq_known_endpoint_values_are_not_evaluated():
+    known = Counted(lambda x: x * x - 2)
+    unknown = Counted(lambda x: x * x - 2)
+    result = brentq(known, 0, 2, fa=-2.0, fb=2.0)
+    assert result.root == brentq(unknown, 0, 2).root
+    assert result.evaluations == known.calls == unknown.calls - 2
+
+
+def test_brentq_not_bracketed():
+    result = brentq(lambda x: x * x + 1, -1, 1)
+    assert result.flag == NOT_BRACKETED
+    assert not result.converged and math.isnan(result.value)
+
+
+def test_brentq_nan_is_not_bracketed():
+    assert brentq(lambda x: math.nan, 0, 1).flag == NOT_BRACKETED
+
+
+def test_brentq_stops_at_budget():
+    counted = Counted(lambda x: math.cos(x) - x)
+    result = brentq(counted, 0, 1, xtol=1e-15, max_evaluations=4)
+    assert result.flag == MAX_EVALUATIONS
+    assert not result.converged and math.isnan(result.value)
+    assert result.evaluations == counted.calls == 4
+
+
+def test_brentq_ftol():
+    loose = brentq(lambda x: x * x - 2, 0, 2, xtol=1e-12, ftol=1e-2)
+    tight = brentq(lambda x: x * x - 2, 0, 2, xtol=1e-12)
+    assert abs(loose.root ** 2 - 2) <= 1e-2
+    assert loose.evaluations < tight.evaluations
+
+
+def test_brentq_steps_yields_the_points_brentq_evaluates():
+    fn = Counted(lambda x: math.cos(x) - x)
+    points = []
+
+    def recording(x):
+        points.append(x)
+        return fn(x)
+
+    stepped = run(brentq_steps(0, 1, 1e-10), recording)
+    assert stepped == brentq(lambda x: math.cos(x) - x, 0, 1, 1e-10)
+    assert points[:2] == [0.0, 1.0] and len(points) == stepped.evaluations
+
+
+def test_brentq_near_uses_tight_bracket():
+    far = Counted(lambda x: x - 21.37)
+    near = Counted(lambda x: x - 21.37)
+    wide = brentq(far, 0, 100, xtol=1e-6)
+    result = brentq_near(near, 21.3, 0.1, xtol=1e-6)
+    assert result.converged and result.root == pytest.approx(wide.root, abs=1e-6)
+    assert result.evaluations == near.calls
+
+
+@pytest.mark.parametrize("guess, increasing", [(21.0, True), (22.0, True), (21.0, False), (22.0, False)])
+def test_brentq_near_steps_towards_root(guess, increasing):
+    sign = 1 if increasing else -1
+    result = brentq_near(lambda x: sign * (x - 21.5), guess, 1.0, increasing=increasing, xtol=1e-9)
+    assert result.converged and result.root == pytest.approx(21.5, abs=1e-9)
+
+
+def test_brentq_near_not_bracketed():
+    result = brentq_near(lambda x: x - 30, 20, 1.0)
+    assert result.flag == NOT_BRACKETED and result.evaluations == 2
+
+
+def test_brentq_near_respects_limits():
+    # The probe is clipped to upper == guess, so there is nothing to bracket
+    result = brentq_near(lambda x: x - 30, 20, 1.0, upper=20)
+    assert result.flag == NOT_BRACKETED and result.evaluations == 1
@@ -0,0 +1,115 @@
+"""Table interpolation, file pruning and the bounds of TableStore."""
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from custom_components.comfort_tool import table as table_module
+from custom_components.comfort_tool.table import (
+    BUILD_DELAY,
+    MAX_TABLES,
+    ComfortTable,
+    TableStore,
+    prune_tables,
+    table_path,
+)
+
+
+def _linear_table(clo=0.5, met=1.2):
+    """A table whose SET is ta + tr + va + rh, which interpolation reproduces exactly."""
+    ta, tr, va, rh = np.meshgrid(*table_module.AXES.values(), indexing="ij")
+    set_values = ta + tr + va + rh
+    ce_values = np.zeros_like(set_values)
+    exact_cells = np.zeros([len(axis) - 1 for axis in table_module.AXES.values()], dtype=bool)
+    return ComfortTable(clo, met, set_values, ce_values, exact_cells)
+
+
+def test_lookup_interpolates_and_rejects_points_outside_the_grid():
+    table = _linear_table()
+    set_val, ce = table.lookup(21.3, 22.7, 0.33, 47.0)
+    assert set_val == pytest.approx(21.3 + 22.7 + 0.33 + 47.0)
+    assert ce == 0
+    assert table.lookup(45.0, 22.0, 0.3, 50.0) is None
+
+
+def test_save_load_round_trip(tmp_path):
+    table = _linear_table()
+    path = table_path(str(tmp_path), 0.5, 1.2)
+    table.save(path)
+    loaded = ComfortTable.load(path)
+    assert loaded.lookup(21.3, 22.7, 0.33, 47.0) == table.lookup(21.3, 22.7, 0.33, 47.0)
+
+
+def test_prune_keeps_most_recently_used(tmp_path):
+    for i in range(5):
+        path = tmp_path / f"clo0.{i}0_met1.00.npz"
+        path.write_bytes(b"")
+        os.utime(path, (i, i))
+    prune_tables(str(tmp_path), keep=2)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["clo0.30_met1.00.npz", "clo0.40_met1.00.npz"]
+
+
+class FakeExecutor:
+    async def async_run(self, zone, fn, *args):
+        return fn(*args)
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    clock = {"now": 1000.0}
+    built = []
+
+    def load_or_build(directory, clo, met, build=True):
+        if not build:
+            return None
+        built.append((clo, met))
+        return _linear_table(clo, met)
+
+    monkeypatch.setattr(table_module, "load_or_build_table", load_or_build)
+    monkeypatch.setattr(table_module.time, "monotonic", lambda: clock["now"])
+    store = TableStore(str(tmp_path), FakeExecutor())
+    return store, clock, built
+
+
+def _lookup(store, clo, met=1.2):
+    async def run():
+        result = store.lookup(25.0, 25.0, 0.2, 50.0, clo, met)
+        # Let the load task finish
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return result
+    return asyncio.run(run())
+
+
+def test_store_builds_only_persistent_pairs(store):
+    store, clock, built = store
+    assert _lookup(store, 0.5) is None
+    clock["now"] += BUILD_DELAY / 2
+    assert _lookup(store, 0.5) is None
+    assert built == []
+
+    clock["now"] += BUILD_DELAY / 2
+    _lookup(store, 0.5)
+    assert built == [(0.5, 1.2)]
+    assert _lookup(store, 0.5) is not None
+
+
+def test_store_restarts_the_delay_after_a_break(store):
+    store, clock, built = store
+    _lookup(store, 0.5)
+    clock["now"] += 2 * BUILD_DELAY
+    _lookup(store, 0.5)
+    assert built == []
+
+
+def test_store_keeps_at_most_max_tables(store):
+    store, clock, built = store
+    clos = [round(0.1 * i, 2) for i in range(MAX_TABLES + 2)]
+    for clo in clos:
+        _lookup(store, clo)
+    clock["now"] += BUILD_DELAY
+    for clo in clos:
+        _lookup(store, clo)
+    assert len(built) == len(clos)
+    assert list(store._tables) == [(clo, 1.2) for clo in clos[-MAX_TABLES:]]